@@ -1,15 +1,25 @@
 
 import os
+import sys
+import time
 import datetime
 import subprocess
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash
+import threading
+from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, send_file
 
 # Import configuration and managers/services
 from src.config_manager import manager as config
-from src.database_manager import DatabaseManager 
+from src.database_manager import DatabaseManager
 from src.topic_generator import TopicGenerator
 from src.script_writer import ScriptWriter
 from src.asset_generator import AssetGenerator
+from src.video_editor import VideoEditor
+from src.job_manager import JobManager
+from src.utils import slugify
+from src.pipeline_executor import PipelineExecutor
+from src.response_cache import get_response_cache
+from src.rate_limiter import rate_limit_stats
+from src.resilience import circuit_breaker_stats, latency_stats
 
 # --- Initialize Flask App ---
 app = Flask(__name__)
@@ -27,15 +37,17 @@ video_editor = None
 youtube_uploader = None
 notification_manager = None
 asset_generator = None
+job_manager = None
 
 try:
     print("Initializing services...")
     db_manager = DatabaseManager()
+    job_manager = JobManager(db_manager)
     topic_generator = TopicGenerator()
     script_writer = ScriptWriter()
     # Initialize other managers here when their classes are ready
     asset_generator = AssetGenerator()
-    # video_editor = VideoEditor()
+    video_editor = VideoEditor()
     # youtube_uploader = YouTubeUploader()
     # notification_manager = NotificationManager()
     print("Services initialized successfully.")
@@ -55,6 +67,16 @@ def inject_global_vars():
         db_manager=db_manager # <<< EXPLICITLY ADD db_manager HERE
     )
 
+@app.template_filter('format_timestamp')
+def format_timestamp(value):
+    """Formats an epoch-seconds timestamp from the database for display."""
+    if value in (None, ''):
+        return '-'
+    try:
+        return datetime.datetime.fromtimestamp(int(value)).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return value # Pre-migration rows may still hold a formatted string
+
 # --- Routes ---
 @app.route('/')
 def index():
@@ -87,7 +109,9 @@ def index():
             print(f"Error fetching data from Database in index route: {e}")
             flash(f"Error connecting or fetching data from Database: {e}", "warning")
 
-    return render_template('index.html', videos=video_data, error=error_message)
+    recent_jobs = job_manager.list_jobs(limit=10) if job_manager else []
+    return render_template('index.html', videos=video_data, jobs=recent_jobs, error=error_message,
+                           orchestrator=get_orchestrator_status())
 
 # --- Action Routes ---
 
@@ -120,6 +144,12 @@ def trigger_topic_generation():
 
     if input_type == 'script' or input_type == 'url':
         input_data = input_text.strip()
+    elif input_type in ('url_batch', 'url_batch_combined'):
+        # One video, playlist or channel URL per line
+        input_data = [line.strip() for line in input_text.strip().splitlines() if line.strip()]
+        if not input_data:
+            flash("No URLs found in the text area (ensure one URL per line).", "warning")
+            return redirect(url_for('index'))
     elif input_type == 'samples':
          # Assume samples are provided in the 'topic_input_text' textarea, separated by lines
          input_data = [line.strip() for line in input_text.strip().splitlines() if line.strip()]
@@ -135,196 +165,168 @@ def trigger_topic_generation():
          flash(f"Could not prepare input data for type '{input_type}'.", "warning")
          return redirect(url_for('index'))
 
-    # --- Trigger Generation (Synchronous for V1) ---
-    try:
-        # This can take time - ideally run in background, but simple sequential for V1
-        flash("Starting topic generation... This may take a moment.", "info") # Give user feedback
-        # Force redirect and then process? No, let's wait for V1.
+    # --- Queue Generation as a Background Job ---
+    if not job_manager:
+        flash("Background job service is not available.", "danger")
+        return redirect(url_for('index'))
 
-        added_topics = topic_generator.generate_and_store_topics(input_data, input_type, num_topics)
+    if input_type in ('url_batch', 'url_batch_combined'):
+        job_id = job_manager.submit('generate_topics_batch', run_batch_topic_generation, input_data, num_topics,
+                                    input_type == 'url_batch_combined')
+    else:
+        job_id = job_manager.submit('generate_topics', run_topic_generation, input_data, input_type, num_topics)
+    if job_id:
+        flash(f"Topic generation started in the background (job {job_id}). Refresh to see progress.", "info")
+    else:
+        flash("Could not queue topic generation. Check console logs for details.", "danger")
 
-        if added_topics:
-            flash(f"Successfully generated and added {len(added_topics)} topics!", "success")
-        elif added_topics is None: # Indicates an error occurred during the process
-             flash("Topic generation failed. Check console logs for details.", "danger")
-        else: # Indicates process ran but no *new* topics were added (e.g., all duplicates)
-             flash("Topic generation process completed, but no new topics were added (they might exist already).", "info")
+    return redirect(url_for('index'))
 
-    except Exception as e:
-        print(f"ERROR during topic generation trigger: {e}")
-        flash(f"An unexpected error occurred during topic generation: {e}", "danger")
 
-    return redirect(url_for('index'))
+def run_topic_generation(progress, input_data, input_type, num_topics):
+    """Background job: generates topics and stores them. Returns a result summary."""
+    added_topics = topic_generator.generate_and_store_topics(input_data, input_type, num_topics,
+                                                             progress_callback=progress)
+    if added_topics is None: # Indicates an error occurred during the process
+        raise RuntimeError("Topic generation failed. Check console logs for details.")
+    if added_topics:
+        summary = f"Successfully generated and added {len(added_topics)} topics!"
+    else: # Indicates process ran but no *new* topics were added (e.g., all duplicates)
+        summary = "Topic generation process completed, but no new topics were added (they might exist already)."
+    return {'summary': summary, 'added_topics': added_topics}
+
+
+def run_batch_topic_generation(progress, urls, num_topics, combined):
+    """Background job: ingests a batch of URLs and stores topics. Returns per-source results."""
+    result = topic_generator.generate_and_store_topics_batch(urls, num_topics, combined=combined,
+                                                             progress_callback=progress)
+    if result is None:
+        raise RuntimeError("Batch topic generation failed: no source could be ingested. Check console logs for details.")
+    failed_sources = [item for item in result['items'] if item['status'] == 'FAILED']
+    summary = (f"Batch complete: {len(result['added'])} new topics from "
+               f"{len(result['items']) - len(failed_sources)} sources ({len(failed_sources)} sources failed).")
+    return {'summary': summary, 'added_topics': result['added'], 'items': result['items']}
+
+
+@app.route('/api/topics/batch', methods=['POST'])
+def api_batch_topics():
+    """Queues batch topic generation. JSON body: {"urls": [...], "num_topics": 10, "combined": false}."""
+    if not topic_generator or not job_manager:
+        return jsonify({"status": "error", "message": "Topic generation service is not available."}), 503
+    payload = request.get_json(silent=True) or {}
+    urls = [url.strip() for url in payload.get('urls') or [] if isinstance(url, str) and url.strip()]
+    if not urls:
+        return jsonify({"status": "error", "message": "Provide a non-empty 'urls' list"}), 400
+    try:
+        num_topics = int(payload.get('num_topics', 10))
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "Invalid num_topics"}), 400
+    if not (1 <= num_topics <= 50):
+        return jsonify({"status": "error", "message": "num_topics must be between 1 and 50"}), 400
+    job_id = job_manager.submit('generate_topics_batch', run_batch_topic_generation, urls, num_topics,
+                                bool(payload.get('combined', False)))
+    if not job_id:
+        return jsonify({"status": "error", "message": "Could not queue batch topic generation"}), 500
+    return jsonify({"status": "queued", "job_id": job_id}), 202
 
 
 # app.py (Updated trigger_process_next route)
 
 @app.route('/trigger/process', methods=['POST'])
 def trigger_process_next():
-    """
-    Processes the next videos in the pipeline with priority:
-    1. Retries FAILED items (attempting script gen again).
-    2. Processes PENDING_ASSETS items (generating assets).
-    3. Processes PENDING_SCRIPT items (generating scripts).
-    """
+    """Queues a background run that processes the next videos in the pipeline."""
     num_to_process = config.get('VIDEOS_TO_GENERATE_PER_RUN', 2)
-    print(f"\n>>> Triggering processing for next {num_to_process} videos (Priority: FAILED > PENDING_ASSETS > PENDING_SCRIPT) <<<")
 
     if not db_manager:
         flash("Database Manager service is not available.", "danger")
         print(">>> ERROR: db_manager not available.")
         return redirect(url_for('index'))
+    if not job_manager:
+        flash("Background job service is not available.", "danger")
+        return redirect(url_for('index'))
 
-    processed_count = 0
-    # --- Counters for different stages ---
-    failed_retry_success_count = 0
-    failed_retry_failure_count = 0
-    asset_success_count = 0
-    asset_failure_count = 0
-    script_success_count = 0
-    script_failure_count = 0
-
-    # --- Priority 1: Retry FAILED ---
-    print("\n--- [Priority 1] Checking for FAILED topics to retry ---")
-    limit = num_to_process - processed_count
-    if limit > 0 and script_writer: # Need script_writer to retry
-        failed_topics = db_manager.find_topics_by_status('FAILED', limit=limit)
-        print(f"--- [Priority 1] Found {len(failed_topics)} FAILED topics to retry: {failed_topics}")
-        if failed_topics:
-            for topic in failed_topics:
-                if processed_count >= num_to_process: break # Check limit before processing
-                print(f"\n--- [Priority 1] Retrying (as script gen) for FAILED topic: {topic} ---")
-                processed_count += 1
-                try:
-                    # Treat FAILED retry as a fresh script generation attempt
-                    success = script_writer.process_topic(topic)
-                    if success:
-                        failed_retry_success_count += 1
-                        print(f"--- [Priority 1] SUCCESS retry for: {topic}")
-                    else:
-                        failed_retry_failure_count += 1
-                        print(f"--- [Priority 1] FAILED retry for: {topic} (script_writer returned False)")
-                except Exception as e:
-                    failed_retry_failure_count += 1
-                    print(f"--- [Priority 1] FAILED retry for: {topic} (Unhandled Exception: {e})")
-                    # Update status back to FAILED if unexpected error
-                    if db_manager: db_manager.update_status(topic, 'FAILED', last_error=f"Unhandled retry exception: {e}")
-        else:
-            print("--- [Priority 1] No FAILED topics found.")
-    elif not script_writer:
-         print("--- [Priority 1] Script Writer service unavailable, cannot retry FAILED items.")
-    else:
-         print("--- [Priority 1] Processing limit reached, skipping FAILED check.")
-
-
-    # --- Priority 2: Process PENDING_ASSETS ---
-    print("\n--- [Priority 2] Checking for PENDING_ASSETS topics ---")
-    limit = num_to_process - processed_count
-    if limit > 0 and asset_generator: # Need asset_generator
-        asset_topics = db_manager.find_topics_by_status('PENDING_ASSETS', limit=limit)
-        print(f"--- [Priority 2] Found {len(asset_topics)} PENDING_ASSETS topics: {asset_topics}")
-        if asset_topics:
-            for topic in asset_topics:
-                 if processed_count >= num_to_process: break
-                 print(f"\n--- [Priority 2] Processing assets for: {topic} ---")
-                 processed_count += 1
-                 try:
-                     success = asset_generator.process_topic(topic)
-                     if success:
-                         asset_success_count += 1
-                         print(f"--- [Priority 2] SUCCESS assets for: {topic}")
-                     else:
-                         asset_failure_count += 1
-                         print(f"--- [Priority 2] FAILED assets for: {topic} (asset_generator returned False)")
-                 except Exception as e:
-                     asset_failure_count += 1
-                     print(f"--- [Priority 2] FAILED assets for: {topic} (Unhandled Exception: {e})")
-                     if db_manager: db_manager.update_status(topic, 'FAILED', last_error=f"Unhandled asset exception: {e}")
-        else:
-            print("--- [Priority 2] No PENDING_ASSETS topics found.")
-    elif not asset_generator:
-        print("--- [Priority 2] Asset Generator service unavailable, cannot process PENDING_ASSETS items.")
-    else:
-        print("--- [Priority 2] Processing limit reached, skipping PENDING_ASSETS check.")
-
-
-    # --- Priority 3: Process PENDING_SCRIPT ---
-    print("\n--- [Priority 3] Checking for PENDING_SCRIPT topics ---")
-    limit = num_to_process - processed_count
-    if limit > 0 and script_writer: # Need script_writer
-        script_topics = db_manager.find_topics_by_status('PENDING_SCRIPT', limit=limit)
-        print(f"--- [Priority 3] Found {len(script_topics)} PENDING_SCRIPT topics: {script_topics}")
-        if script_topics:
-            for topic in script_topics:
-                if processed_count >= num_to_process: break
-                print(f"\n--- [Priority 3] Processing script for: {topic} ---")
-                processed_count += 1
-                try:
-                    success = script_writer.process_topic(topic)
-                    if success:
-                        script_success_count += 1
-                        print(f"--- [Priority 3] SUCCESS script for: {topic}")
-                    else:
-                        script_failure_count += 1
-                        print(f"--- [Priority 3] FAILED script for: {topic} (script_writer returned False)")
-                except Exception as e:
-                    script_failure_count += 1
-                    print(f"--- [Priority 3] FAILED script for: {topic} (Unhandled Exception: {e})")
-                    if db_manager: db_manager.update_status(topic, 'FAILED', last_error=f"Unhandled script exception: {e}")
-        else:
-            print("--- [Priority 3] No PENDING_SCRIPT topics found.")
-    elif not script_writer:
-        print("--- [Priority 3] Script Writer service unavailable, cannot process PENDING_SCRIPT items.")
+    job_id = job_manager.submit('process_next', run_processing_batch, num_to_process)
+    if job_id:
+        flash(f"Processing of the next {num_to_process} videos started in the background (job {job_id}).", "info")
     else:
-        print("--- [Priority 3] Processing limit reached, skipping PENDING_SCRIPT check.")
-
-
-    # --- Report Summary ---
-    total_failed = failed_retry_failure_count + asset_failure_count + script_failure_count
-    total_success = failed_retry_success_count + asset_success_count + script_success_count
-    final_summary = (f"Processing run complete (Processed {processed_count}/{num_to_process} max). "
-                     f"Retried FAILED: {failed_retry_success_count} success, {failed_retry_failure_count} failed. "
-                     f"Assets: {asset_success_count} success, {asset_failure_count} failed. "
-                     f"Scripts: {script_success_count} success, {script_failure_count} failed.")
-
-    print(f"\n>>> {final_summary} <<<")
-    if total_failed > 0:
-        flash(f"{final_summary} Check logs for error details.", "warning")
-    elif total_success > 0:
-         flash(final_summary, "success")
-    else:
-         flash("No pending items found to process in this run.", "info")
-
+        flash("Could not queue the processing run. Check console logs for details.", "danger")
     return redirect(url_for('index'))
 
 
+def run_processing_batch(progress, num_to_process):
+    """
+    Background job: processes the next videos in the pipeline. Admission priority is
+    FAILED retry (as script gen) > PENDING_ASSETS > PENDING_SCRIPT; the script and asset
+    stages then run concurrently with per-stage worker limits.
+    """
+    executor = PipelineExecutor(db_manager, script_writer=script_writer, asset_generator=asset_generator)
+    return executor.run(num_to_process, progress=progress)
+
+
+def get_orchestrator_status():
+    """Orchestrator control row plus whether the daemon is alive (recent heartbeat)."""
+    control = db_manager.get_orchestrator_control() if db_manager else None
+    if not control:
+        return None
+    heartbeat_at = control.get('heartbeat_at') or 0
+    control['running'] = bool(control.get('owner')) and \
+        time.time() - heartbeat_at < config.get('ORCHESTRATOR_HEARTBEAT_TIMEOUT', 60)
+    return control
+
+
+def start_orchestrator():
+    """Launches orchestrator.py detached, with output appended to ORCHESTRATOR_LOG_FILE. Returns the PID."""
+    python_executable = config.get('PYTHON_EXECUTABLE') or sys.executable
+    orchestrator_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'orchestrator.py')
+    with open(config.get('ORCHESTRATOR_LOG_FILE', 'orchestrator.log'), 'a') as log_file:
+        # Output goes to a file, never to pipes nobody reads; its own session so it outlives the web server
+        process = subprocess.Popen([python_executable, orchestrator_script], stdin=subprocess.DEVNULL,
+                                   stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+    return process.pid
+
+
 @app.route('/trigger/orchestrator', methods=['POST'])
 def trigger_orchestrator():
+    """Starts the orchestrator daemon, or asks the running one for an immediate tick."""
     if not db_manager: # CHECK CHANGE
          flash("Database service is not available.", "danger")
          return redirect(url_for('index'))
-    # TODO: Execute the logic currently planned for orchestrator.py
-
-    print("Placeholder: Trigger Orchestrator called")
-    flash("Orchestrator trigger not fully implemented yet. Check console.", "info")
-    python_executable = config.get('PYTHON_EXECUTABLE', 'python') # Use configured python or default
-    orchestrator_script = 'orchestrator.py'
+    status = get_orchestrator_status()
+    if status and status['running']:
+        db_manager.update_orchestrator_control(tick_requested=1)
+        flash(f"Orchestrator ({status['owner']}) will run all stages on its next poll.", "info")
+        return redirect(url_for('index'))
     try:
-        # Be careful with running scripts like this in a web server context
-
-        process = subprocess.Popen([python_executable, orchestrator_script],
-                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        # Don't wait for it to finish, just start it
-        print(f"Attempted to start {orchestrator_script} with PID: {process.pid}")
-        flash(f"Orchestrator script ({orchestrator_script}) started in background (PID: {process.pid}). Check console/logs for progress.", "success")
-        # return jsonify({"status": "success", "message": f"Orchestrator script started ({process.pid}). Check console/logs."}), 200
-    except FileNotFoundError:
-         print(f"Error starting orchestrator.py: '{python_executable}' or '{orchestrator_script}' not found.")
-         flash(f"Error: Could not find Python executable ('{python_executable}') or script ('{orchestrator_script}').", "danger")
-    except Exception as e:
+        pid = start_orchestrator()
+        print(f"Started orchestrator daemon with PID: {pid}")
+        flash(f"Orchestrator daemon started (PID: {pid}). Output: {config.get('ORCHESTRATOR_LOG_FILE')}", "success")
+    except OSError as e:
         print(f"Error starting orchestrator.py: {e}")
-        flash(f"Failed to start orchestrator script: {e}", "danger")
-        # return jsonify({"status": "error", "message": f"Failed to start orchestrator: {e}"}), 500
+        flash(f"Failed to start orchestrator: {e}", "danger")
+    return redirect(url_for('index'))
+
+
+@app.route('/api/orchestrator')
+def api_orchestrator_status():
+    """Orchestrator daemon state: running, paused, current stage, last tick summary."""
+    status = get_orchestrator_status()
+    if status is None:
+        return jsonify({"status": "error", "message": "Database service is not available."}), 503
+    return jsonify(status)
+
+
+@app.route('/api/orchestrator/<action>', methods=['POST'])
+def api_orchestrator_control(action):
+    """Control channel for the daemon: pause, resume or tick (run all stages now)."""
+    updates = {'pause': {'paused': 1}, 'resume': {'paused': 0}, 'tick': {'tick_requested': 1}}.get(action)
+    if updates is None:
+        return jsonify({"status": "error", "message": f"Unknown orchestrator action '{action}'."}), 404
+    if not db_manager or not db_manager.update_orchestrator_control(**updates):
+        return jsonify({"status": "error", "message": "Could not update orchestrator control."}), 500
+    status = get_orchestrator_status()
+    if request.is_json or request.accept_mimetypes.best == 'application/json':
+        return jsonify({"status": "success", "orchestrator": status})
+    flash(f"Orchestrator {action} requested." + ("" if (status or {}).get('running') else " (The daemon is not running.)"), "info")
     return redirect(url_for('index'))
 
 
@@ -367,6 +369,53 @@ def delete_topic_route():
     return redirect(url_for('index'))
 
 
+# --- Background Job Routes ---
+@app.route('/api/jobs/<job_id>')
+def api_get_job(job_id):
+    """Returns status, progress and result for a background job."""
+    if not job_manager:
+        return jsonify({"status": "error", "message": "Background job service is not available."}), 503
+    job = job_manager.get_job(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": f"Job '{job_id}' not found."}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs')
+def api_list_jobs():
+    """Returns the most recent background jobs."""
+    if not job_manager:
+        return jsonify({"status": "error", "message": "Background job service is not available."}), 503
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify(job_manager.list_jobs(limit=min(max(limit, 1), 200)))
+
+
+@app.route('/api/metrics/cache')
+def api_cache_metrics():
+    """Hit rate and API latency saved by the LLM response cache, plus segment render cache hits."""
+    metrics = {"llm": get_response_cache().metrics()}
+    if video_editor and video_editor.segment_cache:
+        metrics["segments"] = video_editor.segment_cache.stats()
+    return jsonify(metrics)
+
+
+@app.route('/api/metrics/rate_limits')
+def api_rate_limit_metrics():
+    """Per-provider limiter state: AIMD concurrency window, 429s seen, retries and time spent waiting."""
+    return jsonify(rate_limit_stats())
+
+
+@app.route('/api/metrics/circuit_breakers')
+def api_circuit_breaker_metrics():
+    """Per-provider circuit breaker state: closed/open/half_open, failures and seconds until the next probe."""
+    return jsonify(circuit_breaker_stats())
+
+
+@app.route('/api/metrics/latency')
+def api_latency_metrics():
+    """Per-provider latency percentiles of successful API calls (these drive TTS hedging)."""
+    return jsonify(latency_stats())
+
+
 # --- Editor Routes (Placeholders) ---
 @app.route('/editor/<topic_slug>')
 def editor(topic_slug):
@@ -410,19 +459,91 @@ def api_get_script(topic_slug):
 
 @app.route('/api/save_edits/<topic_slug>', methods=['POST'])
 def api_save_edits(topic_slug):
-    # TODO: Receive JSON data (image order, script text, style choices)
-    # TODO: Save this data temporarily or update relevant files
-    print(f"Placeholder: API Save Edits called for: {topic_slug}")
-    print("Received data:", request.json)
-    return jsonify({"status": "success", "message": "Edits saved (Placeholder)"})
+    """
+    Saves editor choices ({"visual_order": [...], "caption_style": "..."}) to the topic's edits.json.
+    With "preview": true, also queues a proxy render so the editor can show the result.
+    """
+    if not video_editor:
+        return jsonify({"status": "error", "message": "Video editor service is not available."}), 503
+    if topic_slug != slugify(topic_slug):
+        return jsonify({"status": "error", "message": f"Invalid topic '{topic_slug}'."}), 404
+    data = request.get_json(silent=True) or {}
+    edits, error = video_editor.save_edits(topic_slug, data)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    response = {"status": "success", "message": "Edits saved.", "edits": edits}
+    if data.get('preview'):
+        job_id = queue_preview(topic_slug) if job_manager else None
+        response["preview_job_id"] = job_id
+    return jsonify(response)
+
+@app.route('/api/preview/<topic_slug>', methods=['POST'])
+def api_render_preview(topic_slug):
+    """Queues a low-resolution preview render; only segments changed since the last preview are re-rendered."""
+    if not video_editor or not job_manager:
+        return jsonify({"status": "error", "message": "Video editor service is not available."}), 503
+    if topic_slug != slugify(topic_slug) or not os.path.isdir(os.path.join(video_editor.assets_dir, topic_slug)):
+        return jsonify({"status": "error", "message": f"No assets found for '{topic_slug}'."}), 404
+    job_id = queue_preview(topic_slug)
+    if not job_id:
+        return jsonify({"status": "error", "message": "Could not queue preview. Check console logs for details."}), 500
+    return jsonify({"status": "queued", "job_id": job_id, "message": f"Preview started for '{topic_slug}'."}), 202
+
+@app.route('/api/preview/<topic_slug>/video')
+def api_get_preview(topic_slug):
+    """Serves the latest preview render."""
+    if not video_editor or topic_slug != slugify(topic_slug):
+        return jsonify({"status": "error", "message": f"No preview for '{topic_slug}'."}), 404
+    preview_path = os.path.join(video_editor.assets_dir, topic_slug, 'preview.mp4')
+    if not os.path.exists(preview_path):
+        return jsonify({"status": "error", "message": f"No preview for '{topic_slug}'."}), 404
+    return send_file(os.path.abspath(preview_path), mimetype='video/mp4', conditional=True, max_age=0)
+
+
+_queued_previews = {} # topic slug -> id of its latest preview job
+_queued_previews_lock = threading.Lock()
+
+def queue_preview(topic_slug):
+    """
+    Queues a preview render of a topic, or returns the id of its preview job that has not started yet
+    (that job reads the latest edits when it runs). Running previews of a topic are serialized by the video editor.
+    """
+    with _queued_previews_lock:
+        job_id = _queued_previews.get(topic_slug)
+        job = job_manager.get_job(job_id) if job_id else None
+        if job and job['status'] == JobManager.QUEUED:
+            return job_id
+        job_id = job_manager.submit('render_preview', run_render_preview, topic_slug)
+        if job_id:
+            _queued_previews[topic_slug] = job_id
+        return job_id
+
+def run_render_preview(progress, topic_slug):
+    """Background job: renders the editor preview for a topic."""
+    if not video_editor.render_video(topic_slug, progress_callback=progress, preview=True):
+        raise RuntimeError(f"Preview render failed for '{topic_slug}'. Check console logs for details.")
+    return {'summary': f"Rendered preview for '{topic_slug}'."}
 
 @app.route('/api/render/<topic_slug>', methods=['POST'])
 def api_render_video(topic_slug):
-    # TODO: Get saved edits/parameters
-    # TODO: Call VideoEditor.render_video() - Needs background task handling!
-    # TODO: Update sheet status
-    print(f"Placeholder: API Render Video called for: {topic_slug}")
-    return jsonify({"status": "success", "message": "Render started (Placeholder - will take time)"})
+    """Queues a background render of the topic's final video."""
+    if not video_editor or not db_manager or not job_manager:
+        return jsonify({"status": "error", "message": "Video editor service is not available."}), 503
+    topic_name = next((row['topic'] for row in db_manager.get_all_videos_status()
+                       if slugify(row['topic']) == topic_slug), None)
+    if not topic_name:
+        return jsonify({"status": "error", "message": f"No topic found for '{topic_slug}'."}), 404
+    job_id = job_manager.submit('render_video', run_render_video, topic_name)
+    if not job_id:
+        return jsonify({"status": "error", "message": "Could not queue render. Check console logs for details."}), 500
+    return jsonify({"status": "queued", "job_id": job_id, "message": f"Render started for '{topic_name}'."}), 202
+
+
+def run_render_video(progress, topic_name):
+    """Background job: renders the final video for a topic."""
+    if not video_editor.process_topic(topic_name, progress_callback=progress):
+        raise RuntimeError(f"Render failed for '{topic_name}'. Check console logs for details.")
+    return {'summary': f"Rendered final video for '{topic_name}'."}
 
 # --- Configuration Page Route (Placeholder) ---
 @app.route('/config')
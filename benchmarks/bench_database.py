@@ -0,0 +1,84 @@
+# benchmarks/bench_database.py
+"""
+Micro-benchmark for DatabaseManager bookkeeping throughput.
+
+Compares the old behaviour (a fresh sqlite3.connect() per call, rollback journal)
+against the pooled per-thread connections with WAL journaling.
+
+Usage:
+    python benchmarks/bench_database.py [--ops 2000] [--threads 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database_manager import DatabaseManager, get_connection_pool
+
+
+class LegacyDatabaseManager(DatabaseManager):
+    """DatabaseManager with the original connect-per-call behaviour."""
+
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def _run_ops(manager, topics, ops):
+    """Mix of the calls made during pipeline bookkeeping."""
+    for i in range(ops):
+        topic = topics[i % len(topics)]
+        step = i % 4
+        if step == 0:
+            manager.update_status(topic, 'PENDING_ASSETS', last_error='')
+        elif step == 1:
+            manager.get_topic_details(topic)
+        elif step == 2:
+            manager.find_topics_by_status('PENDING_ASSETS', limit=5)
+        else:
+            manager.update_status(topic, 'PENDING_SCRIPT')
+
+
+def _bench(manager_cls, db_path, ops, threads):
+    with contextlib.redirect_stdout(io.StringIO()): # Managers log every call
+        manager = manager_cls(db_path=db_path)
+        topics = [f"Benchmark topic {i}" for i in range(200)]
+        for topic in topics:
+            manager.add_topic(topic, source_type='benchmark')
+
+        per_thread = ops // threads
+        workers = [threading.Thread(target=_run_ops, args=(manager, topics, per_thread)) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        elapsed = time.perf_counter() - start
+    return (per_thread * threads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ops', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        before = _bench(LegacyDatabaseManager, os.path.join(tmp_dir, 'legacy.db'), args.ops, args.threads)
+        after = _bench(DatabaseManager, os.path.join(tmp_dir, 'pooled.db'), args.ops, args.threads)
+        get_connection_pool(os.path.join(tmp_dir, 'pooled.db')).close_all()
+
+    print(f"Operations: {args.ops} across {args.threads} threads")
+    print(f"Before (connect per call):   {before:10.0f} ops/sec")
+    print(f"After  (pooled, WAL):        {after:10.0f} ops/sec")
+    print(f"Speedup: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
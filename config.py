@@ -16,6 +16,11 @@ os.makedirs(MUSIC_DIR, exist_ok=True)
 # --- Database ---
 DEFAULT_DB_FILE = os.path.join(BASE_DIR, 'youtube_automator.db')
 DATABASE_FILE = os.getenv('DATABASE_FILE', DEFAULT_DB_FILE)
+# Connection pool tuning (one persistent connection per worker thread, WAL journaling)
+DB_BUSY_TIMEOUT_MS = 5000 # How long a writer waits on a locked database before failing
+DB_SYNCHRONOUS = "NORMAL" # NORMAL is durable enough with WAL and avoids an fsync per commit
+DB_CACHE_SIZE_KB = 16384 # Page cache per connection (16 MB)
+DB_MMAP_SIZE = 256 * 1024 * 1024 # Memory-mapped I/O window (256 MB)
 
 # --- Google API (Disabled for now) ---
 # SCOPES = [
@@ -30,6 +35,27 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_GPT_MODEL = "gpt-4-turbo-preview"
 OPENAI_IMAGE_MODEL = "dall-e-3"
 OPENAI_WHISPER_MODEL = "whisper-1"
+# Response cache for GPT/DALL-E calls (in-memory LRU in front of a table in DATABASE_FILE)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_BACKEND = "sqlite" # "sqlite" or "memory"
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_IMAGE_CACHE_TTL_SECONDS = 45 * 60 # DALL-E image URLs expire after ~1 hour
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_MEMORY_ENTRIES = 256
+# Transcription: long audio is split at silences and the parts transcribed concurrently
+TRANSCRIPTION_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'openai') # "openai" or "fake" (offline, no API calls)
+TRANSCRIPTION_SEGMENT_SECONDS = 600 # Max length of one transcription request
+WHISPER_MAX_UPLOAD_BYTES = 24 * 1024 * 1024 # Whisper rejects uploads over 25 MB
+TRANSCRIPTION_CONCURRENCY = 4
+# Downloaded source audio + transcripts, keyed by video id (repeat URLs skip download and Whisper)
+DOWNLOAD_CACHE_DIR = os.path.join(ASSETS_DIR, '_cache', 'downloads')
+DOWNLOAD_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024 # 5 GB
+DOWNLOAD_CACHE_MAX_AGE_DAYS = 30
+# URL audio is transcoded straight to speech-grade mono MP3 (Whisper resamples to 16 kHz anyway)
+INGEST_AUDIO_SAMPLE_RATE = 16000
+INGEST_AUDIO_BITRATE = "32k"
+INGEST_CONCURRENCY = 4 # URLs downloaded/transcribed in parallel during batch ingestion
+INGEST_PLAYLIST_MAX_ITEMS = 50 # Videos taken from each playlist/channel URL
 
 # --- ElevenLabs ---
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY')
@@ -52,6 +78,17 @@ DEEPGRAM_API_KEY = os.getenv('DEEPGRAM_API_KEY')
 DEFAULT_MODEL_ID_DEEPGRAM = "aura-asteria-en" # Example voice model
 
 TTS_PROVIDER_PRIORITY = ['cartesia', 'deepgram', 'elevenlabs']
+# Scripts are split at sentence boundaries into chunks within each provider's request limit,
+# synthesized in parallel and joined losslessly.
+TTS_CHUNK_CHAR_LIMITS = {'cartesia': 2000, 'deepgram': 2000, 'elevenlabs': 2500}
+TTS_CHUNK_CONCURRENCY = 4
+TTS_HEDGING_ENABLED = False # Race the next provider in TTS_PROVIDER_PRIORITY when the current one is slow
+TTS_HEDGE_PERCENTILE = 0.95 # Hedge once a provider exceeds this percentile of its recorded latency
+TTS_HEDGE_MIN_SAMPLES = 20 # Latency samples needed before the percentile is trusted
+TTS_HEDGE_DEFAULT_DELAY = 30 # Seconds before hedging while a provider has too few samples
+TTS_CACHE_ENABLED = True
+TTS_CACHE_DIR = os.path.join(ASSETS_DIR, '_cache', 'tts')
+TTS_CACHE_MAX_BYTES = 1024 * 1024 * 1024 # 1 GB, least recently used entries evicted first
 
 
 # --- Pexels ---
@@ -67,14 +104,68 @@ CAPTION_STYLES = {
 }
 DEFAULT_CAPTION_STYLE = "Subtle"
 WORDS_PER_CAPTION_CHUNK = 3
+CAPTIONS_ENABLED = True # Burn captions into rendered videos
+CAPTION_BASE_HEIGHT = 480 # CAPTION_STYLES font sizes are for this output height; scaled to the real one
+CAPTION_BOTTOM_MARGIN = 0.12 # Fraction of the frame height kept below captions
+CAPTION_FALLBACK_FONTS = ["DejaVuSans-Bold.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"]
 IMAGES_PER_SCRIPT = 8
 IMAGE_SIZE = "1024x1024"
+VISUAL_CONCURRENCY = 8 # Visual slots acquired in parallel per topic
+PEXELS_MAX_CONCURRENCY = 4 # In-flight Pexels searches per process
+DALLE_MAX_CONCURRENCY = 2 # In-flight DALL-E generations per process (image models have low rate limits)
+# Client-side rate limits per API provider, shared by every thread in a process. Concurrency
+# starts at max_concurrency, halves on a 429 and grows back by one per window of successes.
+RATE_LIMITS = {
+    'openai_chat': {'requests_per_minute': 500, 'max_concurrency': 16},
+    'dalle': {'requests_per_minute': 50, 'max_concurrency': DALLE_MAX_CONCURRENCY},
+    'whisper': {'requests_per_minute': 50, 'max_concurrency': TRANSCRIPTION_CONCURRENCY},
+    'pexels': {'requests_per_minute': 200 / 60, 'max_concurrency': PEXELS_MAX_CONCURRENCY, 'burst': 10}, # 200/hour default quota
+    'deepgram': {'requests_per_minute': 480, 'max_concurrency': 4},
+    'elevenlabs': {'requests_per_minute': 120, 'max_concurrency': 4},
+}
+RETRY_MAX_ATTEMPTS = 3 # Attempts per provider call for transient errors (timeouts, 5xx)
+RETRY_BASE_DELAY = 1.0 # Seconds; backoff is full-jitter exponential from here
+RETRY_MAX_DELAY = 20.0
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3 # Consecutive failed calls before a provider is skipped
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = 120 # How long an open provider is skipped before one probe call
+CIRCUIT_BREAKER_PROBE_WAIT_SECONDS = 180 # Callers wait this long on a half-open probe before giving up
+HTTP_POOL_MAXSIZE = 16 # Keep-alive connections kept per host
+HTTP_DOWNLOAD_CHUNK_BYTES = 1024 * 1024 # Streaming write block size
+HTTP_PARALLEL_MIN_BYTES = 16 * 1024 * 1024 # Files at least this large are fetched as parallel Range parts
+HTTP_DOWNLOAD_PART_BYTES = 8 * 1024 * 1024
+HTTP_DOWNLOAD_CONCURRENCY = 4 # Parallel Range requests per download
 VIDEO_ASPECT_RATIO = (16, 9)
 VIDEO_FPS = 24
+VIDEO_SHORT_SIDE = 1080 # Output is 1920x1080 for 16:9, 1080x1920 for 9:16
+RENDER_WORKERS = None # Parallel segment renders (None = one per CPU core)
+RENDER_PRESET = "veryfast" # x264 preset for segment renders
+RENDER_CRF = 20
+RENDER_SEGMENT_TIMEOUT = 600 # Seconds before a single ffmpeg render is abandoned
+PREVIEW_SHORT_SIDE = 360 # Editor preview renders: 640x360 for 16:9
+PREVIEW_FPS = 12
+PREVIEW_CRF = 30
+SEGMENT_CACHE_ENABLED = True # Reuse rendered segments whose inputs are unchanged
+SEGMENT_CACHE_DIR = os.path.join(ASSETS_DIR, '_cache', 'segments')
+SEGMENT_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024 # 10 GB, least recently used segments evicted first
+MUSIC_ENABLED = True # Mix a background track from MUSIC_DIR under the voiceover (skipped if the library is empty)
+MUSIC_TARGET_LUFS = -30.0 # Music bed loudness; voiceovers sit around -16 LUFS
+MUSIC_DUCKING = True # Compress the music further while the voice is speaking
+MUSIC_ENVELOPE_SECONDS = 0.5 # Resolution of the RMS envelope stored in the music index
+MUSIC_SCAN_CONCURRENCY = 4 # Tracks analyzed in parallel when indexing MUSIC_DIR
 
 # --- Automation ---
 VIDEOS_TO_GENERATE_PER_RUN = 2
 VIDEOS_TO_UPLOAD_PER_DAY = 2 # Still relevant for orchestrator logic, just won't trigger upload
+PIPELINE_LEASE_SECONDS = 1800 # How long a worker's claim on a topic lasts before others may reclaim it
+JOB_WORKERS = 2 # Background job threads for long-running dashboard actions
+PIPELINE_SCRIPT_WORKERS = 8 # Concurrent script generations per process, shared by all processing runs
+PIPELINE_ASSET_WORKERS = 3 # Concurrent asset generations per process, shared by all processing runs (TTS + visuals)
+ORCHESTRATOR_INTERVALS = {'script': 600, 'assets': 600, 'render': 900, 'upload': 3600} # Seconds between stage runs
+ORCHESTRATOR_POLL_SECONDS = 5 # How often the daemon checks the control table and heartbeats
+ORCHESTRATOR_RENDERS_PER_TICK = 1 # Renders use every core, so one at a time
+ORCHESTRATOR_HEARTBEAT_TIMEOUT = 60 # Seconds without a heartbeat before the daemon is considered gone
+ORCHESTRATOR_LOCK_FILE = os.path.join(BASE_DIR, 'orchestrator.lock')
+ORCHESTRATOR_LOG_FILE = os.path.join(BASE_DIR, 'orchestrator.log')
 
 # --- Notifications ---
 SMTP_SERVER = os.getenv('SMTP_SERVER')
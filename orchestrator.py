@@ -0,0 +1,207 @@
+# orchestrator.py
+"""
+Long-running pipeline scheduler.
+
+Runs the script, asset, render and upload stages on their own intervals
+(ORCHESTRATOR_INTERVALS) from one warm process, so service clients, caches and
+database connections are created once rather than per run.
+- Single instance: an exclusive lock on ORCHESTRATOR_LOCK_FILE.
+- Graceful shutdown: SIGTERM/SIGINT stop the loop after the current topic.
+- Control channel: the orchestrator_control table. The web UI sets paused/tick_requested;
+  the daemon publishes its heartbeat, current stage and last tick summary there.
+
+Usage:
+    python orchestrator.py [--once]
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+from src.config_manager import manager as config
+from src.database_manager import DatabaseManager, LeaseHeartbeat, default_worker_id
+from src.pipeline_executor import PipelineExecutor
+from src.script_writer import ScriptWriter
+from src.asset_generator import AssetGenerator
+from src.video_editor import VideoEditor
+
+DEFAULT_INTERVALS = {'script': 600, 'assets': 600, 'render': 900, 'upload': 3600}
+
+
+def acquire_instance_lock(lock_path):
+    """Takes the single-instance lock. Returns the open lock file (keep it open), or None if already held."""
+    handle = open(lock_path, 'a+')
+    if fcntl is None:
+        print("Warning: File locking is unavailable on this platform; single-instance check skipped.")
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    handle.seek(0)
+    handle.truncate()
+    handle.write(f"{os.getpid()}\n")
+    handle.flush()
+    return handle
+
+
+class Orchestrator:
+    """Tick loop that runs due pipeline stages, controlled through the orchestrator_control table."""
+
+    STAGES = ('script', 'assets', 'render', 'upload')
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_seconds = config.get('ORCHESTRATOR_POLL_SECONDS', 5)
+        self.intervals = {**DEFAULT_INTERVALS, **(config.get('ORCHESTRATOR_INTERVALS') or {})}
+        self.stop_event = threading.Event()
+        self.last_run = {stage: 0.0 for stage in self.STAGES}
+        # Created once and reused by every tick
+        self.script_writer = self._create_service(ScriptWriter)
+        self.asset_generator = self._create_service(AssetGenerator)
+        self.video_editor = self._create_service(VideoEditor)
+        self.youtube_uploader = None # Upload stage is skipped until YouTubeUploader is implemented
+        print(f"Orchestrator initialized ({self.owner}); intervals: {self.intervals}")
+
+    @staticmethod
+    def _create_service(service_class):
+        """Instantiates a pipeline service, or returns None (its stage is skipped) if it cannot start."""
+        try:
+            return service_class()
+        except Exception as e:
+            print(f"ERROR: Could not initialize {service_class.__name__}: {e}")
+            return None
+
+    def stop(self, signum=None, frame=None):
+        """Requests a graceful shutdown (also the SIGTERM/SIGINT handler)."""
+        if not self.stop_event.is_set():
+            print(f"Orchestrator stopping{f' on signal {signum}' if signum else ''}; finishing current work...")
+        self.stop_event.set()
+
+    def _heartbeat(self):
+        while not self.stop_event.wait(self.poll_seconds):
+            self.db_manager.update_orchestrator_control(owner=self.owner, heartbeat_at=int(time.time()))
+
+    # --- Stages ---
+
+    def _run_pipeline_stage(self, stage):
+        processor = self.script_writer if stage == 'SCRIPT' else self.asset_generator
+        if not processor:
+            return "service unavailable, skipped"
+        executor = PipelineExecutor(self.db_manager, script_writer=self.script_writer,
+                                    asset_generator=self.asset_generator, stages=(stage,))
+        return executor.run(config.get('VIDEOS_TO_GENERATE_PER_RUN', 2))['summary']
+
+    def _run_render_stage(self):
+        if not self.video_editor:
+            return "service unavailable, skipped"
+        worker_id = default_worker_id()
+        self.db_manager.reclaim_expired_leases()
+        topics = self.db_manager.claim_topics('EDIT', config.get('ORCHESTRATOR_RENDERS_PER_TICK', 1), worker_id)
+        rendered = 0
+        with LeaseHeartbeat(self.db_manager, topics, worker_id):
+            try:
+                for topic in topics:
+                    if self.stop_event.is_set():
+                        break
+                    rendered += bool(self.video_editor.process_topic(topic, worker_id=worker_id))
+            finally:
+                # Hand unstarted (or skipped) claims straight back instead of waiting for lease expiry
+                self.db_manager.release_claims(topics, worker_id)
+        return f"Rendered {rendered}/{len(topics)} topics." if topics else "No topics pending render."
+
+    def _run_upload_stage(self):
+        if not self.youtube_uploader:
+            return "uploader not configured, skipped"
+        return "No uploads attempted."
+
+    def run_stage(self, stage):
+        """Runs one stage, never letting an error escape into the loop. Returns a summary line."""
+        runners = {
+            'script': lambda: self._run_pipeline_stage('SCRIPT'),
+            'assets': lambda: self._run_pipeline_stage('ASSETS'),
+            'render': self._run_render_stage,
+            'upload': self._run_upload_stage,
+        }
+        self.db_manager.update_orchestrator_control(current_stage=stage)
+        start_time = time.time()
+        try:
+            summary = runners[stage]()
+        except Exception as e:
+            print(f"ERROR: Orchestrator stage '{stage}' failed: {e}")
+            summary = f"failed: {e}"
+        finally:
+            self.last_run[stage] = time.time()
+            self.db_manager.update_orchestrator_control(current_stage=None)
+        return f"{stage} ({time.time() - start_time:.1f}s): {summary}"
+
+    def tick(self, force=False):
+        """Runs every stage that is due (all of them when forced). Re-checks the pause flag between stages."""
+        summaries = []
+        for stage in self.STAGES:
+            if self.stop_event.is_set():
+                break
+            if not force:
+                if time.time() - self.last_run[stage] < self.intervals.get(stage, DEFAULT_INTERVALS[stage]):
+                    continue
+                if (self.db_manager.get_orchestrator_control() or {}).get('paused'):
+                    break
+            summaries.append(self.run_stage(stage))
+        if summaries:
+            summary = " | ".join(summaries)
+            print(f"\n>>> Orchestrator tick{' (forced)' if force else ''}: {summary} <<<")
+            self.db_manager.update_orchestrator_control(last_tick_at=int(time.time()), last_summary=summary)
+        return summaries
+
+    def run(self, once=False):
+        """Main loop: polls the control row every ORCHESTRATOR_POLL_SECONDS and ticks until stopped."""
+        self.db_manager.update_orchestrator_control(owner=self.owner, heartbeat_at=int(time.time()), current_stage=None)
+        heartbeat = threading.Thread(target=self._heartbeat, name="orchestrator-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            while not self.stop_event.is_set():
+                forced = self.db_manager.consume_tick_request()
+                control = self.db_manager.get_orchestrator_control() or {}
+                if forced or not control.get('paused'):
+                    self.tick(force=forced or once)
+                if once:
+                    break
+                self.stop_event.wait(self.poll_seconds)
+        finally:
+            self.stop_event.set()
+            heartbeat.join()
+            self.db_manager.update_orchestrator_control(owner=None, heartbeat_at=None, current_stage=None)
+            print("Orchestrator stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help="Run every stage once and exit")
+    args = parser.parse_args()
+
+    lock = acquire_instance_lock(config.get('ORCHESTRATOR_LOCK_FILE', 'orchestrator.lock'))
+    if lock is None:
+        print("ERROR: Another orchestrator instance is already running.")
+        return 1
+    try:
+        orchestrator = Orchestrator()
+        signal.signal(signal.SIGTERM, orchestrator.stop)
+        signal.signal(signal.SIGINT, orchestrator.stop)
+        orchestrator.run(once=args.once)
+    finally:
+        lock.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
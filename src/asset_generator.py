@@ -1,8 +1,12 @@
 # src/asset_generator.py (Complete File - Ensure this is correct)
 import os
+import base64
+import json
 import requests
 import time
 import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 # Import TTS SDKs
 # from cartesia import Cartesia # Temporarily disabled Cartesia client usage
@@ -11,7 +15,12 @@ from deepgram import DeepgramClient, SpeakOptions
 from .config_manager import manager as config
 from .database_manager import DatabaseManager
 from .llm_service import LLMService
-from .utils import slugify
+from .audio_utils import concat_mp3_files
+from .tts_cache import TTSCache
+from .http_client import get_session, download_file
+from .resilience import call_provider, get_circuit_breaker, get_latency_histogram
+from .caption_alignment import ALIGNMENT_SUFFIX, CAPTIONS_FILE, words_from_character_alignment, align_voiceover, write_captions_file
+from .utils import slugify, chunk_text
 
 class AssetGenerator:
     """Handles generating voiceover and visuals (images/videos) for a topic."""
@@ -32,63 +41,98 @@ class AssetGenerator:
         # self.default_model_id_cartesia = config.get('DEFAULT_MODEL_ID_CARTESIA') # Not used
         # self.default_voice_name_cartesia = config.get('DEFAULT_VOICE_NAME_CARTESIA') # Not used
         self.default_model_id_deepgram = config.get('DEFAULT_MODEL_ID_DEEPGRAM')
+        self.elevenlabs_model_id = "eleven_multilingual_v2"
+        self.elevenlabs_voice_settings = {"stability": 0.5, "similarity_boost": 0.75}
+        self.tts_chunk_char_limits = config.get('TTS_CHUNK_CHAR_LIMITS', {})
+        self.tts_chunk_concurrency = config.get('TTS_CHUNK_CONCURRENCY', 4)
+        self.tts_hedging_enabled = config.get('TTS_HEDGING_ENABLED', False)
+        self.tts_hedge_percentile = config.get('TTS_HEDGE_PERCENTILE', 0.95)
+        self.tts_hedge_min_samples = config.get('TTS_HEDGE_MIN_SAMPLES', 20)
+        self.tts_hedge_default_delay = config.get('TTS_HEDGE_DEFAULT_DELAY', 30)
 
         # Pexels/DALL-E Settings
         self.pexels_api_key = config.get('PEXELS_API_KEY')
         self.target_visuals = config.get('IMAGES_PER_SCRIPT', 8)
         self.dalle_image_size = config.get('IMAGE_SIZE', "1024x1024")
+        self.visual_concurrency = config.get('VISUAL_CONCURRENCY', 8)
+        # In-flight Pexels/DALL-E/TTS calls are capped per provider by the shared rate limiters (RATE_LIMITS)
+
+        # Synthesized audio is cached by content, so unchanged scripts never hit a TTS API twice
+        self.tts_cache = TTSCache() if config.get('TTS_CACHE_ENABLED', True) else None
 
         # Initialize TTS Clients if keys exist
         # self.cartesia_client = Cartesia(api_key=self.cartesia_api_key) if self.cartesia_api_key else None # Disabled
         self.deepgram_client = DeepgramClient(self.deepgram_api_key) if self.deepgram_api_key else None
 
+        # Providers that cannot work in this process are dropped once here, not attempted per topic
+        unavailable = [p for p in self.tts_provider_priority if not self._tts_provider_available(p)]
+        if unavailable:
+            print(f"Info: Skipping unavailable TTS providers: {unavailable}")
+            self.tts_provider_priority = [p for p in self.tts_provider_priority if p not in unavailable]
+
         print("AssetGenerator initialized.")
         print(f"TTS Provider Priority: {self.tts_provider_priority}")
 
+    def _tts_provider_available(self, provider):
+        """Whether a TTS provider is configured and implemented (Cartesia is currently disabled)."""
+        if provider == 'deepgram':
+            return self.deepgram_client is not None
+        if provider == 'elevenlabs':
+            return bool(self.elevenlabs_api_key and self.default_voice_id_elevenlabs)
+        return False
+
 
     def _download_file(self, url, save_path):
-        """Downloads a file from a URL to a specified path."""
+        """
+        Downloads a file from a URL to a specified path over the pooled per-host session.
+        The file appears only once complete; a failed download is resumed by the next attempt.
+        """
         try:
             print(f"Downloading from {url} to {save_path}...")
-            response = requests.get(url, stream=True, timeout=60)
-            response.raise_for_status()
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192): f.write(chunk)
-            print("Download successful.")
+            start_time = time.time()
+            download_file(url, save_path)
+            print(f"Download successful ({os.path.getsize(save_path) / 1e6:.1f} MB in {time.time() - start_time:.2f}s).")
             return True
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, OSError) as e:
             print(f"ERROR: Failed to download {url}: {e}")
-            if os.path.exists(save_path):
-                 try: os.remove(save_path); print(f"Cleaned up partial file: {save_path}")
-                 except OSError: pass
             return False
 
 
     # --- TTS Generation Methods ---
 
-    def _generate_elevenlabs_vo(self, script_text, output_path):
-        """Generates voiceover using ElevenLabs API."""
+    def _generate_elevenlabs_vo(self, script_text, output_path, previous_text=None, next_text=None):
+        """
+        Generates voiceover using ElevenLabs API. Neighbouring chunk text keeps prosody continuous.
+        Uses the with-timestamps endpoint and writes the character alignment to <output_path>.alignment.json.
+        """
         if not self.elevenlabs_api_key: print("INFO: ElevenLabs API key not configured."); return False
         if not self.default_voice_id_elevenlabs: print("ERROR: ElevenLabs DEFAULT_VOICE_ID not set in config/.env."); return False
 
         voice_id = self.default_voice_id_elevenlabs
-        api_endpoint = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        headers = {"Accept": "audio/mpeg", "Content-Type": "application/json", "xi-api-key": self.elevenlabs_api_key}
-        data = {"text": script_text, "model_id": "eleven_multilingual_v2", "voice_settings": {"stability": 0.5, "similarity_boost": 0.75}}
+        api_endpoint = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/with-timestamps"
+        headers = {"Accept": "application/json", "Content-Type": "application/json", "xi-api-key": self.elevenlabs_api_key}
+        data = {"text": script_text, "model_id": self.elevenlabs_model_id, "voice_settings": self.elevenlabs_voice_settings}
+        if previous_text: data["previous_text"] = previous_text
+        if next_text: data["next_text"] = next_text
         print(f"Requesting voiceover from ElevenLabs (Voice ID: {voice_id})...")
         try:
-            response = requests.post(api_endpoint, json=data, headers=headers, timeout=180)
+            response = call_provider('elevenlabs', get_session(api_endpoint).post, api_endpoint, json=data, headers=headers, timeout=180)
             if response.status_code == 200:
-                with open(output_path, 'wb') as f: f.write(response.content)
+                payload = response.json()
+                with open(output_path, 'wb') as f: f.write(base64.b64decode(payload['audio_base64']))
+                alignment = payload.get('alignment')
+                if alignment:
+                    with open(output_path + ALIGNMENT_SUFFIX, 'w', encoding='utf-8') as f: json.dump(alignment, f)
                 print(f"Successfully saved ElevenLabs voiceover to {output_path}")
                 return True
             else:
                 print(f"ERROR: ElevenLabs API failed. Status: {response.status_code}, Response: {response.text[:200]}")
                 return False
         except requests.exceptions.RequestException as e: print(f"ERROR: Failed to call ElevenLabs API: {e}"); return False
+        except (KeyError, ValueError) as e: print(f"ERROR: Unexpected ElevenLabs response format: {e}"); return False
 
 
-    def _generate_cartesia_vo(self, script_text, output_path):
+    def _generate_cartesia_vo(self, script_text, output_path, previous_text=None, next_text=None):
         """Generates voiceover using Cartesia API. (Currently Disabled Stub)"""
         print("INFO: Cartesia TTS generation is temporarily disabled.")
         # This method needs correct SDK implementation based on docs
@@ -107,28 +151,18 @@ class AssetGenerator:
         return False
 
 
-    def _generate_deepgram_vo(self, script_text, output_path):
-        """Generates voiceover using Deepgram Aura API."""
+    def _generate_deepgram_vo(self, script_text, output_path, previous_text=None, next_text=None):
+        """Generates voiceover using Deepgram Aura API. Text must fit the provider chunk limit."""
         if not self.deepgram_client: print("INFO: Deepgram client not initialized."); return False
 
-        DEEPGRAM_CHAR_LIMIT = 2000
-        if len(script_text) > DEEPGRAM_CHAR_LIMIT:
-            print(f"WARNING: Script text ({len(script_text)} chars) exceeds Deepgram limit ({DEEPGRAM_CHAR_LIMIT}). Truncating.")
-            truncated_text = script_text[:DEEPGRAM_CHAR_LIMIT]
-            last_period = truncated_text.rfind('.')
-            script_text_to_send = truncated_text[:last_period + 1] if last_period != -1 else truncated_text
-            print(f"Truncated script length: {len(script_text_to_send)} chars.")
-        else:
-            script_text_to_send = script_text
-
         model = self.default_model_id_deepgram
-        source = {"text": script_text_to_send}
+        source = {"text": script_text}
         options = SpeakOptions(model=model)
 
         print(f"Requesting voiceover from Deepgram Aura (Model: {model})...")
         try:
             start_time = time.time()
-            response = self.deepgram_client.speak.v("1").save(output_path, source, options)
+            response = call_provider('deepgram', self.deepgram_client.speak.v("1").save, output_path, source, options)
             duration = time.time() - start_time
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
                  print(f"Successfully saved Deepgram voiceover to {output_path} in {duration:.2f}s")
@@ -141,42 +175,227 @@ class AssetGenerator:
         except Exception as e: print(f"ERROR: Failed during Deepgram TTS generation: {e}"); return False
 
 
+    def _tts_voice_profile(self, provider):
+        """(voice identity, voice settings) that determine a provider's audio, for cache keys."""
+        if provider == 'elevenlabs':
+            return f"{self.default_voice_id_elevenlabs}/{self.elevenlabs_model_id}", self.elevenlabs_voice_settings
+        if provider == 'deepgram':
+            return self.default_model_id_deepgram, {}
+        return provider, {}
+
+    def _synthesize_chunked(self, provider, script_text, output_path, cancel_event=None):
+        """
+        Splits the script into sentence-aligned chunks within the provider's character limit,
+        synthesizes them concurrently and joins the MP3 frames losslessly into output_path.
+        Once cancel_event is set no further chunks are requested.
+        Returns per-chunk timing metadata, or None if any chunk failed or it was cancelled.
+        """
+        generate = {
+            'cartesia': self._generate_cartesia_vo,
+            'deepgram': self._generate_deepgram_vo,
+            'elevenlabs': self._generate_elevenlabs_vo,
+        }[provider]
+        char_limit = self.tts_chunk_char_limits.get(provider, 2000)
+        chunks = chunk_text(script_text, char_limit)
+        if not chunks:
+            print("ERROR: Script text is empty after chunking.")
+            return None
+        print(f"Synthesizing {len(chunks)} chunk(s) with {provider} (limit {char_limit} chars, "
+              f"concurrency {self.tts_chunk_concurrency})...")
+
+        base_path = os.path.splitext(output_path)[0]
+        chunk_paths = [f"{base_path}.chunk{i:03d}.mp3" for i in range(len(chunks))]
+
+        voice, settings = self._tts_voice_profile(provider)
+        cached_chunks = set()
+
+        def synthesize(index):
+            previous_text = chunks[index - 1] if index > 0 else None
+            next_text = chunks[index + 1] if index + 1 < len(chunks) else None
+            cache_key = None
+            if self.tts_cache:
+                # Only ElevenLabs conditions on neighbouring text; for others it must not split the cache
+                cache_key = TTSCache.make_key(provider, voice, settings, chunks[index],
+                                              context=[previous_text, next_text] if provider == 'elevenlabs' else None)
+                if self.tts_cache.get(cache_key, chunk_paths[index]):
+                    cached_chunks.add(index)
+                    return True
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            success = generate(chunks[index], chunk_paths[index], previous_text=previous_text, next_text=next_text)
+            if success and cache_key:
+                self.tts_cache.put(cache_key, chunk_paths[index])
+            return success
+
+        start_time = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.tts_chunk_concurrency, len(chunks))),
+                                    thread_name_prefix=f'tts-{provider}') as pool:
+                results = list(pool.map(synthesize, range(len(chunks))))
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"Info: Synthesis with {provider} cancelled.")
+                return None
+            if not all(results):
+                print(f"ERROR: {results.count(False)}/{len(chunks)} chunk(s) failed with {provider}.")
+                return None
+            timings = concat_mp3_files(chunk_paths, output_path)
+            # Provider word timestamps, shifted onto the joined voiceover's timeline
+            chunk_words = {}
+            for i, (path, (start, _)) in enumerate(zip(chunk_paths, timings)):
+                if os.path.exists(path + ALIGNMENT_SUFFIX):
+                    with open(path + ALIGNMENT_SUFFIX, 'r', encoding='utf-8') as f:
+                        chunk_words[i] = words_from_character_alignment(json.load(f), offset=start)
+        except Exception as e:
+            print(f"ERROR: Chunked synthesis with {provider} failed: {e}")
+            return None
+        finally:
+            for path in chunk_paths:
+                for leftover in (path, path + ALIGNMENT_SUFFIX):
+                    if os.path.exists(leftover):
+                        try: os.remove(leftover)
+                        except OSError: pass
+
+        print(f"Synthesized and joined {len(chunks)} chunk(s) in {time.time() - start_time:.2f}s "
+              f"({len(cached_chunks)} from cache).")
+        if self.tts_cache:
+            print(f"TTS cache stats: {self.tts_cache.stats()}")
+        return {
+            'provider': provider,
+            'duration': timings[-1][1] if timings else 0.0,
+            'chunks': [{'index': i, 'text': text, 'start': round(start, 3), 'end': round(end, 3),
+                        'cached': i in cached_chunks, 'words': chunk_words.get(i)}
+                       for i, (text, (start, end)) in enumerate(zip(chunks, timings))],
+        }
+
+    def _write_caption_timings(self, voiceover_path, metadata):
+        """Derives word timings for captions (provider timestamps or local alignment) into captions.json."""
+        try:
+            words, sources = align_voiceover(voiceover_path, metadata)
+            if write_captions_file(os.path.dirname(voiceover_path), words, sources):
+                print(f"Caption timings written for {len(words)} words "
+                      f"({sources['provider']} chunk(s) from provider timestamps, {sources['estimated']} aligned locally).")
+        except Exception as e:
+            # Captions are optional; drop any stale timings so the renderer re-aligns from voiceover.json
+            print(f"Warning: Failed to derive caption timings: {e}")
+            try: os.remove(os.path.join(os.path.dirname(voiceover_path), CAPTIONS_FILE))
+            except OSError: pass
+
+    def _finalize_voiceover(self, temp_output_path, output_path, metadata):
+        """Moves a synthesized voiceover into place and writes its timing metadata and captions."""
+        try:
+            os.rename(temp_output_path, output_path)
+            with open(os.path.splitext(output_path)[0] + '.json', 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2)
+            print(f"Final voiceover file: {output_path} ({metadata['duration']:.1f}s)")
+            self._write_caption_timings(output_path, metadata)
+            return True
+        except OSError as e:
+            print(f"ERROR: Failed to finalize TTS output {temp_output_path} -> {output_path}: {e}")
+            # Try to clean up temp file
+            if os.path.exists(temp_output_path): os.remove(temp_output_path)
+            return False # Treat rename failure as overall failure
+
+    def _hedge_delay(self, provider, script_text):
+        """
+        Seconds to wait on a provider before racing the next one: its TTS_HEDGE_PERCENTILE request
+        latency times the number of chunk waves, or TTS_HEDGE_DEFAULT_DELAY until enough samples exist.
+        """
+        histogram = get_latency_histogram(provider)
+        if histogram.samples < self.tts_hedge_min_samples:
+            return self.tts_hedge_default_delay
+        chunks = len(chunk_text(script_text, self.tts_chunk_char_limits.get(provider, 2000)))
+        waves = max(1, math.ceil(chunks / max(1, self.tts_chunk_concurrency)))
+        return histogram.percentile(self.tts_hedge_percentile) * waves
+
+    def _generate_voiceover_hedged(self, script_text, output_path, providers):
+        """
+        Races providers in priority order: starts the first, and starts the next one when the
+        running ones exceed the hedge delay or fail. The first complete voiceover is kept; the
+        others are cancelled (no further chunk requests) and their output is removed.
+        """
+        cancel_event = threading.Event()
+        pending = list(providers)
+        running = {}
+
+        def discard(path):
+            if os.path.exists(path):
+                try: os.remove(path)
+                except OSError: pass
+
+        def start(provider):
+            temp_output_path = os.path.splitext(output_path)[0] + f".{provider}.tmp"
+            running[pool.submit(self._synthesize_chunked, provider, script_text, temp_output_path, cancel_event)] = \
+                (provider, temp_output_path)
+            return time.monotonic() + self._hedge_delay(provider, script_text)
+
+        winner = None
+        pool = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix='tts-hedge')
+        try:
+            print(f"--- Attempting TTS Provider: {pending[0]} (hedging enabled) ---")
+            hedge_at = start(pending.pop(0))
+            while running and winner is None:
+                timeout = max(0.0, hedge_at - time.monotonic()) if pending else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done: # Slower than usual: race the next provider
+                    print(f"--- No voiceover after hedge delay; also starting TTS Provider: {pending[0]} ---")
+                    hedge_at = start(pending.pop(0))
+                    continue
+                for future in done:
+                    provider, temp_output_path = running.pop(future)
+                    metadata = future.result()
+                    if metadata and winner is None:
+                        winner = (provider, temp_output_path, metadata)
+                        continue
+                    discard(temp_output_path)
+                    if not metadata and pending and winner is None:
+                        print(f"--- TTS provider {provider} failed; starting {pending[0]} ---")
+                        hedge_at = start(pending.pop(0))
+        finally:
+            cancel_event.set()
+            for future, (provider, temp_output_path) in running.items():
+                print(f"Info: Cancelling slower TTS provider {provider}.")
+                future.add_done_callback(lambda _, path=temp_output_path: discard(path))
+            pool.shutdown(wait=False)
+
+        if winner is None:
+            print("--- ERROR: All configured TTS providers failed. ---")
+            return False
+        provider, temp_output_path, metadata = winner
+        print(f"--- Successfully generated voiceover using: {provider} ---")
+        return self._finalize_voiceover(temp_output_path, output_path, metadata)
+
     def _generate_voiceover(self, script_text, output_path):
-        """Generates voiceover using configured TTS providers based on priority."""
+        """
+        Generates voiceover using configured TTS providers based on priority, or races them
+        (TTS_HEDGING_ENABLED). Providers whose circuit breaker is open are skipped without a request.
+        Writes chunk timing metadata next to the audio as <name>.json.
+        """
         print("\n--- Generating Voiceover (Attempting Providers by Priority) ---")
+        providers = []
         for provider in self.tts_provider_priority:
+            breaker = get_circuit_breaker(provider)
+            if breaker.is_open():
+                print(f"Info: Skipping TTS provider {provider}: circuit open for another {breaker.retry_in():.0f}s.")
+                continue
+            providers.append(provider)
+        if self.tts_hedging_enabled and len(providers) > 1:
+            return self._generate_voiceover_hedged(script_text, output_path, providers)
+
+        for provider in providers:
             print(f"--- Attempting TTS Provider: {provider} ---")
-            success = False
             temp_output_path = os.path.splitext(output_path)[0] + f".{provider}.tmp" # Use temp file
 
-            if provider == 'cartesia':
-                success = self._generate_cartesia_vo(script_text, temp_output_path)
-            elif provider == 'deepgram':
-                 success = self._generate_deepgram_vo(script_text, temp_output_path)
-            elif provider == 'elevenlabs':
-                 success = self._generate_elevenlabs_vo(script_text, temp_output_path)
-            else:
-                 print(f"Warning: Unknown TTS provider in priority list: {provider}")
+            metadata = self._synthesize_chunked(provider, script_text, temp_output_path)
 
-            if success:
+            if metadata:
                  print(f"--- Successfully generated voiceover using: {provider} ---")
-                 # Rename temp file to final output path
-                 try:
-                     os.rename(temp_output_path, output_path)
-                     print(f"Final voiceover file: {output_path}")
-                     return True
-                 except OSError as e:
-                      print(f"ERROR: Failed to rename temp TTS file {temp_output_path} to {output_path}: {e}")
-                      # Try to clean up temp file
-                      if os.path.exists(temp_output_path): os.remove(temp_output_path)
-                      return False # Treat rename failure as overall failure
+                 return self._finalize_voiceover(temp_output_path, output_path, metadata)
 
             print(f"--- Failed or skipped TTS provider: {provider}. Trying next... ---")
             # Clean up failed temp file
             if os.path.exists(temp_output_path):
                  try: os.remove(temp_output_path)
                  except OSError: pass
-            time.sleep(1)
 
         print("--- ERROR: All configured TTS providers failed. ---")
         return False # All providers failed
@@ -196,7 +415,7 @@ class AssetGenerator:
         }
         print(f"Searching Pexels for videos matching query: '{query}'...")
         try:
-            response = requests.get(api_endpoint, headers=headers, params=params, timeout=30)
+            response = call_provider('pexels', get_session(api_endpoint).get, api_endpoint, headers=headers, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             videos = data.get('videos', [])
@@ -222,85 +441,101 @@ class AssetGenerator:
             return []
 
 
-    # --- Visual Generation Method ---
-    # <<< ENSURE THIS METHOD IS CORRECTLY DEFINED >>>
-    def _generate_visuals(self, script_text, visuals_dir, image_style):
-        """Generates images (DALL-E) and tries to find videos (Pexels)."""
-        print("Generating visuals...")
-        os.makedirs(visuals_dir, exist_ok=True)
-        generated_visual_paths = []
-
-        script_segments = [s.strip() for s in script_text.split('.') if len(s.strip()) > 10]
-        if not script_segments: script_segments = [s.strip() for s in script_text.splitlines() if len(s.strip()) > 10]
-        if not script_segments: script_segments = [script_text]
+    # --- Visual Generation Methods ---
 
+    def _acquire_visual(self, slot_index, script_segments, visuals_dir, image_style):
+        """
+        Acquires the visual for one slot: Pexels video first, DALL-E image as fallback.
+        Retries move on to the next script segment, as the sequential loop used to; transient
+        API errors are retried with backoff by src.resilience, and providers whose circuit
+        breaker is open are skipped. Provider rate limiters cap in-flight API calls.
+        Returns the downloaded (temporary) file path, or None.
+        """
         num_segments = len(script_segments)
-        visuals_needed = self.target_visuals
-        print(f"Targeting {visuals_needed} visuals based on {num_segments} script segments.")
-
-        segment_index = 0
-        visual_count = 0
-        max_retries_per_visual = 2
-
-        while visual_count < visuals_needed and segment_index < num_segments * max_retries_per_visual :
-            current_segment = script_segments[segment_index % num_segments]
-            visual_filename_base = f"visual_{visual_count + 1:02d}"
-            print(f"\n--- Attempting visual {visual_count + 1}/{visuals_needed} for segment: '{current_segment[:50]}...' ---")
+        temp_base = os.path.join(visuals_dir, f".slot_{slot_index + 1:02d}")
+        max_attempts = 2
 
-            found_visual = False
-            retry_count = 0 # Reset retry count for each visual attempt
+        for attempt in range(max_attempts):
+            segment = script_segments[(slot_index + attempt) % num_segments]
+            print(f"--- Visual {slot_index + 1} (attempt {attempt + 1}) for segment: '{segment[:50]}...' ---")
 
-            # Try Pexels first if key exists (only on first try for a segment number)
-            if self.pexels_api_key and (segment_index < num_segments): # Try Pexels only on the first pass
-                query = current_segment[:50]
-                pexels_videos = self._search_pexels_videos(query, per_page=1)
+            # Try Pexels first if key exists (only on the first attempt)
+            if self.pexels_api_key and attempt == 0 and not get_circuit_breaker('pexels').is_open():
+                pexels_videos = self._search_pexels_videos(segment[:50], per_page=1)
                 if pexels_videos:
                     video_url = pexels_videos[0]
                     file_extension = os.path.splitext(video_url.split('?')[0])[-1] or ".mp4"
-                    save_path = os.path.join(visuals_dir, visual_filename_base + file_extension)
+                    save_path = temp_base + file_extension
                     if self._download_file(video_url, save_path):
-                        generated_visual_paths.append(save_path)
-                        visual_count += 1
-                        found_visual = True
-                    else: print("Warning: Failed to download Pexels video.")
-                else: print("Info: No suitable Pexels video found for this segment.")
+                        return save_path
+                    print(f"Warning: Failed to download Pexels video for visual {slot_index + 1}.")
+                else: print(f"Info: No suitable Pexels video found for visual {slot_index + 1}.")
 
             # Fallback/Alternative: DALL-E Image
-            if not found_visual:
-                 print("Attempting DALL-E image generation...")
-                 try:
-                     dalle_prompt = f"{image_style} scene illustrating: {current_segment[:150]}"
-                     image_urls = self.llm_service.generate_images(prompt=dalle_prompt, n=1, size=self.dalle_image_size)
-                     if image_urls:
-                         image_url = image_urls[0]
-                         save_path = os.path.join(visuals_dir, visual_filename_base + ".jpg")
-                         if self._download_file(image_url, save_path):
-                             generated_visual_paths.append(save_path)
-                             visual_count += 1
-                             found_visual = True
-                         else: print("Warning: Failed to download DALL-E image.")
-                     else: print("Warning: DALL-E did not return image URLs.")
-                 except Exception as e:
-                     print(f"ERROR: Failed during DALL-E generation/download: {e}")
-
-
-            segment_index += 1 # Always advance segment index
-            if not found_visual:
-                retry_count = (segment_index // num_segments) # Calculate retries based on cycles
-                if retry_count < max_retries_per_visual:
-                     print(f"Retrying visual generation (Cycle {retry_count + 1})...")
-                     time.sleep(2)
-                else:
-                     # Stop trying for this specific visual number if max retries hit
-                     print(f"Warning: Max retries reached for visual {visual_count + 1}. Moving on to request next visual.")
-                     # How to advance? We need to ensure visual_count loop terminates.
-                     # If we are stuck, let's just break the loop or increment segment enough to stop soon.
-                     # This logic needs careful thought to avoid infinite loops AND get enough visuals.
-                     # For now, let's just let the outer loop condition handle termination.
-                     pass
-
-
-        print(f"\nVisual generation finished. Acquired {len(generated_visual_paths)} visuals.")
+            if get_circuit_breaker('dalle').is_open():
+                print(f"Info: DALL-E circuit open; giving up on visual {slot_index + 1}.")
+                break
+            try:
+                dalle_prompt = f"{image_style} scene illustrating: {segment[:150]}"
+                # Keyed by slot: slots sharing a segment (or a retry reaching the next slot's segment)
+                # must not reuse one cached image; only a rerun of the same slot does
+                image_urls = self.llm_service.generate_images(prompt=dalle_prompt, n=1, size=self.dalle_image_size,
+                                                              variant=f"slot-{slot_index}")
+                if image_urls:
+                    save_path = temp_base + ".jpg"
+                    if self._download_file(image_urls[0], save_path):
+                        return save_path
+                    print(f"Warning: Failed to download DALL-E image for visual {slot_index + 1}.")
+                else: print(f"Warning: DALL-E did not return image URLs for visual {slot_index + 1}.")
+            except Exception as e:
+                print(f"ERROR: Failed during DALL-E generation/download for visual {slot_index + 1}: {e}")
+
+        print(f"Warning: Max retries reached for visual {slot_index + 1}.")
+        return None
+
+    def _generate_visuals(self, script_text, visuals_dir, image_style):
+        """
+        Generates images (DALL-E) and tries to find videos (Pexels), acquiring all
+        visual slots concurrently. Output is numbered visual_NN in script order.
+        """
+        print("Generating visuals...")
+        os.makedirs(visuals_dir, exist_ok=True)
+
+        script_segments = [s.strip() for s in script_text.split('.') if len(s.strip()) > 10]
+        if not script_segments: script_segments = [s.strip() for s in script_text.splitlines() if len(s.strip()) > 10]
+        if not script_segments: script_segments = [script_text]
+
+        visuals_needed = self.target_visuals
+        print(f"Targeting {visuals_needed} visuals based on {len(script_segments)} script segments "
+              f"(concurrency: {self.visual_concurrency}).")
+
+        start_time = time.time()
+        slot_paths = [None] * visuals_needed
+        with ThreadPoolExecutor(max_workers=max(1, min(self.visual_concurrency, visuals_needed)),
+                                thread_name_prefix='visual') as pool:
+            futures = {pool.submit(self._acquire_visual, i, script_segments, visuals_dir, image_style): i
+                       for i in range(visuals_needed)}
+            for future in as_completed(futures):
+                try:
+                    slot_paths[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"ERROR: Unexpected failure acquiring visual {futures[future] + 1}: {e}")
+
+        # Replace visuals from any earlier attempt, then number the acquired ones
+        # consecutively in slot (script) order so the output is deterministic.
+        for name in os.listdir(visuals_dir):
+            if name.startswith('visual_'):
+                try: os.remove(os.path.join(visuals_dir, name))
+                except OSError: pass
+        generated_visual_paths = []
+        for temp_path in [p for p in slot_paths if p]:
+            final_path = os.path.join(visuals_dir, f"visual_{len(generated_visual_paths) + 1:02d}"
+                                      + os.path.splitext(temp_path)[1])
+            os.replace(temp_path, final_path)
+            generated_visual_paths.append(final_path)
+
+        print(f"\nVisual generation finished in {time.time() - start_time:.2f}s. "
+              f"Acquired {len(generated_visual_paths)} visuals.")
         # Return None if generation failed badly, or the list otherwise
         if not generated_visual_paths and visuals_needed > 0:
              return None
@@ -308,17 +543,20 @@ class AssetGenerator:
 
 
     # --- Main Processing Method ---
-    def process_topic(self, topic_name):
-        """Generates assets (voiceover, visuals) for a topic, updates DB status."""
+    def process_topic(self, topic_name, worker_id=None):
+        """
+        Generates assets (voiceover, visuals) for a topic, updates DB status.
+        worker_id: the claiming worker; status writes then apply only while it holds the lease.
+        """
         print(f"\n===== Starting Asset Generation for: '{topic_name}' =====")
         details = self.db_manager.get_topic_details(topic_name)
 
         if not details: print(f"ERROR: Topic '{topic_name}' not found."); return False
-        if details.get('pipeline_status') != 'PENDING_ASSETS': print(f"Warning: Topic '{topic_name}' not PENDING_ASSETS. Skipping."); return False
+        if details.get('pipeline_status') not in ('PENDING_ASSETS', 'IN_PROGRESS_ASSETS'): print(f"Warning: Topic '{topic_name}' not PENDING_ASSETS. Skipping."); return False
         script_path = details.get('generated_script_path')
         if not script_path or not os.path.exists(script_path):
             print(f"ERROR: Script path '{script_path}' invalid for topic '{topic_name}'.")
-            self.db_manager.update_status(topic_name, 'FAILED', last_error="Script file missing/invalid"); return False
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="Script file missing/invalid"); return False
 
         topic_slug = slugify(topic_name)
         topic_assets_dir = os.path.join(self.assets_dir, topic_slug)
@@ -330,12 +568,12 @@ class AssetGenerator:
             with open(script_path, 'r', encoding='utf-8') as f: script_content = f.read()
         except Exception as e:
             print(f"ERROR: Failed to read script {script_path}: {e}")
-            self.db_manager.update_status(topic_name, 'FAILED', last_error=f"Failed read script: {e}"); return False
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error=f"Failed read script: {e}"); return False
 
         # Generate Voiceover
         vo_success = self._generate_voiceover(script_content, voiceover_path)
         if not vo_success:
-            print("ERROR: Voiceover generation failed."); self.db_manager.update_status(topic_name, 'FAILED', last_error="Voiceover gen failed"); return False
+            print("ERROR: Voiceover generation failed."); self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="Voiceover gen failed"); return False
 
         # Generate Visuals
         # <<< ENSURE THIS CALL IS CORRECT >>>
@@ -345,10 +583,10 @@ class AssetGenerator:
         # Check Visuals
         if visual_paths is None: # Indicates internal failure in _generate_visuals
             print(f"ERROR: Visual generation failed internally.")
-            self.db_manager.update_status(topic_name, 'FAILED', last_error="Visual generation failed"); return False
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="Visual generation failed"); return False
         elif len(visual_paths) < math.ceil(self.target_visuals * 0.75): # Check if enough were generated
              print(f"ERROR: Insufficient visuals ({len(visual_paths)}/{self.target_visuals}).")
-             self.db_manager.update_status(topic_name, 'FAILED', last_error=f"Insufficient visuals ({len(visual_paths)}/{self.target_visuals})"); return False
+             self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error=f"Insufficient visuals ({len(visual_paths)}/{self.target_visuals})"); return False
         else:
             print(f"Successfully generated {len(visual_paths)} visuals.")
 
@@ -356,9 +594,9 @@ class AssetGenerator:
         # Update Database
         print("\n--- Finalizing Asset Generation ---")
         final_status = 'PENDING_EDIT'
-        success = self.db_manager.update_status(topic=topic_name, status=final_status, last_error='')
+        success = self.db_manager.update_status(topic=topic_name, status=final_status, worker_id=worker_id, last_error='')
         if success:
             print(f"===== Asset Generation SUCCESS for '{topic_name}'. Status set to {final_status}. ====="); return True
         else:
              print(f"ERROR: Failed to update DB status after asset gen.")
-             self.db_manager.update_status(topic_name, 'FAILED', last_error="DB update fail after asset gen"); return False # Set final status to FAILED
\ No newline at end of file
+             self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="DB update fail after asset gen"); return False # Set final status to FAILED
\ No newline at end of file
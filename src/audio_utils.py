@@ -0,0 +1,207 @@
+# src/audio_utils.py
+"""
+Audio helpers.
+- Dependency-free MP3 frame parsing for durations and lossless frame-level
+  concatenation (no decode/re-encode) of TTS output chunks.
+- ffmpeg/ffprobe wrappers for probing, silence detection, segment extraction and PCM decoding.
+"""
+import os
+import re
+import subprocess
+
+# Bitrates (kbps) for Layer III, indexed by the 4-bit bitrate field
+_BITRATES_MPEG1_L3 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+_BITRATES_MPEG2_L3 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000], # MPEG1
+    2: [22050, 24000, 16000], # MPEG2
+    0: [11025, 12000, 8000],  # MPEG2.5
+}
+
+
+def _id3v2_size(data):
+    """Length of a leading ID3v2 tag (0 if none)."""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _parse_frame_header(data, offset):
+    """Returns (frame_length, samples, sample_rate) for a Layer III frame at offset, or None."""
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03 # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5, 1 = reserved
+    layer = (b1 >> 1) & 0x03   # 1 = Layer III
+    if version == 1 or layer != 1:
+        return None
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    if bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    padding = (b2 >> 1) & 0x01
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    if version == 3:
+        bitrate = _BITRATES_MPEG1_L3[bitrate_index] * 1000
+        return (144 * bitrate // sample_rate + padding, 1152, sample_rate)
+    bitrate = _BITRATES_MPEG2_L3[bitrate_index] * 1000
+    return (72 * bitrate // sample_rate + padding, 576, sample_rate)
+
+
+def _is_vbr_info_frame(data, offset, length):
+    """True for a Xing/Info/VBRI header frame (metadata only, describes just that one file)."""
+    frame = data[offset:offset + min(length, 64)]
+    return b'Xing' in frame or b'Info' in frame or b'VBRI' in frame
+
+
+def iter_mp3_frames(data):
+    """Yields (offset, length, samples, sample_rate) for each audio frame in MP3 bytes."""
+    offset = _id3v2_size(data)
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b'TAG': # ID3v1 trailer
+        end -= 128
+    first = True
+    while offset < end:
+        header = _parse_frame_header(data, offset)
+        if header is None or offset + header[0] > end:
+            offset += 1 # Resync on garbage between frames
+            continue
+        length, samples, sample_rate = header
+        if not (first and _is_vbr_info_frame(data, offset, length)):
+            yield offset, length, samples, sample_rate
+        first = False
+        offset += length
+
+
+def get_mp3_duration(path):
+    """Duration of an MP3 file in seconds, from its frame headers (no decoding)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return sum(samples / sample_rate for _, _, samples, sample_rate in iter_mp3_frames(data))
+
+
+def concat_mp3_files(input_paths, output_path):
+    """
+    Losslessly joins MP3 files by copying their audio frames back to back.
+    Tags and per-file Xing/Info headers are dropped so players see one continuous stream.
+    Returns a list of (start_seconds, end_seconds) for each input within the output.
+    """
+    timings = []
+    position = 0.0
+    temp_path = output_path + ".part"
+    with open(temp_path, 'wb') as out:
+        for path in input_paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            start = position
+            for offset, length, samples, sample_rate in iter_mp3_frames(data):
+                out.write(data[offset:offset + length])
+                position += samples / sample_rate
+            timings.append((start, position))
+    os.replace(temp_path, output_path)
+    return timings
+
+
+# --- ffmpeg-based helpers ---
+
+def probe_duration(path):
+    """Media duration in seconds via ffprobe, or None if it cannot be determined."""
+    command = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+               '-of', 'default=noprint_wrappers=1:nokey=1', path]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True, timeout=60)
+        return float(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"Warning: Could not probe duration of {path}: {e}")
+        return None
+
+
+def detect_silences(path, noise_db=-35, min_silence_seconds=0.5):
+    """Returns [(start, end)] of silent stretches using ffmpeg's silencedetect filter."""
+    command = ['ffmpeg', '-hide_banner', '-nostats', '-i', path,
+               '-af', f'silencedetect=noise={noise_db}dB:d={min_silence_seconds}', '-f', 'null', '-']
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True, timeout=600)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Warning: Silence detection failed for {path}: {e}")
+        return []
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        match = re.search(r'silence_start: (-?[\d.]+)', line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = re.search(r'silence_end: ([\d.]+)', line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_split_points(duration, silences, max_segment_seconds, min_segment_seconds=None):
+    """
+    Plans [(start, end)] segments covering [0, duration], none longer than max_segment_seconds.
+    Each cut is placed at the midpoint of the latest silence in the allowed window,
+    falling back to a hard cut at the maximum length when there is no silence.
+    """
+    if min_segment_seconds is None:
+        min_segment_seconds = max_segment_seconds / 2
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    segments = []
+    start = 0.0
+    while duration - start > max_segment_seconds:
+        window = [m for m in midpoints if start + min_segment_seconds <= m <= start + max_segment_seconds]
+        cut = window[-1] if window else start + max_segment_seconds
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, duration))
+    return segments
+
+
+def extract_segment(path, start, end, output_path):
+    """Copies [start, end) of an audio file into output_path without re-encoding. Returns True on success."""
+    command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-ss', f"{start:.3f}", '-i', path,
+               '-t', f"{end - start:.3f}", '-vn', '-c', 'copy', output_path]
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True, timeout=300)
+        return os.path.exists(output_path) and os.path.getsize(output_path) > 0
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"ERROR: Failed to extract audio segment {start:.1f}-{end:.1f}s from {path}: {e}")
+        return False
+
+
+def decode_pcm(path, sample_rate=16000):
+    """Decodes audio to mono signed 16-bit little-endian PCM bytes via ffmpeg, or None on failure."""
+    command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', path,
+               '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-']
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, timeout=300)
+        return result.stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Warning: Could not decode {path} to PCM: {e}")
+        return None
+
+
+def decode_pcm_with_loudness(path, sample_rate=8000):
+    """
+    Single ffmpeg pass that measures integrated loudness (EBU R128, on the original signal)
+    and decodes mono s16le PCM at sample_rate. Returns (pcm_bytes, lufs or None), or (None, None) on failure.
+    """
+    command = ['ffmpeg', '-hide_banner', '-nostats', '-i', path,
+               '-filter_complex', '[0:a:0]asplit=2[measure][decode];[measure]ebur128=framelog=quiet[measured]',
+               '-map', '[measured]', '-f', 'null', '-',
+               '-map', '[decode]', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', 'pipe:1']
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, timeout=300)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Warning: Could not analyze {path}: {e}")
+        return None, None
+    # The summary's integrated loudness line, e.g. "    I:         -14.2 LUFS"
+    matches = re.findall(r'\bI:\s+(-?[\d.]+|-inf) LUFS', result.stderr.decode('utf-8', errors='replace'))
+    lufs = float(matches[-1]) if matches and matches[-1] != '-inf' else None
+    return result.stdout, lufs
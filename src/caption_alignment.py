@@ -0,0 +1,211 @@
+# src/caption_alignment.py
+"""
+Word-level caption timing without re-transcribing the voiceover.
+- Provider timestamps (ElevenLabs character alignment) are used where the TTS chunk has them.
+- Otherwise words are aligned locally against the generated audio: an RMS energy envelope
+  finds the pauses, the longest pauses are matched to punctuation breaks in the known
+  script text, and words inside each phrase share its voiced time by length.
+Timings are stored per topic in a compact captions.json sidecar that the renderer reads.
+"""
+import json
+import os
+
+import numpy as np
+
+from .config_manager import manager as config
+from .audio_utils import decode_pcm
+
+ALIGNMENT_SUFFIX = '.alignment.json' # Provider timestamps written next to a TTS chunk
+CAPTIONS_FILE = 'captions.json'
+CAPTIONS_FORMAT_VERSION = 1
+
+_BREAK_PUNCTUATION = (',', '.', '!', '?', ';', ':')
+_SENTENCE_END = ('.', '!', '?')
+_ENVELOPE_FRAME_SECONDS = 0.01
+_SAMPLE_RATE = 16000
+
+
+def words_from_character_alignment(alignment, offset=0.0):
+    """
+    Collapses character timestamps ({'characters', 'character_start_times_seconds',
+    'character_end_times_seconds'}) into [[word, start, end]], shifted by offset seconds.
+    """
+    words = []
+    current, word_start, word_end = "", 0.0, 0.0
+    for char, start, end in zip(alignment.get('characters', []),
+                                alignment.get('character_start_times_seconds', []),
+                                alignment.get('character_end_times_seconds', [])):
+        if char.isspace():
+            if current:
+                words.append([current, round(offset + word_start, 3), round(offset + word_end, 3)])
+                current = ""
+            continue
+        if not current:
+            word_start = start
+        current += char
+        word_end = end
+    if current:
+        words.append([current, round(offset + word_start, 3), round(offset + word_end, 3)])
+    return words
+
+
+def find_pauses(pcm, sample_rate=_SAMPLE_RATE, min_pause_seconds=0.12):
+    """Returns [(start, end)] of low-energy stretches in 16-bit mono PCM, from a 10 ms RMS envelope."""
+    samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32)
+    frame_length = int(sample_rate * _ENVELOPE_FRAME_SECONDS)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return []
+    rms = np.sqrt(np.mean(np.square(samples[:frame_count * frame_length].reshape(frame_count, frame_length)), axis=1))
+    # Relative to loud speech (-20 dB), so the threshold adapts to the voice and mastering level
+    quiet = rms < max(np.percentile(rms, 95) * 0.1, 1.0)
+    # Boundaries of quiet runs: +1 where a run starts, -1 just after it ends
+    edges = np.diff(np.concatenate(([0], quiet.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    min_frames = int(min_pause_seconds / _ENVELOPE_FRAME_SECONDS)
+    return [(float(start * _ENVELOPE_FRAME_SECONDS), float(end * _ENVELOPE_FRAME_SECONDS))
+            for start, end in zip(starts, ends) if end - start >= min_frames]
+
+
+def _word_weight(word):
+    """Approximate spoken length of a word (its letters and digits)."""
+    return max(1, sum(char.isalnum() for char in word))
+
+
+def _spread(words, start, end):
+    """Spreads words over [start, end] in proportion to their weights."""
+    weights = [_word_weight(word) for word in words]
+    total = float(sum(weights))
+    timed = []
+    position = start
+    for word, weight in zip(words, weights):
+        length = (end - start) * weight / total
+        timed.append([word, round(position, 3), round(position + length, 3)])
+        position += length
+    return timed
+
+
+def estimate_word_timings(text, span_start, span_end, pauses=()):
+    """
+    Aligns the words of text to [span_start, span_end] using the detected pauses.
+    Returns [[word, start, end]].
+    """
+    words = text.split()
+    if not words or span_end <= span_start:
+        return []
+    inner = []
+    for pause_start, pause_end in pauses:
+        if pause_end <= span_start or pause_start >= span_end:
+            continue
+        if pause_start <= span_start: # Leading silence: speech starts after it
+            span_start = min(pause_end, span_end)
+        elif pause_end >= span_end: # Trailing silence: speech ends before it
+            span_end = max(pause_start, span_start)
+        else:
+            inner.append((pause_start, pause_end))
+    if span_end <= span_start:
+        return []
+
+    # Where each punctuation break would fall if speech were uniform, as a guide for matching pauses
+    weights = [_word_weight(word) for word in words]
+    total = float(sum(weights))
+    breaks = [i for i, word in enumerate(words[:-1]) if word.endswith(_BREAK_PUNCTUATION)]
+    cumulative = np.cumsum(weights)
+    expected = {i: span_start + (span_end - span_start) * float(cumulative[i]) / total for i in breaks}
+
+    # The longest pauses are the punctuation breaks; match each to the nearest unclaimed break
+    anchors = {}
+    for pause in sorted(inner, key=lambda p: p[1] - p[0], reverse=True)[:len(breaks)]:
+        midpoint = (pause[0] + pause[1]) / 2
+        candidates = [i for i in breaks if i not in anchors]
+        if candidates:
+            anchors[min(candidates, key=lambda i: abs(expected[i] - midpoint))] = pause
+    # Keep only anchors that are in order in both text and time
+    ordered = []
+    for index in sorted(anchors):
+        if not ordered or anchors[index][0] >= ordered[-1][1][1]:
+            ordered.append((index, anchors[index]))
+
+    timed = []
+    phrase_start_word, phrase_start_time = 0, span_start
+    for index, (pause_start, pause_end) in ordered:
+        timed.extend(_spread(words[phrase_start_word:index + 1], phrase_start_time, pause_start))
+        phrase_start_word, phrase_start_time = index + 1, pause_end
+    timed.extend(_spread(words[phrase_start_word:], phrase_start_time, span_end))
+    return timed
+
+
+def align_voiceover(voiceover_path, metadata):
+    """
+    Word timings for a whole voiceover from its voiceover.json metadata.
+    Chunks carrying provider 'words' are used as-is; the rest are aligned locally
+    (the audio is decoded once, only if needed). Returns (words, sources).
+    """
+    chunks = metadata.get('chunks', [])
+    pauses = None
+    if any(not chunk.get('words') for chunk in chunks):
+        pcm = decode_pcm(voiceover_path, _SAMPLE_RATE)
+        pauses = find_pauses(pcm) if pcm else []
+    words = []
+    sources = {'provider': 0, 'estimated': 0}
+    for chunk in chunks:
+        if chunk.get('words'):
+            words.extend(chunk['words'])
+            sources['provider'] += 1
+        else:
+            words.extend(estimate_word_timings(chunk['text'], chunk['start'], chunk['end'], pauses))
+            sources['estimated'] += 1
+    return words, sources
+
+
+def write_captions_file(topic_dir, words, sources=None):
+    """Writes the compact captions.json sidecar. Returns its path, or None on failure."""
+    path = os.path.join(topic_dir, CAPTIONS_FILE)
+    payload = {'version': CAPTIONS_FORMAT_VERSION, 'sources': sources or {}, 'words': words}
+    try:
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        return path
+    except OSError as e:
+        print(f"Warning: Could not write caption timings to {path}: {e}")
+        return None
+
+
+def load_caption_words(topic_dir):
+    """Returns [[word, start, end]] from a topic's captions.json, or None if missing/outdated."""
+    try:
+        with open(os.path.join(topic_dir, CAPTIONS_FILE), 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get('version') != CAPTIONS_FORMAT_VERSION:
+        return None
+    return payload.get('words')
+
+
+def build_caption_chunks(words, words_per_chunk=None, max_gap_seconds=0.4):
+    """
+    Groups timed words into [(start, end, text)] captions of up to WORDS_PER_CAPTION_CHUNK words,
+    never spanning a sentence end. Short gaps are bridged so captions don't flicker off between words.
+    """
+    words_per_chunk = words_per_chunk or config.get('WORDS_PER_CAPTION_CHUNK', 3)
+    groups = []
+    current = []
+    for word in words:
+        current.append(word)
+        if len(current) >= words_per_chunk or word[0].endswith(_SENTENCE_END):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+
+    chunks = []
+    for index, group in enumerate(groups):
+        start, end = group[0][1], group[-1][2]
+        if index + 1 < len(groups):
+            next_start = groups[index + 1][0][1]
+            if 0 <= next_start - end <= max_gap_seconds:
+                end = next_start
+        chunks.append((start, end, " ".join(word[0] for word in group)))
+    return chunks
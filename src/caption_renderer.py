@@ -0,0 +1,265 @@
+# src/caption_renderer.py
+"""
+Caption overlays for the video renderer.
+- Glyphs are rasterized once per (font, size, colours, stroke) into a glyph atlas.
+- Each caption chunk is assembled from the atlas into an RGBA overlay once and cached.
+- Overlays are alpha-blended onto RGB frames with vectorized integer NumPy maths,
+  touching only the overlay's bounding box.
+"""
+import bisect
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from .config_manager import manager as config
+
+_atlas_cache = {}
+_atlas_lock = threading.Lock()
+
+
+def _rgb(color):
+    """Accepts colour names, hex strings or RGB tuples."""
+    if isinstance(color, str):
+        return ImageColor.getrgb(color)[:3]
+    return tuple(int(c) for c in color[:3])
+
+
+def _load_font(name, size):
+    """Loads a TrueType font by name, falling back to the configured fallbacks and then PIL's default."""
+    candidates = [name, f"{name}.ttf", f"{name.lower()}.ttf"] if name else []
+    candidates += config.get('CAPTION_FALLBACK_FONTS', [])
+    for candidate in candidates:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    print(f"Warning: Caption font '{name}' not found; using PIL's default font.")
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError: # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+class GlyphAtlas:
+    """Pre-rasterized RGBA glyphs (fill + stroke) and advances for one font/size/colour combination."""
+
+    def __init__(self, font_name, font_size, color, stroke_color=None, stroke_width=0):
+        self.font = _load_font(font_name, font_size)
+        self.color = _rgb(color)
+        self.stroke_color = _rgb(stroke_color) if stroke_color else self.color
+        self.stroke_width = int(stroke_width or 0)
+        ascent, descent = self.font.getmetrics()
+        self.pad = self.stroke_width + 2
+        self.line_height = ascent + descent
+        self.glyph_height = self.line_height + 2 * self.pad
+        self._glyphs = {}
+        self._lock = threading.Lock()
+
+    def glyph(self, char):
+        """Returns (rgba float32 array normalised to 0-1, advance) for a character, rasterizing on first use."""
+        with self._lock:
+            cached = self._glyphs.get(char)
+        if cached is not None:
+            return cached
+        advance = self.font.getlength(char)
+        width = int(np.ceil(advance)) + 2 * self.pad
+        fill_mask = Image.new('L', (width, self.glyph_height), 0)
+        ImageDraw.Draw(fill_mask).text((self.pad, self.pad), char, font=self.font, fill=255)
+        fill = np.asarray(fill_mask, dtype=np.float32) / 255.0
+        if self.stroke_width:
+            stroke_mask = Image.new('L', (width, self.glyph_height), 0)
+            ImageDraw.Draw(stroke_mask).text((self.pad, self.pad), char, font=self.font, fill=255,
+                                             stroke_width=self.stroke_width, stroke_fill=255)
+            alpha = np.asarray(stroke_mask, dtype=np.float32) / 255.0
+        else:
+            alpha = fill
+        # Fill colour where the glyph body is, stroke colour in the outline around it
+        rgb = (np.array(self.stroke_color, dtype=np.float32) * (1.0 - fill[..., None])
+               + np.array(self.color, dtype=np.float32) * fill[..., None]) / 255.0
+        rgba = np.dstack([rgb, alpha])
+        entry = (rgba, advance)
+        with self._lock:
+            self._glyphs[char] = entry
+        return entry
+
+    def text_width(self, text):
+        return sum(self.glyph(char)[1] for char in text)
+
+
+def get_glyph_atlas(font_name, font_size, color, stroke_color=None, stroke_width=0):
+    """Process-wide atlas cache, so every caption in a style shares one set of rasterized glyphs."""
+    key = (font_name, font_size, str(color), str(stroke_color), stroke_width)
+    with _atlas_lock:
+        atlas = _atlas_cache.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(font_name, font_size, color, stroke_color, stroke_width)
+            _atlas_cache[key] = atlas
+        return atlas
+
+
+class CaptionOverlay:
+    """A rasterized caption, stored in the form the per-frame blend needs."""
+
+    def __init__(self, rgba, x, y):
+        self.x, self.y = x, y
+        self.height, self.width = rgba.shape[:2]
+        alpha = np.rint(rgba[..., 3:4] * 255).astype(np.uint16)
+        # Premultiplied colour and inverse alpha, both 0-255 scaled, so blending is two multiplies and a shift
+        self.premultiplied = (np.rint(rgba[..., :3] * 255).astype(np.uint16) * alpha)
+        self.inverse_alpha = 255 - alpha
+        self.rgba = np.rint(rgba * 255).astype(np.uint8)
+
+    def composite(self, frame):
+        """Blends the overlay onto an HxWx3 uint8 frame in place. Returns the frame."""
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(self.x, 0), max(self.y, 0)
+        x1, y1 = min(self.x + self.width, frame_w), min(self.y + self.height, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return frame
+        ox, oy = x0 - self.x, y0 - self.y
+        region = frame[y0:y1, x0:x1]
+        blended = region.astype(np.uint16)
+        blended *= self.inverse_alpha[oy:oy + y1 - y0, ox:ox + x1 - x0]
+        blended += self.premultiplied[oy:oy + y1 - y0, ox:ox + x1 - x0]
+        blended += 128 # Exact rounded division by 255: (t + (t >> 8)) >> 8
+        blended += blended >> 8
+        blended >>= 8
+        region[...] = blended
+        return frame
+
+
+class CaptionRenderer:
+    """Turns caption text into cached overlays for one style (from CAPTION_STYLES) and frame size."""
+
+    def __init__(self, style_name=None, frame_size=(1920, 1080), cache_entries=256):
+        styles = config.get('CAPTION_STYLES', {})
+        self.style_name = style_name or config.get('DEFAULT_CAPTION_STYLE', 'Subtle')
+        style = styles.get(self.style_name) or next(iter(styles.values()), {})
+        self.frame_width, self.frame_height = frame_size
+        # Style font sizes are defined for CAPTION_BASE_HEIGHT output and scaled up from there
+        scale = min(self.frame_width, self.frame_height) / config.get('CAPTION_BASE_HEIGHT', 480)
+        self.atlas = get_glyph_atlas(style.get('font'), max(8, int(round(style.get('fontsize', 24) * scale))),
+                                     style.get('color', 'white'), style.get('stroke_color'),
+                                     int(round(style.get('stroke_width', 0) * scale)))
+        self.bg_color = style.get('bg_color')
+        self.max_width = int(self.frame_width * 0.9)
+        self.bottom_margin = int(self.frame_height * config.get('CAPTION_BOTTOM_MARGIN', 0.12))
+        self.cache_entries = cache_entries
+        self._overlays = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _wrap(self, text):
+        """Greedy word wrap to the maximum caption width."""
+        lines = []
+        current = ""
+        for word in text.split():
+            candidate = f"{current} {word}".strip()
+            if current and self.atlas.text_width(candidate) > self.max_width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            lines.append(current)
+        return lines
+
+    def _rasterize(self, text):
+        atlas = self.atlas
+        lines = self._wrap(text)
+        line_widths = [atlas.text_width(line) for line in lines]
+        box_padding = atlas.pad * 2 if self.bg_color else 0
+        width = int(np.ceil(max(line_widths))) + 2 * atlas.pad + 2 * box_padding
+        height = atlas.line_height * len(lines) + 2 * atlas.pad + 2 * box_padding
+        canvas = np.zeros((height, width, 4), dtype=np.float32)
+        if self.bg_color:
+            bg = self.bg_color
+            canvas[...] = [bg[0] / 255.0, bg[1] / 255.0, bg[2] / 255.0, bg[3] if len(bg) > 3 else 1.0]
+
+        for line_index, (line, line_width) in enumerate(zip(lines, line_widths)):
+            pen_x = box_padding + (width - 2 * box_padding - 2 * atlas.pad - line_width) / 2
+            top = box_padding + line_index * atlas.line_height
+            for char in line:
+                glyph, advance = atlas.glyph(char)
+                gx = int(round(pen_x))
+                glyph_h, glyph_w = glyph.shape[:2]
+                target = canvas[top:top + glyph_h, gx:gx + glyph_w]
+                glyph = glyph[:target.shape[0], :target.shape[1]]
+                # Porter-Duff "over" so strokes of neighbouring glyphs overlap cleanly
+                src_a = glyph[..., 3:4]
+                dst_a = target[..., 3:4]
+                out_a = src_a + dst_a * (1.0 - src_a)
+                safe_a = np.where(out_a > 0, out_a, 1.0)
+                target[..., :3] = (glyph[..., :3] * src_a + target[..., :3] * dst_a * (1.0 - src_a)) / safe_a
+                target[..., 3:4] = out_a
+                pen_x += advance
+
+        x = (self.frame_width - width) // 2
+        y = self.frame_height - self.bottom_margin - height
+        return CaptionOverlay(canvas, x, y)
+
+    def overlay(self, text):
+        """Returns the cached overlay for a caption, rasterizing it on first use."""
+        with self._lock:
+            overlay = self._overlays.get(text)
+            if overlay is not None:
+                self._overlays.move_to_end(text)
+                return overlay
+        overlay = self._rasterize(text)
+        with self._lock:
+            self._overlays[text] = overlay
+            while len(self._overlays) > self.cache_entries:
+                self._overlays.popitem(last=False)
+        return overlay
+
+
+class CaptionTrack:
+    """Time-indexed captions [(start, end, text)] drawn onto frames by a CaptionRenderer."""
+
+    def __init__(self, renderer, timeline):
+        self.renderer = renderer
+        self.timeline = sorted(timeline)
+        self._starts = [start for start, _, _ in self.timeline]
+        for _, _, text in self.timeline: # Rasterize everything up front, off the per-frame path
+            renderer.overlay(text)
+
+    def text_at(self, t):
+        index = bisect.bisect_right(self._starts, t) - 1
+        if index >= 0:
+            start, end, text = self.timeline[index]
+            if start <= t < end:
+                return text
+        return None
+
+    def apply(self, frame, t):
+        """Draws the caption active at time t (if any) onto frame in place. Returns the frame."""
+        text = self.text_at(t)
+        if text:
+            self.renderer.overlay(text).composite(frame)
+        return frame
+
+
+def chunk_words(text, words_per_chunk=None):
+    """Splits text into caption chunks of WORDS_PER_CAPTION_CHUNK words."""
+    words_per_chunk = words_per_chunk or config.get('WORDS_PER_CAPTION_CHUNK', 3)
+    words = text.split()
+    return [" ".join(words[i:i + words_per_chunk]) for i in range(0, len(words), words_per_chunk)]
+
+
+def build_caption_timeline(spans, words_per_chunk=None):
+    """
+    Builds [(start, end, text)] caption chunks from timed text spans [(start, end, text)],
+    e.g. the TTS chunks in voiceover.json. Chunks within a span share its time in proportion
+    to their length in characters.
+    """
+    timeline = []
+    for span_start, span_end, span_text in spans:
+        chunks = chunk_words(span_text, words_per_chunk)
+        total_chars = sum(len(chunk) for chunk in chunks)
+        position = span_start
+        for chunk in chunks:
+            length = (span_end - span_start) * len(chunk) / total_chars if total_chars else 0
+            timeline.append((position, position + length, chunk))
+            position += length
+    return timeline
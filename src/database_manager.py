@@ -1,9 +1,145 @@
 # src/database_manager.py
+import json
 import sqlite3
+import socket
+import threading
 import time
 import os
 from .config_manager import manager as config
 
+
+class ConnectionPool:
+    """
+    Thread-aware SQLite connection pool.
+    Each worker thread gets one persistent connection which is reused for every
+    call made from that thread, instead of connecting/closing per query.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.busy_timeout_ms = int(config.get('DB_BUSY_TIMEOUT_MS', 5000))
+        self.synchronous = config.get('DB_SYNCHRONOUS', 'NORMAL')
+        self.cache_size_kb = int(config.get('DB_CACHE_SIZE_KB', 16384))
+        self.mmap_size = int(config.get('DB_MMAP_SIZE', 0))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {} # thread ident -> connection
+        self._pid = os.getpid()
+
+    def _connect(self):
+        """Opens and tunes a new connection (WAL journal, pragmas, busy timeout)."""
+        # isolation_level=None keeps the autocommit behaviour the managers rely on.
+        # check_same_thread=False only so close_all() can close other threads' connections;
+        # each connection is still used by exactly one thread.
+        conn = sqlite3.connect(self.db_path, isolation_level=None,
+                               timeout=self.busy_timeout_ms / 1000.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row # Return rows as dictionary-like objects
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if str(journal_mode).lower() != 'wal':
+            print(f"Warning: Could not enable WAL journaling for {self.db_path} (mode: {journal_mode}).")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = -{self.cache_size_kb}") # Negative value = size in KB
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def get_connection(self):
+        """Returns the calling thread's connection, creating it on first use."""
+        if os.getpid() != self._pid:
+            # Forked child (e.g. a process pool worker): never reuse the parent's handles
+            self._local = threading.local()
+            self._connections = {}
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        conn = self._connect()
+        self._local.conn = conn
+        with self._lock:
+            self._prune_dead_threads()
+            stale = self._connections.get(threading.get_ident())
+            if stale is not None and stale is not conn:
+                self._close_quietly(stale) # Thread ident was recycled from a finished thread
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _prune_dead_threads(self):
+        """Closes connections owned by threads that have exited. Caller holds the lock."""
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            self._close_quietly(self._connections.pop(ident))
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def close_all(self):
+        """Closes every pooled connection (e.g. on shutdown)."""
+        with self._lock:
+            for conn in self._connections.values():
+                self._close_quietly(conn)
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_connection_pool(db_path):
+    """Returns the process-wide pool for a database file, shared by every DatabaseManager."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def default_worker_id():
+    """Identifies the calling worker (host, process, thread) for work leases."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class LeaseHeartbeat:
+    """
+    Context manager that keeps work leases alive while long-running stages execute.
+    Renews every third of the lease period from a background thread.
+    """
+
+    def __init__(self, db_manager, topics, worker_id, lease_seconds=None):
+        self.db_manager = db_manager
+        self.topics = list(topics)
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds or config.get('PIPELINE_LEASE_SECONDS', 1800)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3.0):
+            for topic in self.topics:
+                self.db_manager.renew_lease(topic, self.worker_id, self.lease_seconds)
+
+    def __enter__(self):
+        if self.topics:
+            self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return False
+
+
 class DatabaseManager:
     """Handles interactions with the internal SQLite database."""
 
@@ -12,49 +148,200 @@ class DatabaseManager:
     COLUMNS = [
         'topic', 'pipeline_status', 'generated_script_path',
         'final_video_path', 'youtube_url', 'last_error', 'last_updated',
-        'source_type', 'source_detail'
+        'source_type', 'source_detail', 'lease_owner', 'lease_expires', 'claimed_from'
     ]
+    IN_PROGRESS_PREFIX = 'IN_PROGRESS_'
 
-    def __init__(self):
-        self.db_path = config.get('DATABASE_FILE')
+    # Schema setup only needs to run once per database file per process
+    _initialized_paths = set()
+    _init_lock = threading.Lock()
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config.get('DATABASE_FILE')
         if not self.db_path:
             raise ValueError("DATABASE_FILE path is not configured.")
         print(f"Initializing DatabaseManager with DB path: {self.db_path}")
-        self._create_table_if_not_exists()
+        self.pool = get_connection_pool(self.db_path)
+        with DatabaseManager._init_lock:
+            key = os.path.abspath(self.db_path)
+            if key not in DatabaseManager._initialized_paths:
+                self._apply_migrations()
+                DatabaseManager._initialized_paths.add(key)
 
     def _get_connection(self):
-        """Establishes a connection to the SQLite database."""
+        """Returns this thread's pooled connection to the SQLite database."""
         try:
-            # isolation_level=None enables autocommit, simpler for this use case
-            conn = sqlite3.connect(self.db_path, isolation_level=None)
-            conn.row_factory = sqlite3.Row # Return rows as dictionary-like objects
-            return conn
+            return self.pool.get_connection()
         except sqlite3.Error as e:
             print(f"ERROR: Failed to connect to database at {self.db_path}: {e}")
             raise
 
-    def _create_table_if_not_exists(self):
-        """Creates the videos table if it doesn't exist."""
-        sql_create_table = f"""
-        CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
-            topic TEXT PRIMARY KEY NOT NULL UNIQUE,
-            pipeline_status TEXT NOT NULL DEFAULT 'PENDING_SCRIPT',
-            generated_script_path TEXT,
-            final_video_path TEXT,
-            youtube_url TEXT,
-            last_error TEXT,
-            last_updated TEXT NOT NULL,
-            source_type TEXT,
-            source_detail TEXT
-        );
-        """
+    # Ordered schema migrations: (version, description, [SQL statements]).
+    # Applied at startup inside one transaction each and recorded in schema_version.
+    # Never edit an applied migration - append a new one instead.
+    MIGRATIONS = [
+        (1, "Create videos table", [
+            f"""
+            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+                topic TEXT PRIMARY KEY NOT NULL UNIQUE,
+                pipeline_status TEXT NOT NULL DEFAULT 'PENDING_SCRIPT',
+                generated_script_path TEXT,
+                final_video_path TEXT,
+                youtube_url TEXT,
+                last_error TEXT,
+                last_updated TEXT NOT NULL,
+                source_type TEXT,
+                source_detail TEXT
+            )
+            """,
+        ]),
+        (2, "Store last_updated as integer epoch seconds", [
+            f"""
+            CREATE TABLE {TABLE_NAME}_new (
+                topic TEXT PRIMARY KEY NOT NULL UNIQUE,
+                pipeline_status TEXT NOT NULL DEFAULT 'PENDING_SCRIPT',
+                generated_script_path TEXT,
+                final_video_path TEXT,
+                youtube_url TEXT,
+                last_error TEXT,
+                last_updated INTEGER NOT NULL,
+                source_type TEXT,
+                source_detail TEXT
+            )
+            """,
+            # Old values were local-time "%Y-%m-%d %H:%M:%S" strings
+            f"""
+            INSERT INTO {TABLE_NAME}_new
+            SELECT topic, pipeline_status, generated_script_path, final_video_path, youtube_url, last_error,
+                   CASE WHEN typeof(last_updated) = 'integer' THEN last_updated
+                        ELSE COALESCE(CAST(strftime('%s', last_updated, 'utc') AS INTEGER),
+                                      CAST(strftime('%s', 'now') AS INTEGER)) END,
+                   source_type, source_detail
+            FROM {TABLE_NAME}
+            """,
+            f"DROP TABLE {TABLE_NAME}",
+            f"ALTER TABLE {TABLE_NAME}_new RENAME TO {TABLE_NAME}",
+        ]),
+        (3, "Index queue polling and dashboard ordering", [
+            # Covering index for find_topics_by_status (status seek, ordered by age, topic in index)
+            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_status_updated ON {TABLE_NAME} (pipeline_status, last_updated, topic)",
+            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_last_updated ON {TABLE_NAME} (last_updated)",
+        ]),
+        (4, "Add work lease columns for concurrent claiming", [
+            f"ALTER TABLE {TABLE_NAME} ADD COLUMN lease_owner TEXT",
+            f"ALTER TABLE {TABLE_NAME} ADD COLUMN lease_expires INTEGER",
+            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_status_lease ON {TABLE_NAME} (pipeline_status, lease_expires)",
+        ]),
+        (5, "Add background jobs table", [
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY NOT NULL,
+                job_type TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'QUEUED',
+                owner TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT,
+                result TEXT,
+                error TEXT,
+                created_at INTEGER NOT NULL,
+                started_at INTEGER,
+                finished_at INTEGER
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)",
+        ]),
+        (6, "Add LLM response cache table", [
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                expires_at INTEGER NOT NULL,
+                last_access INTEGER NOT NULL,
+                duration_seconds REAL NOT NULL DEFAULT 0
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)",
+        ]),
+        (7, "Add background music index table", [
+            # path is relative to MUSIC_DIR; envelope is int8 dBFS per envelope_interval seconds
+            """
+            CREATE TABLE IF NOT EXISTS music_tracks (
+                path TEXT PRIMARY KEY NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                duration REAL NOT NULL,
+                loudness_lufs REAL,
+                envelope BLOB NOT NULL,
+                envelope_interval REAL NOT NULL,
+                indexed_at INTEGER NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_music_tracks_duration ON music_tracks (duration)",
+        ]),
+        (8, "Add orchestrator control table", [
+            # Single row: the web UI writes paused/tick_requested, the daemon writes the rest
+            """
+            CREATE TABLE IF NOT EXISTS orchestrator_control (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                paused INTEGER NOT NULL DEFAULT 0,
+                tick_requested INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                heartbeat_at INTEGER,
+                current_stage TEXT,
+                last_tick_at INTEGER,
+                last_summary TEXT,
+                updated_at INTEGER NOT NULL
+            )
+            """,
+            "INSERT OR IGNORE INTO orchestrator_control (id, updated_at) VALUES (1, CAST(strftime('%s', 'now') AS INTEGER))",
+        ]),
+        (9, "Record the status a topic was claimed from", [
+            # Lets an expired or released claim return to e.g. FAILED (keeping last_error), not just PENDING_<stage>
+            f"ALTER TABLE {TABLE_NAME} ADD COLUMN claimed_from TEXT",
+        ]),
+    ]
+
+    def _get_schema_version(self, conn):
+        """Returns the highest applied migration version (0 for a fresh database)."""
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+
+    def _apply_migrations(self):
+        """Creates the schema_version table and applies any pending migrations in order."""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql_create_table)
-                print(f"Table '{self.TABLE_NAME}' checked/created successfully.")
+            conn = self._get_connection()
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY NOT NULL,
+                description TEXT,
+                applied_at INTEGER NOT NULL
+            )
+            """)
+            for version, description, statements in self.MIGRATIONS:
+                if version <= self._get_schema_version(conn):
+                    continue
+                # IMMEDIATE takes the write lock up front, so concurrent starters serialize here
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version <= self._get_schema_version(conn): # Another process got here first
+                        conn.execute("COMMIT")
+                        continue
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                                 (version, description, int(time.time())))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                print(f"Applied database migration {version}: {description}")
+            print(f"Database schema is at version {self._get_schema_version(conn)}.")
         except sqlite3.Error as e:
-            print(f"ERROR: Failed to create/check table '{self.TABLE_NAME}': {e}")
+            print(f"ERROR: Failed to apply database migrations: {e}")
             raise
 
     def get_all_videos_status(self):
@@ -84,10 +371,18 @@ class DatabaseManager:
             print(f"ERROR getting details for topic '{topic}': {e}")
             return None
 
-    def update_status(self, topic, status, **kwargs):
-        """ Finds a row by topic and updates its status and other columns. """
+    def update_status(self, topic, status, worker_id=None, **kwargs):
+        """
+        Finds a row by topic and updates its status and other columns.
+        With worker_id (a claiming worker), the update applies only while that worker still
+        holds the topic's lease, so a worker whose lease expired cannot overwrite the new owner.
+        Returns True if the row was updated.
+        """
         print(f"Updating status for topic '{topic}' to '{status}'...")
-        update_data = {'pipeline_status': status, 'last_updated': time.strftime("%Y-%m-%d %H:%M:%S")}
+        update_data = {'pipeline_status': status, 'last_updated': int(time.time())}
+        if not status.startswith(self.IN_PROGRESS_PREFIX):
+            # Leaving an in-progress state releases any work lease held on the row
+            update_data.update({'lease_owner': None, 'lease_expires': None, 'claimed_from': None})
         update_data.update(kwargs)
 
         # Filter kwargs to only include valid columns
@@ -102,13 +397,21 @@ class DatabaseManager:
         values.append(topic) # For the WHERE clause
 
         sql_update = f"UPDATE {self.TABLE_NAME} SET {set_clause} WHERE topic = ?"
+        if worker_id is not None:
+            # A reclaimed row has no owner (or a new one), so require an exact match
+            sql_update += " AND lease_owner = ?"
+            values.append(worker_id)
 
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql_update, values)
                 if cursor.rowcount == 0:
-                     print(f"Warning: Topic '{topic}' not found for update.")
+                     if worker_id is not None:
+                         print(f"Warning: Topic '{topic}' not found or its lease is no longer held by '{worker_id}'; "
+                               f"status '{status}' not written.")
+                     else:
+                         print(f"Warning: Topic '{topic}' not found for update.")
                      return False
                 print(f"Successfully updated topic '{topic}'.")
                 return True
@@ -123,7 +426,7 @@ class DatabaseManager:
         INSERT INTO {self.TABLE_NAME} (topic, pipeline_status, last_updated, source_type, source_detail)
         VALUES (?, ?, ?, ?, ?)
         """
-        current_time = time.strftime("%Y-%m-%d %H:%M:%S")
+        current_time = int(time.time()) # Epoch seconds, sortable and index friendly
         values = (topic_name, initial_status, current_time, source_type, source_detail)
 
         try:
@@ -140,6 +443,60 @@ class DatabaseManager:
             print(f"ERROR: Failed to add topic '{topic_name}': {e}")
             return False
 
+    BULK_INSERT_CHUNK_ROWS = 500 # 5 bound parameters per row, well under SQLite's variable limit
+
+    def add_topics_bulk(self, topic_names, source_type="Manual", source_detail="", initial_status='PENDING_SCRIPT'):
+        """
+        Adds many topics in a single transaction.
+        Existing topics (and repeats within the input) are skipped, not treated as errors.
+        Returns a dict with 'added', 'skipped' and 'failed' topic lists (input order).
+        """
+        topic_names = list(topic_names)
+        result = {'added': [], 'skipped': [], 'failed': []}
+        candidates = list(dict.fromkeys(n for n in topic_names if isinstance(n, str) and n.strip()))
+        if not candidates:
+            result['failed'] = topic_names
+            return result
+
+        print(f"Attempting to bulk add {len(candidates)} topics to database...")
+        current_time = int(time.time())
+        inserted = set()
+        try:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(candidates), self.BULK_INSERT_CHUNK_ROWS):
+                    chunk = candidates[start:start + self.BULK_INSERT_CHUNK_ROWS]
+                    sql_insert = f"""
+                    INSERT INTO {self.TABLE_NAME} (topic, pipeline_status, last_updated, source_type, source_detail)
+                    VALUES {", ".join("(?, ?, ?, ?, ?)" for _ in chunk)}
+                    ON CONFLICT(topic) DO NOTHING
+                    RETURNING topic
+                    """
+                    values = []
+                    for name in chunk:
+                        values.extend((name, initial_status, current_time, source_type, source_detail))
+                    inserted.update(row['topic'] for row in conn.execute(sql_insert, values).fetchall())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"ERROR: Failed to bulk add topics: {e}")
+            inserted = None
+
+        for name in topic_names:
+            if inserted is None or not isinstance(name, str) or not name.strip():
+                result['failed'].append(name)
+            elif name in inserted:
+                result['added'].append(name)
+                inserted.discard(name) # Later repeats of the same name count as skipped
+            else:
+                result['skipped'].append(name)
+        if inserted is not None:
+            print(f"Bulk add complete: {len(result['added'])} added, {len(result['skipped'])} already existed.")
+        return result
+
     def find_topics_by_status(self, status, limit=1):
         """Finds topics matching a given status."""
         sql_select_status = f"""
@@ -158,6 +515,119 @@ class DatabaseManager:
             print(f"ERROR finding topics by status '{status}': {e}")
             return []
 
+    # --- Work Leases (concurrent workers sharing one database) ---
+
+    def claim_topics(self, stage, limit, worker_id, lease_seconds=None, from_statuses=None):
+        """
+        Atomically claims up to `limit` topics for a pipeline stage (e.g. 'SCRIPT', 'ASSETS').
+        Claimed rows move to IN_PROGRESS_<stage> with this worker as lease owner, so no
+        other worker can pick them up until the lease is released or expires.
+        Rows whose IN_PROGRESS_<stage> lease has expired are reclaimed automatically.
+        Returns the list of claimed topic names (oldest first).
+        """
+        stage = stage.upper()
+        from_statuses = tuple(from_statuses or (f"PENDING_{stage}",))
+        in_progress_status = f"{self.IN_PROGRESS_PREFIX}{stage}"
+        if lease_seconds is None:
+            lease_seconds = config.get('PIPELINE_LEASE_SECONDS', 1800)
+        now = int(time.time())
+
+        placeholders = ", ".join("?" for _ in from_statuses)
+        sql_claim = f"""
+        UPDATE {self.TABLE_NAME}
+        SET pipeline_status = ?, lease_owner = ?, lease_expires = ?,
+            claimed_from = CASE WHEN pipeline_status = ? THEN claimed_from ELSE pipeline_status END
+        WHERE topic IN (
+            SELECT topic FROM {self.TABLE_NAME}
+            WHERE pipeline_status IN ({placeholders})
+               OR (pipeline_status = ? AND lease_expires < ?)
+            ORDER BY last_updated ASC  -- Process older items first
+            LIMIT ?
+        )
+        RETURNING topic, last_updated
+        """
+        values = [in_progress_status, worker_id, now + int(lease_seconds), in_progress_status,
+                  *from_statuses, in_progress_status, now, limit]
+        try:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE") # Take the write lock before selecting candidates
+            try:
+                rows = conn.execute(sql_claim, values).fetchall()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            claimed = [row['topic'] for row in sorted(rows, key=lambda r: r['last_updated'])]
+            if claimed:
+                print(f"Worker '{worker_id}' claimed {len(claimed)} topic(s) for {stage}: {claimed}")
+            return claimed
+        except sqlite3.Error as e:
+            print(f"ERROR claiming topics for stage '{stage}': {e}")
+            return []
+
+    def renew_lease(self, topic, worker_id, lease_seconds=None):
+        """Extends the lease on a claimed topic. Returns False if this worker no longer holds it."""
+        if lease_seconds is None:
+            lease_seconds = config.get('PIPELINE_LEASE_SECONDS', 1800)
+        sql_renew = f"""
+        UPDATE {self.TABLE_NAME} SET lease_expires = ?
+        WHERE topic = ? AND lease_owner = ? AND pipeline_status LIKE '{self.IN_PROGRESS_PREFIX}%'
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(sql_renew, (int(time.time()) + int(lease_seconds), topic, worker_id))
+                if cursor.rowcount == 0:
+                    print(f"Warning: Worker '{worker_id}' no longer holds the lease on topic '{topic}'.")
+                    return False
+                return True
+        except sqlite3.Error as e:
+            print(f"ERROR renewing lease for topic '{topic}': {e}")
+            return False
+
+    def _release_sql(self, condition):
+        """UPDATE returning claimed rows to the status they were claimed from (PENDING_<stage> if unknown)."""
+        prefix_len = len(self.IN_PROGRESS_PREFIX)
+        return f"""
+        UPDATE {self.TABLE_NAME}
+        SET pipeline_status = COALESCE(claimed_from, 'PENDING_' || substr(pipeline_status, {prefix_len + 1})),
+            lease_owner = NULL, lease_expires = NULL, claimed_from = NULL, last_updated = ?
+        WHERE pipeline_status LIKE '{self.IN_PROGRESS_PREFIX}%' AND {condition}
+        """
+
+    def release_claims(self, topics, worker_id):
+        """
+        Hands back claims this worker still holds (topics it never started, or that a processor
+        skipped) to the status they were claimed from. Returns the number released.
+        """
+        topics = list(topics)
+        if not topics:
+            return 0
+        placeholders = ", ".join("?" for _ in topics)
+        sql_release = self._release_sql(f"lease_owner = ? AND topic IN ({placeholders})")
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(sql_release, (int(time.time()), worker_id, *topics))
+                if cursor.rowcount:
+                    print(f"Released {cursor.rowcount} unprocessed claim(s) held by '{worker_id}'.")
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"ERROR releasing claims for '{worker_id}': {e}")
+            return 0
+
+    def reclaim_expired_leases(self):
+        """Returns topics with expired IN_PROGRESS_<stage> leases to the status they were claimed from. Returns the count."""
+        sql_reclaim = self._release_sql("lease_expires < ?")
+        now = int(time.time())
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(sql_reclaim, (now, now))
+                if cursor.rowcount:
+                    print(f"Reclaimed {cursor.rowcount} topic(s) with expired work leases.")
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"ERROR reclaiming expired leases: {e}")
+            return 0
+
     def delete_topic(self, topic):
         """Deletes a topic row from the database."""
         sql_delete = f"DELETE FROM {self.TABLE_NAME} WHERE topic = ?"
@@ -173,4 +643,121 @@ class DatabaseManager:
                     return False
         except sqlite3.Error as e:
             print(f"ERROR deleting topic '{topic}': {e}")
-            return False
\ No newline at end of file
+            return False
+
+    # --- Background Jobs ---
+
+    JOB_COLUMNS = ['job_type', 'status', 'owner', 'progress', 'message', 'result', 'error',
+                   'created_at', 'started_at', 'finished_at']
+
+    def create_job(self, job_id, job_type, owner, message=None):
+        """Records a new QUEUED job run by `owner` ("host:pid"). Returns True on success."""
+        sql_insert = """
+        INSERT INTO jobs (id, job_type, status, owner, progress, message, created_at)
+        VALUES (?, ?, 'QUEUED', ?, 0, ?, ?)
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute(sql_insert, (job_id, job_type, owner, message, int(time.time())))
+                return True
+        except sqlite3.Error as e:
+            print(f"ERROR: Failed to create job '{job_id}': {e}")
+            return False
+
+    def update_job(self, job_id, **kwargs):
+        """Updates job columns (status, progress, message, result, error, timestamps)."""
+        valid_updates = {k: v for k, v in kwargs.items() if k in self.JOB_COLUMNS}
+        if 'result' in valid_updates and valid_updates['result'] is not None:
+            valid_updates['result'] = json.dumps(valid_updates['result'], default=str)
+        if not valid_updates:
+            return False
+        set_clause = ", ".join([f"{key} = ?" for key in valid_updates.keys()])
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(f"UPDATE jobs SET {set_clause} WHERE id = ?", [*valid_updates.values(), job_id])
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"ERROR: Failed to update job '{job_id}': {e}")
+            return False
+
+    @staticmethod
+    def _job_row_to_dict(row):
+        job = dict(row)
+        if job.get('result'):
+            try:
+                job['result'] = json.loads(job['result'])
+            except ValueError:
+                pass # Leave unparseable results as raw text
+        return job
+
+    def get_job(self, job_id):
+        """Gets a job by id, with its result decoded. Returns None if not found."""
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                return self._job_row_to_dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"ERROR getting job '{job_id}': {e}")
+            return None
+
+    def list_jobs(self, limit=20):
+        """Returns the most recently created jobs."""
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+                return [self._job_row_to_dict(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"ERROR listing jobs: {e}")
+            return []
+
+    def list_unfinished_jobs(self):
+        """Returns QUEUED/RUNNING jobs (used to detect jobs orphaned by a dead process)."""
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute("SELECT * FROM jobs WHERE status IN ('QUEUED', 'RUNNING')").fetchall()
+                return [self._job_row_to_dict(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"ERROR listing unfinished jobs: {e}")
+            return []
+
+    # --- Orchestrator Control ---
+
+    ORCHESTRATOR_COLUMNS = ['paused', 'tick_requested', 'owner', 'heartbeat_at', 'current_stage',
+                            'last_tick_at', 'last_summary']
+
+    def get_orchestrator_control(self):
+        """Returns the orchestrator control row as a dict, or None on error."""
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT * FROM orchestrator_control WHERE id = 1").fetchone()
+                return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"ERROR reading orchestrator control: {e}")
+            return None
+
+    def update_orchestrator_control(self, **kwargs):
+        """Updates orchestrator control columns (pause flag, tick request, daemon heartbeat/status)."""
+        valid_updates = {k: v for k, v in kwargs.items() if k in self.ORCHESTRATOR_COLUMNS}
+        if not valid_updates:
+            return False
+        valid_updates['updated_at'] = int(time.time())
+        set_clause = ", ".join([f"{key} = ?" for key in valid_updates.keys()])
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(f"UPDATE orchestrator_control SET {set_clause} WHERE id = 1",
+                                      list(valid_updates.values()))
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"ERROR updating orchestrator control: {e}")
+            return False
+
+    def consume_tick_request(self):
+        """Atomically clears a pending forced-tick request. Returns True if one was pending."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute("UPDATE orchestrator_control SET tick_requested = 0, updated_at = ? "
+                                      "WHERE id = 1 AND tick_requested = 1", (int(time.time()),))
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"ERROR reading orchestrator tick request: {e}")
+            return False
@@ -0,0 +1,193 @@
+# src/download_cache.py
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs
+
+from .config_manager import manager as config
+
+_YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtube-nocookie.com',
+                  'www.youtube-nocookie.com')
+
+
+def youtube_video_id(url):
+    """Extracts the 11-character video id from the common YouTube URL forms, or None."""
+    try:
+        parsed = urlparse(url.strip())
+    except (AttributeError, ValueError):
+        return None
+    host = (parsed.hostname or '').lower()
+    candidate = None
+    if host in ('youtu.be', 'www.youtu.be'):
+        candidate = parsed.path.lstrip('/').split('/')[0]
+    elif host in _YOUTUBE_HOSTS:
+        if parsed.path == '/watch':
+            candidate = (parse_qs(parsed.query).get('v') or [None])[0]
+        else:
+            parts = parsed.path.strip('/').split('/')
+            if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+                candidate = parts[1]
+    if candidate and _YOUTUBE_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+class DownloadCache:
+    """
+    On-disk cache of downloaded source audio and its transcript, keyed by canonical source
+    (YouTube video id, or a hash of the URL for anything else). Each entry is a directory
+    holding the audio file and transcript.json. Bounded by total size and entry age with
+    least-recently-used eviction (the entry directory's mtime is its last access time).
+    Entries held with hold() (being transcribed) are never evicted.
+    """
+
+    TRANSCRIPT_FILE = 'transcript.json'
+
+    def __init__(self, cache_dir=None, max_bytes=None, max_age_days=None):
+        self.cache_dir = cache_dir or config.get('DOWNLOAD_CACHE_DIR') or os.path.join(config.get('ASSETS_DIR'), '_cache', 'downloads')
+        self.max_bytes = max_bytes or config.get('DOWNLOAD_CACHE_MAX_BYTES', 5 * 1024 * 1024 * 1024)
+        self.max_age_seconds = (max_age_days or config.get('DOWNLOAD_CACHE_MAX_AGE_DAYS', 30)) * 86400
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._in_use = {} # key -> number of holders
+        print(f"DownloadCache initialized at {self.cache_dir}.")
+
+    @staticmethod
+    def key_for_url(url):
+        """Canonical cache key: 'youtube-<id>' for YouTube URLs, 'url-<hash>' otherwise."""
+        video_id = youtube_video_id(url)
+        if video_id:
+            return f"youtube-{video_id}"
+        return "url-" + hashlib.sha256(url.strip().encode('utf-8')).hexdigest()[:32]
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _touch(self, key):
+        try:
+            os.utime(self._entry_dir(key))
+        except OSError:
+            pass
+
+    @contextmanager
+    def hold(self, key):
+        """Keeps key's entry from being evicted while the with-block runs."""
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use[key] -= 1
+                if not self._in_use[key]:
+                    del self._in_use[key]
+
+    def get_audio(self, key):
+        """Returns the path of the cached audio for key, or None."""
+        entry_dir = self._entry_dir(key)
+        try:
+            names = [n for n in os.listdir(entry_dir) if n.startswith('audio.')]
+        except OSError:
+            return None
+        if not names:
+            return None
+        self._touch(key)
+        return os.path.join(entry_dir, names[0])
+
+    def put_audio(self, key, src_path):
+        """Moves a downloaded audio file into the cache. Returns its new path (src_path on failure)."""
+        entry_dir = self._entry_dir(key)
+        extension = os.path.splitext(src_path)[1] or '.mp3'
+        dest_path = os.path.join(entry_dir, 'audio' + extension)
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            temp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+            shutil.move(src_path, temp_path)
+            os.replace(temp_path, dest_path) # Atomic: readers never see a partial file
+        except OSError as e:
+            print(f"Warning: Could not store downloaded audio in cache: {e}")
+            return src_path
+        self.evict(keep=(key,)) # Never the entry just stored, even if it alone exceeds max_bytes
+        return dest_path
+
+    def get_transcript(self, key, model=None):
+        """Returns the cached transcription result for key (optionally for a given model), or None."""
+        path = os.path.join(self._entry_dir(key), self.TRANSCRIPT_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if model and entry.get('model') != model:
+            return None
+        self._touch(key)
+        return entry.get('result')
+
+    def put_transcript(self, key, result, source_url=None, model=None):
+        """Stores a transcription result (dict from TranscriptionService.transcribe_audio_detailed)."""
+        entry_dir = self._entry_dir(key)
+        path = os.path.join(entry_dir, self.TRANSCRIPT_FILE)
+        payload = {'source_url': source_url, 'model': model, 'created_at': int(time.time()), 'result': result}
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not store transcript in cache: {e}")
+            return False
+        self._touch(key)
+        return True
+
+    def _entries(self):
+        """Returns [(key, size_bytes, last_access)] for every cache entry."""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = self._entry_dir(key)
+            if not os.path.isdir(entry_dir):
+                continue
+            size = 0
+            for name in os.listdir(entry_dir):
+                try:
+                    size += os.path.getsize(os.path.join(entry_dir, name))
+                except OSError:
+                    pass
+            try:
+                entries.append((key, size, os.stat(entry_dir).st_mtime))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self, keep=()):
+        """
+        Removes entries older than the max age, then least recently used ones beyond max_bytes.
+        Keys in keep and entries currently held are skipped.
+        """
+        with self._lock:
+            try:
+                entries = sorted(self._entries(), key=lambda entry: entry[2])
+            except OSError as e:
+                print(f"Warning: Could not scan download cache: {e}")
+                return 0
+            cutoff = time.time() - self.max_age_seconds
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for key, size, last_access in entries:
+                if last_access >= cutoff and total <= self.max_bytes:
+                    break
+                if key in keep or key in self._in_use:
+                    continue
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+                total -= size
+                removed += 1
+            if removed:
+                print(f"DownloadCache evicted {removed} entries ({total / 1e6:.1f} MB remaining).")
+            return removed
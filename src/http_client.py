@@ -0,0 +1,220 @@
+# src/http_client.py
+"""
+Pooled HTTP sessions and robust file downloads.
+- One requests.Session per host, shared process-wide, so API calls and downloads reuse
+  keep-alive connections instead of paying a TCP+TLS handshake per request.
+- Downloads stream in large blocks into <path>.part and are renamed into place only when
+  complete, so a visual file is never half-written.
+- Large files from servers that accept byte ranges are fetched as parallel Range parts
+  written into a preallocated file.
+- A failed download leaves its .part file (plus a small .part.json progress record) behind;
+  retrying the same URL resumes it when the server's validator (ETag/Last-Modified) is unchanged.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config_manager import manager as config
+from .resilience import backoff_delay, is_retryable
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    """Shared keep-alive session for the URL's scheme and host."""
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            pool_size = config.get('HTTP_POOL_MAXSIZE', 16)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def _validator(headers):
+    return headers.get('ETag') or headers.get('Last-Modified')
+
+
+def _load_progress(progress_path, url):
+    """The resume record of an earlier attempt at the same URL, or None."""
+    try:
+        with open(progress_path, 'r', encoding='utf-8') as f:
+            progress = json.load(f)
+        return progress if progress.get('url') == url else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_progress(progress_path, progress):
+    tmp_path = progress_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+
+def _write_stream(response, handle, offset=None):
+    """Copies a streamed response body into handle (at offset, if given). Returns bytes written."""
+    block_size = config.get('HTTP_DOWNLOAD_CHUNK_BYTES', 1024 * 1024)
+    if offset is not None:
+        handle.seek(offset)
+    written = 0
+    for block in response.iter_content(chunk_size=block_size):
+        handle.write(block)
+        written += len(block)
+    return written
+
+
+class _DownloadError(Exception):
+    """A download attempt failed; retryable says whether trying again may help."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _probe(session, url, timeout):
+    """HEAD request: returns (final url, size or None, accepts ranges, validator)."""
+    try:
+        response = session.head(url, allow_redirects=True, timeout=timeout)
+    except requests.exceptions.RequestException:
+        return url, None, False, None
+    if response.status_code >= 400:
+        return url, None, False, None
+    length = response.headers.get('Content-Length')
+    size = int(length) if length and length.isdigit() else None
+    accepts_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+    return response.url or url, size, accepts_ranges, _validator(response.headers)
+
+
+def _download_parts(session, url, part_path, progress_path, progress, timeout):
+    """Fetches the missing byte ranges of progress['size'] in parallel into the preallocated part file."""
+    size, part_bytes = progress['size'], progress['part_bytes']
+    ranges = [(start, min(start + part_bytes, size) - 1) for start in range(0, size, part_bytes)]
+    done = set(progress['done'])
+    missing = [i for i in range(len(ranges)) if i not in done]
+    present = os.path.exists(part_path) and os.path.getsize(part_path) == size
+    if present and len(done) == len(ranges):
+        return
+    if not present:
+        with open(part_path, 'wb') as f: # Preallocate
+            f.truncate(size)
+        done.clear()
+        missing = list(range(len(ranges)))
+    elif done:
+        print(f"Resuming download: {len(done)}/{len(ranges)} parts already present.")
+    lock = threading.Lock()
+
+    def fetch(index):
+        start, end = ranges[index]
+        headers = {'Range': f"bytes={start}-{end}"}
+        if progress.get('validator'):
+            headers['If-Range'] = progress['validator']
+        with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            if response.status_code != 206: # 200 means the file changed (If-Range) or ranges are unsupported
+                raise _DownloadError(f"Range request answered {response.status_code}",
+                                     retryable=is_retryable(response.status_code))
+            with open(part_path, 'r+b') as f:
+                written = _write_stream(response, f, offset=start)
+        if written != end - start + 1:
+            raise _DownloadError(f"Short range read ({written}/{end - start + 1} bytes)")
+        with lock:
+            done.add(index)
+            _save_progress(progress_path, {**progress, 'done': sorted(done)})
+
+    workers = max(1, min(config.get('HTTP_DOWNLOAD_CONCURRENCY', 4), len(missing)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='download') as pool:
+        for future in [pool.submit(fetch, index) for index in missing]:
+            future.result()
+
+
+def _download_stream(session, url, part_path, progress_path, progress, timeout):
+    """Single streamed GET, appending to an existing part file when the server honours Range."""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) and progress.get('validator') else 0
+    headers = {}
+    if offset:
+        headers = {'Range': f"bytes={offset}-", 'If-Range': progress['validator']}
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416 and offset and offset == progress.get('size'):
+            return # Already complete
+        if response.status_code >= 400:
+            raise _DownloadError(f"HTTP {response.status_code}", retryable=is_retryable(response.status_code))
+        resumed = offset and response.status_code == 206
+        if offset:
+            print(f"Resuming download at byte {offset}." if resumed else "Cannot resume; restarting download.")
+        if not progress.get('validator') and _validator(response.headers):
+            progress['validator'] = _validator(response.headers)
+            _save_progress(progress_path, progress)
+        with open(part_path, 'ab' if resumed else 'wb') as f:
+            _write_stream(response, f)
+
+
+def download_file(url, save_path, timeout=60, max_attempts=3):
+    """
+    Downloads url to save_path atomically (via save_path.part), resuming an earlier partial
+    download of the same URL and fetching large files as parallel Range parts. Transient
+    failures are retried with backoff. Returns True on success; raises requests' RequestException
+    (or OSError) on failure, leaving resumable partial data in place.
+    """
+    session = get_session(url)
+    part_path, progress_path = save_path + '.part', save_path + '.part.json'
+    final_url, size, accepts_ranges, validator = _probe(session, url, timeout)
+    previous = _load_progress(progress_path, url)
+    parallel = (accepts_ranges and size is not None and validator is not None
+                and size >= config.get('HTTP_PARALLEL_MIN_BYTES', 16 * 1024 * 1024))
+    if previous and (not validator or (previous.get('validator'), previous.get('size'), previous.get('parallel'))
+                     != (validator, size, parallel)):
+        previous = None # The remote file changed (or cannot be validated): start over
+
+    def restart():
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        fresh = {'url': url, 'size': size, 'validator': validator, 'parallel': parallel, 'done': [],
+                 'part_bytes': config.get('HTTP_DOWNLOAD_PART_BYTES', 8 * 1024 * 1024)}
+        if validator:
+            _save_progress(progress_path, fresh)
+        return fresh
+
+    progress = previous or restart()
+
+    for attempt in range(max_attempts):
+        try:
+            if parallel:
+                _download_parts(session, final_url, part_path, progress_path, progress, timeout)
+            else:
+                _download_stream(session, final_url, part_path, progress_path, progress, timeout)
+            if size is not None and os.path.getsize(part_path) != size:
+                raise _DownloadError(f"Size mismatch ({os.path.getsize(part_path)}/{size} bytes)")
+            break
+        except (requests.exceptions.RequestException, _DownloadError) as e:
+            retryable = getattr(e, 'retryable', True)
+            if not retryable and parallel: # e.g. 200 to a Range request: fall back to one stream
+                parallel, retryable = False, True
+                progress = restart()
+                continue
+            if not retryable or attempt + 1 == max_attempts:
+                if not os.path.exists(progress_path) and os.path.exists(part_path):
+                    os.remove(part_path) # Not resumable, so don't leave it behind
+                if isinstance(e, _DownloadError):
+                    raise requests.exceptions.RequestException(f"Download of {url} failed: {e}") from e
+                raise
+            delay = backoff_delay(attempt)
+            print(f"Warning: Download of {url} failed ({e}); retrying in {delay:.1f}s.")
+            time.sleep(delay)
+            progress = _load_progress(progress_path, url) or progress
+
+    os.replace(part_path, save_path)
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    return True
@@ -1,9 +1,14 @@
 # src/input_processor.py
 import os
 import subprocess
+import tempfile
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from .config_manager import manager as config
 from .transcription_service import TranscriptionService
+from .download_cache import DownloadCache
 from .llm_service import LLMService # Needed for analyzing sample scripts
 
 class InputProcessor:
@@ -14,54 +19,196 @@ class InputProcessor:
         self.llm_service = LLMService() # Needed for script analysis
         self.download_dir = os.path.join(config.get('ASSETS_DIR'), '_downloads')
         os.makedirs(self.download_dir, exist_ok=True)
+        self.download_cache = DownloadCache()
         print(f"InputProcessor initialized. Download dir: {self.download_dir}")
 
     def _download_youtube_audio(self, url):
-        """Downloads audio from YouTube URL using yt-dlp."""
-        timestamp = int(time.time())
-        output_template = os.path.join(self.download_dir, f"youtube_{timestamp}.%(ext)s")
-        # Use 'bestaudio/best' and specify audio format like mp3
-        command = [
+        """
+        Downloads audio from a YouTube URL for transcription.
+        yt-dlp streams the native audio track to stdout and ffmpeg transcodes it on the fly
+        to low-bitrate mono MP3 (all speech recognition needs), written to a path fixed up front.
+        """
+        download_id = uuid.uuid4().hex # Unique per call so concurrent downloads never collide
+        output_path = os.path.join(self.download_dir, f"youtube_{download_id}.mp3")
+        temp_path = output_path + ".part"
+        ytdlp_command = [
             'yt-dlp',
-            '-x', # Extract audio
-            '--audio-format', 'mp3',
-            '--audio-quality', '0', # Best quality
-            '-f', 'bestaudio/best', # Select best audio stream
-            '-o', output_template,
+            '-f', 'bestaudio/best', # Native audio stream, no yt-dlp post-processing
+            '-o', '-', # Write to stdout
             '--no-playlist', # Download only single video if URL is part of playlist
             '--socket-timeout', '30', # Timeout for connection
+            '--quiet', '--no-warnings', '--no-progress',
             url
         ]
-        print(f"Executing yt-dlp command: {' '.join(command)}")
+        ffmpeg_command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+            '-i', 'pipe:0',
+            '-vn', '-ac', '1', # Mono
+            '-ar', str(config.get('INGEST_AUDIO_SAMPLE_RATE', 16000)),
+            '-b:a', config.get('INGEST_AUDIO_BITRATE', '32k'),
+            '-f', 'mp3', temp_path
+        ]
+        print(f"Executing: {' '.join(ytdlp_command)} | {' '.join(ffmpeg_command)}")
+        start_time = time.time()
+        ytdlp_process = None
         try:
-            result = subprocess.run(command, check=True, capture_output=True, text=True, timeout=300) # 5 min timeout
-            print("yt-dlp stdout:", result.stdout)
-            print("yt-dlp stderr:", result.stderr)
-
-            # Find the actual downloaded file name (yt-dlp replaces %(ext)s)
-            # Assuming only one file is downloaded per run here
-            downloaded_files = [f for f in os.listdir(self.download_dir) if f.startswith(f"youtube_{timestamp}")]
-            if downloaded_files:
-                filepath = os.path.join(self.download_dir, downloaded_files[0])
-                print(f"Successfully downloaded audio to: {filepath}")
-                return filepath
+            with tempfile.TemporaryFile() as ytdlp_stderr: # A file, so a chatty yt-dlp can never block on a full pipe
+                ytdlp_process = subprocess.Popen(ytdlp_command, stdout=subprocess.PIPE, stderr=ytdlp_stderr)
+                ffmpeg_process = subprocess.Popen(ffmpeg_command, stdin=ytdlp_process.stdout,
+                                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                ytdlp_process.stdout.close() # ffmpeg owns the read end now; lets yt-dlp see SIGPIPE if ffmpeg dies
+                try:
+                    _, ffmpeg_err = ffmpeg_process.communicate(timeout=300) # 5 min timeout
+                    ytdlp_returncode = ytdlp_process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    ffmpeg_process.kill()
+                    raise
+                ytdlp_stderr.seek(0)
+                ytdlp_err = ytdlp_stderr.read().decode('utf-8', errors='replace')
+
+            if ytdlp_returncode != 0:
+                print(f"ERROR: yt-dlp failed with exit code {ytdlp_returncode}")
+                print("yt-dlp stderr:", ytdlp_err)
+                return None
+            if ffmpeg_process.returncode != 0 or not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+                print(f"ERROR: ffmpeg transcode failed with exit code {ffmpeg_process.returncode}")
+                print("ffmpeg stderr:", ffmpeg_err.decode('utf-8', errors='replace'))
+                return None
+
+            os.replace(temp_path, output_path)
+            print(f"Successfully downloaded audio to: {output_path} "
+                  f"({os.path.getsize(output_path) / 1e6:.1f} MB in {time.time() - start_time:.1f}s)")
+            return output_path
+
+        except FileNotFoundError as e:
+            print(f"ERROR: '{e.filename}' command not found. Are yt-dlp and ffmpeg installed and in PATH?")
+            return None
+        except subprocess.TimeoutExpired:
+             print("ERROR: yt-dlp download timed out.")
+             return None
+        except Exception as e:
+            print(f"ERROR: An unexpected error occurred during download: {e}")
+            return None
+        finally:
+            if ytdlp_process and ytdlp_process.poll() is None:
+                ytdlp_process.kill()
+                ytdlp_process.wait()
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def _transcribe_url(self, url):
+        """
+        Returns the transcript for a URL, reusing the download cache where possible:
+        a cached transcript skips both download and transcription, cached audio skips the download.
+        """
+        cache_key = self.download_cache.key_for_url(url)
+        # Transcripts from a different backend/model are not reused
+        model = f"{type(self.transcription_service.backend).__name__}:{self.transcription_service.model}"
+        cached = self.download_cache.get_transcript(cache_key, model=model)
+        if cached:
+            print(f"Using cached transcript for {cache_key}.")
+            return cached['text']
+
+        # Held until transcribed, so eviction by another ingest thread cannot delete the audio mid-use
+        with self.download_cache.hold(cache_key):
+            audio_path = self.download_cache.get_audio(cache_key)
+            if audio_path:
+                print(f"Using cached audio for {cache_key}: {audio_path}")
             else:
-                 print("ERROR: yt-dlp ran but could not find downloaded file.")
-                 return None
+                downloaded_path = self._download_youtube_audio(url)
+                if not downloaded_path:
+                    print("ERROR: Failed to download or find audio from URL.")
+                    return None
+                audio_path = self.download_cache.put_audio(cache_key, downloaded_path)
+
+            result = self.transcription_service.transcribe_audio_detailed(audio_path)
+            if not result:
+                return None
+            self.download_cache.put_transcript(cache_key, result, source_url=url, model=model)
+        return result['text']
 
+    @staticmethod
+    def _is_collection_url(url):
+        """True for playlist and channel URLs, which expand to many videos."""
+        path = urlparse(url).path
+        return path.startswith(('/playlist', '/@', '/channel/', '/c/', '/user/'))
+
+    def _expand_collection(self, url):
+        """Lists the video URLs in a playlist/channel with yt-dlp --flat-playlist (no media is downloaded)."""
+        command = [
+            'yt-dlp',
+            '--flat-playlist',
+            '--print', 'url',
+            '--playlist-end', str(config.get('INGEST_PLAYLIST_MAX_ITEMS', 50)),
+            '--socket-timeout', '30',
+            '--quiet', '--no-warnings',
+            url
+        ]
+        print(f"Expanding playlist: {' '.join(command)}")
+        try:
+            result = subprocess.run(command, check=True, capture_output=True, text=True, timeout=120)
         except FileNotFoundError:
             print("ERROR: 'yt-dlp' command not found. Is it installed and in PATH?")
             return None
         except subprocess.CalledProcessError as e:
-            print(f"ERROR: yt-dlp failed with exit code {e.returncode}")
+            print(f"ERROR: yt-dlp playlist expansion failed with exit code {e.returncode}")
             print("yt-dlp stderr:", e.stderr)
             return None
         except subprocess.TimeoutExpired:
-             print("ERROR: yt-dlp download timed out.")
-             return None
-        except Exception as e:
-            print(f"ERROR: An unexpected error occurred during download: {e}")
+            print("ERROR: yt-dlp playlist expansion timed out.")
             return None
+        return [line.strip() for line in result.stdout.splitlines() if line.strip().startswith(('http://', 'https://'))]
+
+    def expand_sources(self, urls):
+        """
+        Turns a list of video/playlist/channel URLs into a de-duplicated list of video URLs.
+        Returns (video_urls, failures) where failures is [{'url', 'error'}] for sources that could not be read.
+        """
+        video_urls = []
+        failures = []
+        seen_keys = set()
+        for url in urls:
+            url = url.strip()
+            if not url.startswith(('http://', 'https://')):
+                failures.append({'url': url, 'error': 'Not an http(s) URL'})
+                continue
+            expanded = self._expand_collection(url) if self._is_collection_url(url) else [url]
+            if not expanded:
+                failures.append({'url': url, 'error': 'Could not list playlist entries' if expanded is None else 'Playlist is empty'})
+                continue
+            for video_url in expanded:
+                key = self.download_cache.key_for_url(video_url)
+                if key not in seen_keys:
+                    seen_keys.add(key)
+                    video_urls.append(video_url)
+        return video_urls, failures
+
+    def process_urls(self, urls, max_workers=None, item_callback=None):
+        """
+        Downloads and transcribes many video URLs concurrently (bounded by INGEST_CONCURRENCY).
+        A failing URL never aborts the batch. Returns [{'url', 'text', 'error'}] in input order;
+        item_callback(result), if given, is called as each item finishes.
+        """
+        max_workers = max_workers or config.get('INGEST_CONCURRENCY', 4)
+
+        def ingest(url):
+            try:
+                text = self._transcribe_url(url)
+                item = {'url': url, 'text': text, 'error': None if text else 'Download or transcription failed'}
+            except Exception as e:
+                print(f"ERROR: Unexpected error ingesting {url}: {e}")
+                item = {'url': url, 'text': None, 'error': str(e)}
+            if item_callback:
+                item_callback(item)
+            return item
+
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))), thread_name_prefix='ingest') as pool:
+            return list(pool.map(ingest, urls))
 
     def process_input(self, input_data, input_type):
         """
@@ -97,17 +244,8 @@ class InputProcessor:
         elif input_type == 'url':
             if isinstance(input_data, str) and input_data.startswith(('http://', 'https://')):
                 print(f"Processing URL input: {input_data}")
-                audio_path = self._download_youtube_audio(input_data)
-                if audio_path:
-                    text_content = self.transcription_service.transcribe_audio(audio_path)
-                    # Optional: Clean up downloaded file after transcription
-                    # try:
-                    #     os.remove(audio_path)
-                    #     print(f"Cleaned up downloaded file: {audio_path}")
-                    # except OSError as e:
-                    #     print(f"Warning: Could not delete downloaded file {audio_path}: {e}")
-                else:
-                    print("ERROR: Failed to download or find audio from URL.")
+                text_content = self._transcribe_url(input_data)
+                if text_content is None:
                     return None
             else:
                  print("ERROR: Invalid URL input provided.")
@@ -0,0 +1,101 @@
+# src/job_manager.py
+import os
+import socket
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .config_manager import manager as config
+from .database_manager import DatabaseManager
+
+class JobManager:
+    """
+    Runs long pipeline work (downloads, transcription, GPT, TTS, rendering) on a bounded
+    background thread pool so web requests can return immediately with a job id.
+    Job state and progress are persisted in the 'jobs' table of the main database.
+    """
+
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+    def __init__(self, db_manager=None, max_workers=None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.max_workers = max_workers or config.get('JOB_WORKERS', 2)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._fail_orphaned_jobs()
+        print(f"JobManager initialized with {self.max_workers} worker threads.")
+
+    def _fail_orphaned_jobs(self):
+        """Marks unfinished jobs whose owning process on this host no longer exists as FAILED."""
+        host = socket.gethostname()
+        for job in self.db_manager.list_unfinished_jobs():
+            owner_host, _, owner_pid = (job.get('owner') or '').rpartition(':')
+            if owner_host != host or not owner_pid.isdigit():
+                continue # Owned by another host; only that host can tell whether it is alive
+            if int(owner_pid) != os.getpid() and self._pid_alive(int(owner_pid)):
+                continue
+            print(f"Info: Marking orphaned job {job['id']} ({job['job_type']}) as FAILED.")
+            self.db_manager.update_job(job['id'], status=self.FAILED, finished_at=int(time.time()),
+                                       error="Interrupted: the process running this job exited.")
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True # Exists, owned by another user
+        return True
+
+    def submit(self, job_type, target, *args, **kwargs):
+        """
+        Queues target(progress, *args, **kwargs) for background execution.
+        `progress(percent, message=None)` lets the job report how far along it is.
+        Whatever the target returns is stored (as JSON) as the job result.
+        Returns the new job id, or None if the job could not be recorded.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        if not self.db_manager.create_job(job_id, job_type, self.owner, message="Queued"):
+            return None
+        self.executor.submit(self._run, job_id, job_type, target, args, kwargs)
+        print(f"Queued background job {job_id} ({job_type}).")
+        return job_id
+
+    def _run(self, job_id, job_type, target, args, kwargs):
+        """Executes one job on a pool thread and records its outcome."""
+        self.db_manager.update_job(job_id, status=self.RUNNING, started_at=int(time.time()), message="Running")
+
+        def progress(percent, message=None):
+            updates = {'progress': max(0.0, min(100.0, float(percent)))}
+            if message is not None:
+                updates['message'] = message
+            self.db_manager.update_job(job_id, **updates)
+
+        print(f"--- Job {job_id} ({job_type}) started ---")
+        start_time = time.time()
+        try:
+            result = target(progress, *args, **kwargs)
+        except Exception as e:
+            print(f"ERROR: Job {job_id} ({job_type}) failed: {e}")
+            traceback.print_exc()
+            self.db_manager.update_job(job_id, status=self.FAILED, finished_at=int(time.time()),
+                                       error=str(e), message="Failed")
+            return
+        duration = time.time() - start_time
+        print(f"--- Job {job_id} ({job_type}) finished in {duration:.2f}s ---")
+        self.db_manager.update_job(job_id, status=self.SUCCEEDED, progress=100, finished_at=int(time.time()),
+                                   result=result, message="Completed")
+
+    def get_job(self, job_id):
+        return self.db_manager.get_job(job_id)
+
+    def list_jobs(self, limit=20):
+        return self.db_manager.list_jobs(limit=limit)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -2,6 +2,8 @@
 import openai
 import time
 from .config_manager import manager as config
+from .response_cache import ResponseCache, get_response_cache
+from .resilience import call_provider
 
 class LLMService:
     """Handles interactions with the OpenAI API (GPT and DALL-E)."""
@@ -10,31 +12,55 @@ class LLMService:
         self.api_key = config.get('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not configured in .env.")
-        self.client = openai.OpenAI(api_key=self.api_key)
+        # 429s are retried by the shared rate limiter, which needs to see them to adapt
+        self.client = openai.OpenAI(api_key=self.api_key, max_retries=0) # Retries are handled by src.resilience
         self.gpt_model = config.get('OPENAI_GPT_MODEL', "gpt-3.5-turbo")
         self.image_model = config.get('OPENAI_IMAGE_MODEL', "dall-e-2")
+        self.cache = get_response_cache() if config.get('LLM_CACHE_ENABLED', True) else None
+        self.cache_ttl = config.get('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600)
+        # DALL-E URLs expire after about an hour, so image responses get a much shorter TTL
+        self.image_cache_ttl = config.get('LLM_IMAGE_CACHE_TTL_SECONDS', 45 * 60)
         print(f"LLMService initialized with GPT model: {self.gpt_model}, Image model: {self.image_model}")
 
-    def _call_gpt(self, messages, temperature=0.7, max_tokens=1500):
-        """ Generic function to call the OpenAI Chat Completion endpoint. """
+    def _call_gpt(self, messages, temperature=0.7, max_tokens=1500, use_cache=True, validate=None):
+        """
+        Generic function to call the OpenAI Chat Completion endpoint.
+        Responses are cached by model, messages, temperature and max_tokens; pass
+        use_cache=False for an intentionally fresh generation (its result still replaces
+        the cached one). Only responses passing
+        `validate(content)` (if given) are cached, so a malformed answer is never replayed.
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key('chat', model=self.gpt_model, messages=messages,
+                                               temperature=temperature, max_tokens=max_tokens)
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                print(f"OpenAI Chat Completion served from cache (model: {self.gpt_model}).")
+                return cached
         try:
             print(f"Calling OpenAI Chat Completion API (model: {self.gpt_model})...")
             start_time = time.time()
-            response = self.client.chat.completions.create(
+            # Raw response so the rate limiter can read the rate-limit headers
+            raw_response = call_provider('openai_chat',
+                self.client.chat.completions.with_raw_response.create,
                 model=self.gpt_model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
+            response = raw_response.parse()
             duration = time.time() - start_time
             print(f"OpenAI API call completed in {duration:.2f} seconds.")
             content = response.choices[0].message.content.strip()
+            if cache_key and content and (validate is None or validate(content)):
+                self.cache.set(cache_key, 'chat', content, self.cache_ttl, duration)
             return content
         except openai.AuthenticationError as e:
              print(f"ERROR: OpenAI Authentication Failed. Check API Key. {e}")
              raise
         except openai.RateLimitError as e:
-            print(f"ERROR: OpenAI Rate Limit Exceeded. Check your plan and usage limits. {e}")
+            print(f"ERROR: OpenAI Rate Limit Exceeded after retries. Check your plan and usage limits. {e}")
             raise
         except openai.APIConnectionError as e:
             print(f"ERROR: OpenAI API Connection Error: {e}")
@@ -43,8 +69,11 @@ class LLMService:
             print(f"ERROR: An unexpected error occurred during OpenAI API call: {e}")
             raise
 
-    def generate_topics(self, input_text, num_topics=10):
-        """ Generates video topic ideas based on input text (script, URL content, etc.). """
+    def generate_topics(self, input_text, num_topics=10, fresh=False):
+        """
+        Generates video topic ideas based on input text (script, URL content, etc.).
+        fresh=True bypasses the response cache.
+        """
         print(f"Generating {num_topics} topics based on input...")
         system_prompt = "You are an assistant skilled in creating engaging YouTube video topic ideas."
         user_prompt = f"""Based on the following input text, generate a list of {num_topics} distinct and catchy YouTube video topic ideas suitable for faceless videos (like slideshows with voiceover). Format the output as a numbered list, with each topic on a new line.
@@ -63,7 +92,7 @@ Example Output Format:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
-        raw_response = self._call_gpt(messages, max_tokens=300 * num_topics // 10) # Estimate tokens
+        raw_response = self._call_gpt(messages, max_tokens=300 * num_topics // 10, use_cache=not fresh) # Estimate tokens
 
         # Process the response to extract topics
         topics = []
@@ -86,8 +115,8 @@ Example Output Format:
         print(f"Generated {len(topics)} topic ideas.")
         return topics[:num_topics] # Return only the requested number
 
-    def generate_script(self, topic, target_word_count=300):
-        """Generates a video script (hook, body) for a given topic."""
+    def generate_script(self, topic, target_word_count=300, fresh=False):
+        """Generates a video script (hook, body) for a given topic. fresh=True bypasses the response cache."""
         print(f"Generating script for topic: '{topic}'...")
         system_prompt = """You are a helpful assistant skilled in writing engaging scripts for short, faceless YouTube videos (like informative slideshows).
         The script should have a clear Hook and Body section.
@@ -123,7 +152,8 @@ Example Output Format:
         ]
         # Estimate max tokens based on word count (approx 1.5 tokens per word + prompt overhead)
         estimated_tokens = int(target_word_count * 1.5) + 300
-        script_content = self._call_gpt(messages, max_tokens=estimated_tokens, temperature=0.6)
+        script_content = self._call_gpt(messages, max_tokens=estimated_tokens, temperature=0.6, use_cache=not fresh,
+                                        validate=lambda content: "Hook:" in content and "Body:" in content)
 
         # Basic validation: Check if Hook and Body markers are present
         if script_content and "Hook:" in script_content and "Body:" in script_content:
@@ -154,28 +184,43 @@ Example Output Format:
         time.sleep(0.1)
         return f"{image_style} illustration of {script_section[:50]}" # Basic placeholder
 
-    def generate_images(self, prompt, n=1, size="1024x1024"):
-        """ Calls DALL-E API to generate images. """
+    def generate_images(self, prompt, n=1, size="1024x1024", use_cache=True, variant=None):
+        """
+        Calls DALL-E API to generate images. Returned URLs are cached while still valid.
+        variant separates callers that need distinct images for the same prompt (e.g. visual slots).
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key('image', model=self.image_model, prompt=prompt, n=n, size=size,
+                                               variant=variant)
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached:
+                print(f"DALL-E image URLs served from cache for prompt: '{prompt[:50]}...'")
+                return cached
         try:
             print(f"Calling DALL-E API (model: {self.image_model}) with prompt: '{prompt[:50]}...'")
             start_time = time.time()
-            response = self.client.images.generate(
+            raw_response = call_provider('dalle',
+                self.client.images.with_raw_response.generate,
                 model=self.image_model,
                 prompt=prompt,
                 n=n,
                 size=size, # e.g., "1024x1024", "1792x1024", "1024x1792" for dall-e-3
                 response_format="url" # Or "b64_json"
             )
+            response = raw_response.parse()
             duration = time.time() - start_time
             print(f"DALL-E API call completed in {duration:.2f} seconds.")
             image_urls = [img.url for img in response.data if img.url]
+            if cache_key and image_urls:
+                self.cache.set(cache_key, 'image', image_urls, self.image_cache_ttl, duration)
             # If using b64_json: image_data = [img.b64_json for img in response.data]
             return image_urls
         except openai.AuthenticationError as e:
              print(f"ERROR: OpenAI DALL-E Authentication Failed. {e}")
              raise
         except openai.RateLimitError as e:
-            print(f"ERROR: OpenAI DALL-E Rate Limit Exceeded. {e}")
+            print(f"ERROR: OpenAI DALL-E Rate Limit Exceeded after retries. {e}")
             raise
         except openai.BadRequestError as e:
              print(f"ERROR: OpenAI DALL-E Bad Request (check prompt/parameters?): {e}")
@@ -0,0 +1,192 @@
+# src/music_library.py
+"""
+Background music catalog.
+- MUSIC_DIR is scanned incrementally: only files whose size or mtime changed are analyzed.
+- Analysis is one ffmpeg pass per track: duration, integrated loudness (EBU R128) and a
+  coarse RMS envelope, stored compactly in the music_tracks table.
+- Render-time track selection, level matching and start offsets read only the index,
+  so no track is decoded just to decide how to use it.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .config_manager import manager as config
+from .database_manager import DatabaseManager, get_connection_pool
+from .audio_utils import decode_pcm_with_loudness
+
+MUSIC_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac')
+_ANALYSIS_SAMPLE_RATE = 8000 # Plenty for an RMS envelope; loudness is measured on the original signal
+_SILENCE_DBFS = -90
+
+
+def rms_envelope(pcm, sample_rate, interval):
+    """RMS level in whole dBFS per interval seconds of 16-bit mono PCM, as int8 bytes."""
+    samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+    window = max(1, int(sample_rate * interval))
+    count = -(-len(samples) // window) # Ceiling, so a trailing partial window is kept
+    if count == 0:
+        return b''
+    padded = np.zeros(count * window, dtype=np.float32)
+    padded[:len(samples)] = samples
+    rms = np.sqrt(np.mean(np.square(padded.reshape(count, window)), axis=1))
+    dbfs = 20 * np.log10(np.maximum(rms, 10 ** (_SILENCE_DBFS / 20)))
+    return np.clip(np.rint(dbfs), _SILENCE_DBFS, 0).astype(np.int8).tobytes()
+
+
+class MusicLibrary:
+    """Index of the tracks in MUSIC_DIR, kept in the music_tracks table of the main database."""
+
+    def __init__(self, music_dir=None, db_path=None):
+        self.music_dir = music_dir or config.get('MUSIC_DIR')
+        DatabaseManager(db_path=db_path) # Ensures migrations (music_tracks table) are applied
+        self.pool = get_connection_pool(db_path or config.get('DATABASE_FILE'))
+        self.envelope_interval = config.get('MUSIC_ENVELOPE_SECONDS', 0.5)
+        self._scan_lock = threading.Lock()
+
+    def _files(self):
+        """Returns {relative_path: (size, mtime_ns)} for the audio files under music_dir."""
+        files = {}
+        for root, _, names in os.walk(self.music_dir):
+            for name in names:
+                if not name.lower().endswith(MUSIC_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[os.path.relpath(path, self.music_dir)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _analyze(self, relative_path, size, mtime_ns):
+        """Measures one track. Returns its row tuple, or None if it could not be decoded."""
+        pcm, lufs = decode_pcm_with_loudness(os.path.join(self.music_dir, relative_path), _ANALYSIS_SAMPLE_RATE)
+        if not pcm:
+            return None
+        duration = len(pcm) / 2 / _ANALYSIS_SAMPLE_RATE
+        envelope = rms_envelope(pcm, _ANALYSIS_SAMPLE_RATE, self.envelope_interval)
+        return (relative_path, size, mtime_ns, round(duration, 3), lufs, envelope,
+                self.envelope_interval, int(time.time()))
+
+    def scan(self, max_workers=None):
+        """
+        Brings the index up to date with MUSIC_DIR: analyzes new and changed files (in parallel)
+        and drops rows for deleted ones. Returns counts {'added', 'updated', 'removed', 'unchanged', 'failed'}.
+        """
+        with self._scan_lock:
+            files = self._files()
+            try:
+                conn = self.pool.get_connection()
+                indexed = {row['path']: (row['size'], row['mtime_ns'])
+                           for row in conn.execute("SELECT path, size, mtime_ns FROM music_tracks")}
+            except sqlite3.Error as e:
+                print(f"ERROR: Could not read music index: {e}")
+                return None
+            changed = [(path, *identity) for path, identity in files.items() if indexed.get(path) != identity]
+            removed = [path for path in indexed if path not in files]
+            counts = {'added': 0, 'updated': 0, 'removed': len(removed),
+                      'unchanged': len(files) - len(changed), 'failed': 0}
+            rows = []
+            if changed:
+                print(f"Indexing {len(changed)} music track(s) in {self.music_dir}...")
+                workers = max_workers or config.get('MUSIC_SCAN_CONCURRENCY', 4)
+                with ThreadPoolExecutor(max_workers=max(1, min(workers, len(changed))), thread_name_prefix='music') as pool:
+                    for (path, _, _), row in zip(changed, pool.map(lambda item: self._analyze(*item), changed)):
+                        if row is None:
+                            print(f"Warning: Could not analyze music track '{path}'; skipping.")
+                            counts['failed'] += 1
+                            continue
+                        rows.append(row)
+                        counts['updated' if path in indexed else 'added'] += 1
+            if not rows and not removed:
+                return counts
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("INSERT OR REPLACE INTO music_tracks (path, size, mtime_ns, duration, loudness_lufs, "
+                                 "envelope, envelope_interval, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("DELETE FROM music_tracks WHERE path = ?", [(path,) for path in removed])
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print(f"ERROR: Could not update music index: {e}")
+                return None
+            print(f"Music index updated: {counts}")
+            return counts
+
+    @staticmethod
+    def _row_to_track(row):
+        track = dict(row)
+        track['envelope'] = np.frombuffer(track['envelope'], dtype=np.int8)
+        return track
+
+    def list_tracks(self):
+        """All indexed tracks (without envelopes), shortest first."""
+        try:
+            rows = self.pool.get_connection().execute(
+                "SELECT path, duration, loudness_lufs FROM music_tracks ORDER BY duration").fetchall()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"ERROR listing music tracks: {e}")
+            return []
+
+    def get_track(self, relative_path):
+        """An indexed track with its envelope as an int8 dBFS array, or None."""
+        try:
+            row = self.pool.get_connection().execute("SELECT * FROM music_tracks WHERE path = ?",
+                                                     (relative_path,)).fetchone()
+            return self._row_to_track(row) if row else None
+        except sqlite3.Error as e:
+            print(f"ERROR getting music track '{relative_path}': {e}")
+            return None
+
+    def select_track(self, duration, seed=""):
+        """
+        Picks a track for a video of the given duration: one long enough to play without looping
+        when possible, otherwise the longest. The choice among candidates is stable per seed
+        (e.g. the topic slug), so re-renders keep the same music. Returns a track dict or None.
+        """
+        try:
+            conn = self.pool.get_connection()
+            rows = conn.execute("SELECT path FROM music_tracks WHERE duration >= ? AND loudness_lufs IS NOT NULL "
+                                "ORDER BY path", (duration,)).fetchall()
+            if not rows:
+                rows = conn.execute("SELECT path FROM music_tracks WHERE loudness_lufs IS NOT NULL "
+                                    "ORDER BY duration DESC, path LIMIT 1").fetchall()
+        except sqlite3.Error as e:
+            print(f"ERROR selecting music track: {e}")
+            return None
+        if not rows:
+            return None
+        choice = int(hashlib.sha256(str(seed).encode('utf-8')).hexdigest(), 16) % len(rows)
+        track = self.get_track(rows[choice]['path'])
+        if track:
+            track['full_path'] = os.path.join(self.music_dir, track['path'])
+        return track
+
+    @staticmethod
+    def gain_db(track, target_lufs=None):
+        """Gain that brings the track's integrated loudness to MUSIC_TARGET_LUFS."""
+        target_lufs = config.get('MUSIC_TARGET_LUFS', -30.0) if target_lufs is None else target_lufs
+        if track.get('loudness_lufs') is None:
+            return 0.0
+        return round(target_lufs - track['loudness_lufs'], 2)
+
+    @staticmethod
+    def start_offset(track, threshold_dbfs=-45, duration=0.0):
+        """
+        Seconds to skip so the bed starts where the music is audible (past a silent intro),
+        keeping at least `duration` seconds of track ahead when the track is long enough.
+        """
+        envelope, interval = track['envelope'], track['envelope_interval']
+        audible = np.flatnonzero(envelope > threshold_dbfs)
+        if not len(audible):
+            return 0.0
+        offset = float(audible[0] * interval)
+        return round(max(0.0, min(offset, track['duration'] - duration)), 3)
@@ -0,0 +1,152 @@
+# src/pipeline_executor.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+from .config_manager import manager as config
+from .database_manager import LeaseHeartbeat, default_worker_id
+
+# Config setting and default giving each stage's worker count
+STAGE_WORKER_SETTINGS = {'SCRIPT': ('PIPELINE_SCRIPT_WORKERS', 8), 'ASSETS': ('PIPELINE_ASSET_WORKERS', 3)}
+
+_stage_pools = {}
+_stage_pools_lock = threading.Lock()
+
+
+def stage_pool(stage):
+    """Process-wide worker pool of a stage, shared by every run so its worker count caps the whole process."""
+    with _stage_pools_lock:
+        pool = _stage_pools.get(stage)
+        if pool is None:
+            setting, default = STAGE_WORKER_SETTINGS[stage]
+            pool = ThreadPoolExecutor(max_workers=config.get(setting, default), thread_name_prefix=f"{stage.lower()}-stage")
+            _stage_pools[stage] = pool
+        return pool
+
+class PipelineExecutor:
+    """
+    Runs the script and asset stages concurrently, each on a bounded worker pool.
+    The pools are shared process-wide, so concurrent runs (e.g. several dashboard jobs) together
+    stay within PIPELINE_SCRIPT_WORKERS / PIPELINE_ASSET_WORKERS; the orchestrator daemon is a
+    separate process with its own pools. Work is admitted in priority order (FAILED retry > PENDING_ASSETS > PENDING_SCRIPT)
+    by claiming topics under a lease; the stages then execute in parallel since both are
+    almost entirely network-bound (GPT, TTS, Pexels/DALL-E).
+    """
+
+    # (category, stage, statuses to claim from) in admission priority order
+    ADMISSION_ORDER = [
+        ('failed_retry', 'SCRIPT', ('FAILED',)),
+        ('assets', 'ASSETS', ('PENDING_ASSETS',)),
+        ('script', 'SCRIPT', ('PENDING_SCRIPT',)),
+    ]
+
+    def __init__(self, db_manager, script_writer=None, asset_generator=None, stages=None):
+        self.db_manager = db_manager
+        self.script_writer = script_writer
+        self.asset_generator = asset_generator
+        # Optionally restrict admission to some stages, e.g. ('SCRIPT',) for a script-only run
+        self.admission_order = [entry for entry in self.ADMISSION_ORDER if not stages or entry[1] in stages]
+
+    def _stage_processor(self, stage):
+        return self.script_writer if stage == 'SCRIPT' else self.asset_generator
+
+    def _admit(self, num_to_process, worker_id):
+        """Claims up to num_to_process topics in priority order. Returns [(category, stage, topic)]."""
+        admitted = []
+        for category, stage, from_statuses in self.admission_order:
+            limit = num_to_process - len(admitted)
+            if limit <= 0:
+                print(f"--- [{category}] Processing limit reached, skipping.")
+                break
+            if not self._stage_processor(stage):
+                print(f"--- [{category}] {stage.title()} service unavailable, skipping {from_statuses[0]} items.")
+                continue
+            topics = self.db_manager.claim_topics(stage, limit, worker_id, from_statuses=from_statuses)
+            print(f"--- [{category}] Admitted {len(topics)} {from_statuses[0]} topics: {topics}")
+            admitted.extend((category, stage, topic) for topic in topics)
+        return admitted
+
+    def _process(self, category, stage, topic, worker_id):
+        """Runs one stage for one topic under this run's lease. Returns (success, duration_seconds)."""
+        start_time = time.time()
+        try:
+            success = bool(self._stage_processor(stage).process_topic(topic, worker_id=worker_id))
+            if not success:
+                print(f"--- [{category}] FAILED {stage.lower()} for: {topic} (processor returned False)")
+        except Exception as e:
+            success = False
+            print(f"--- [{category}] FAILED {stage.lower()} for: {topic} (Unhandled Exception: {e})")
+            self.db_manager.update_status(topic, 'FAILED', worker_id=worker_id,
+                                          last_error=f"Unhandled {stage.lower()} exception: {e}")
+        return success, time.time() - start_time
+
+    def run(self, num_to_process, progress=None):
+        """
+        Processes up to num_to_process topics across both stages.
+        Returns per-run statistics (counts, durations, throughput) and a summary line.
+        """
+        report = progress or (lambda percent, message=None: None)
+        worker_id = default_worker_id()
+        print(f"\n>>> Pipeline run for up to {num_to_process} topics (shared pools: "
+              f"{config.get(*STAGE_WORKER_SETTINGS['SCRIPT'])} script, {config.get(*STAGE_WORKER_SETTINGS['ASSETS'])} asset workers) <<<")
+        run_start = time.time()
+
+        self.db_manager.reclaim_expired_leases()
+        admitted = self._admit(num_to_process, worker_id)
+        stats = {category: {'succeeded': 0, 'failed': 0, 'busy_seconds': 0.0, 'max_seconds': 0.0}
+                 for category, _, _ in self.admission_order}
+
+        if admitted:
+            completed = 0
+            futures = {}
+            try:
+                with LeaseHeartbeat(self.db_manager, [topic for _, _, topic in admitted], worker_id):
+                    # Submission follows admission order, so higher-priority work starts first in each pool
+                    futures = {stage_pool(stage).submit(self._process, category, stage, topic, worker_id): (category, topic)
+                               for category, stage, topic in admitted}
+                    for future in as_completed(futures):
+                        category, topic = futures[future]
+                        success, duration = future.result()
+                        entry = stats[category]
+                        entry['succeeded' if success else 'failed'] += 1
+                        entry['busy_seconds'] += duration
+                        entry['max_seconds'] = max(entry['max_seconds'], duration)
+                        completed += 1
+                        print(f"--- [{category}] {'SUCCESS' if success else 'FAILED'} for: {topic} ({duration:.1f}s)")
+                        report(100.0 * completed / len(admitted), f"Completed {completed}/{len(admitted)}: {topic}")
+            finally:
+                # The pools outlive this run: cancel only its own queued work and wait for what already started
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                # Claims never started (run interrupted) or skipped by a processor go back to their status
+                self.db_manager.release_claims([topic for _, _, topic in admitted], worker_id)
+
+        wall_seconds = time.time() - run_start
+        total_succeeded = sum(entry['succeeded'] for entry in stats.values())
+        total_failed = sum(entry['failed'] for entry in stats.values())
+        busy_seconds = sum(entry['busy_seconds'] for entry in stats.values())
+        throughput = (total_succeeded + total_failed) / wall_seconds * 60 if wall_seconds > 0 else 0.0
+        concurrency = busy_seconds / wall_seconds if wall_seconds > 0 else 0.0
+
+        if not admitted:
+            summary = "No pending items found to process in this run."
+        else:
+            parts = [f"{category.replace('_', ' ').title()}: {entry['succeeded']} ok / {entry['failed']} failed"
+                     f" (avg {entry['busy_seconds'] / max(1, entry['succeeded'] + entry['failed']):.1f}s,"
+                     f" max {entry['max_seconds']:.1f}s)"
+                     for category, entry in stats.items() if entry['succeeded'] or entry['failed']]
+            summary = (f"Processed {len(admitted)}/{num_to_process} topics in {wall_seconds:.1f}s "
+                       f"({throughput:.1f} topics/min, effective concurrency {concurrency:.1f}x). " + "; ".join(parts) + ".")
+        print(f"\n>>> {summary} <<<")
+
+        return {
+            'summary': summary,
+            'processed': len(admitted),
+            'succeeded': total_succeeded,
+            'failed': total_failed,
+            'wall_seconds': round(wall_seconds, 2),
+            'topics_per_minute': round(throughput, 2),
+            'effective_concurrency': round(concurrency, 2),
+            'stages': stats,
+        }
@@ -0,0 +1,240 @@
+# src/rate_limiter.py
+"""
+Shared client-side rate limiting for external APIs.
+- One limiter per provider (RATE_LIMITS), shared process-wide by every service and thread.
+- A token bucket paces requests to the provider's requests-per-minute ceiling.
+- An AIMD window bounds in-flight calls: halved on a 429, grown by one per window of successes
+  (slowly once it nears the size that last drew a 429).
+- Retry-After and rate-limit response headers (remaining/reset) pause the provider until
+  it will accept calls again, instead of spending requests on rejections.
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from .config_manager import manager as config
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def status_of(outcome):
+    """HTTP status of a response or an SDK/requests exception, if it carries one."""
+    for candidate in (outcome, getattr(outcome, 'response', None)):
+        for name in ('status_code', 'status'):
+            value = getattr(candidate, name, None)
+            if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+                return int(value)
+    return None
+
+
+def _headers_of(outcome):
+    for candidate in (outcome, getattr(outcome, 'response', None)):
+        headers = getattr(candidate, 'headers', None)
+        if headers is not None:
+            return headers
+    return {}
+
+
+def _header(headers, *names):
+    for name in names:
+        value = headers.get(name) if hasattr(headers, 'get') else None
+        if value is None and isinstance(headers, dict): # Plain dicts are case-sensitive
+            value = next((v for k, v in headers.items() if k.lower() == name.lower()), None)
+        if value is not None:
+            return str(value).strip()
+    return None
+
+
+def parse_wait_seconds(value, now=None):
+    """
+    Seconds to wait from a Retry-After or rate-limit reset header value: delta seconds ("12"),
+    a Unix timestamp, an OpenAI-style duration ("6m0s", "20ms") or an HTTP date. None if unparseable.
+    """
+    if not value:
+        return None
+    now = time.time() if now is None else now
+    try:
+        number = float(value)
+        # Large numbers are absolute epoch timestamps (e.g. Pexels X-Ratelimit-Reset)
+        return max(0.0, number - now) if number > 1e9 else max(0.0, number)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if parts and ''.join(f"{n}{u}" for n, u in parts) == value.replace(' ', ''):
+        return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderLimiter:
+    """Token bucket plus AIMD concurrency window for one API provider."""
+
+    def __init__(self, name, requests_per_minute=60, max_concurrency=4, min_concurrency=1, burst=None, max_retries=3):
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, max_concurrency))
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.limit = float(self.max_concurrency) # AIMD window, starts at the ceiling
+        self.tokens = self.capacity
+        self.in_flight = 0
+        self.blocked_until = 0.0 # Provider told us to wait (Retry-After / exhausted quota)
+        self._last_refill = time.monotonic()
+        self._next_decrease = 0.0
+        self._consecutive_limited = 0
+        self._ceiling = None # Window size at the last 429: growth past it is probed slowly
+        self._cond = threading.Condition()
+        self.stats_counters = {'calls': 0, 'rate_limited': 0, 'retries': 0, 'wait_seconds': 0.0}
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _wait_needed(self, now):
+        """Seconds until a call may start (0 if one can start now). Caller holds the lock."""
+        self._refill(now)
+        blocked = max(0.0, self.blocked_until - time.time())
+        if blocked:
+            return blocked
+        if self.in_flight >= max(self.min_concurrency, int(self.limit)):
+            return None # Woken by release()
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate if self.rate > 0 else None
+        return 0.0
+
+    def acquire(self):
+        """Blocks until a request may be sent, then takes a token and a concurrency slot."""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                wait = self._wait_needed(time.monotonic())
+                if wait == 0.0:
+                    break
+                self._cond.wait(timeout=wait)
+            self.tokens -= 1
+            self.in_flight += 1
+            self.stats_counters['calls'] += 1
+            self.stats_counters['wait_seconds'] += time.monotonic() - start
+
+    def release(self, status=None, headers=None):
+        """Returns the slot and adapts to the outcome (HTTP status and response headers, if known)."""
+        headers = headers or {}
+        now = time.time()
+        with self._cond:
+            self.in_flight -= 1
+            if status == 429:
+                self.stats_counters['rate_limited'] += 1
+                self._consecutive_limited += 1
+                retry_after_ms = _header(headers, 'retry-after-ms')
+                if retry_after_ms and retry_after_ms.replace('.', '', 1).isdigit():
+                    retry_after = float(retry_after_ms) / 1000
+                else:
+                    retry_after = parse_wait_seconds(_header(headers, 'Retry-After'))
+                if retry_after is None: # No hint: back off exponentially, capped at a minute
+                    retry_after = min(60.0, 2.0 ** (self._consecutive_limited - 1))
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                self.tokens = min(self.tokens, 0.0)
+                # One multiplicative decrease per congestion event, not one per rejected in-flight call
+                if now >= self._next_decrease:
+                    self._ceiling = self.limit
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    self._next_decrease = now + max(1.0, retry_after)
+                    print(f"Warning: {self.name} rate limited; concurrency now {int(self.limit)}, "
+                          f"pausing {retry_after:.1f}s.")
+            elif status is not None and status < 400:
+                self._consecutive_limited = 0
+                # +1 per window of successes, but ten times slower when approaching the last known ceiling
+                step = 1.0 / self.limit
+                if self._ceiling and self.limit + 1 >= self._ceiling:
+                    step /= 10
+                self.limit = min(float(self.max_concurrency), self.limit + step)
+            self._apply_quota_headers(headers, now)
+            self._cond.notify_all()
+
+    def _apply_quota_headers(self, headers, now):
+        """Honours remaining/reset quota headers (OpenAI, Pexels, IETF draft names). Caller holds the lock."""
+        remaining = _header(headers, 'x-ratelimit-remaining-requests', 'x-ratelimit-remaining', 'ratelimit-remaining')
+        if remaining is None:
+            return
+        try:
+            remaining = float(remaining)
+        except ValueError:
+            return
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0:
+            reset = parse_wait_seconds(_header(headers, 'x-ratelimit-reset-requests', 'x-ratelimit-reset',
+                                               'ratelimit-reset'), now)
+            if reset:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds a request slot for the duration of one call. The yielded dict may be given the
+        outcome (outcome['status'], outcome['headers']); exceptions are classified automatically.
+        """
+        self.acquire()
+        outcome = {'status': None, 'headers': None}
+        try:
+            yield outcome
+        except BaseException as e: # Including interrupts, so the slot is never leaked
+            self.release(status_of(e), _headers_of(e))
+            raise
+        self.release(outcome['status'], outcome['headers'])
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) under the limiter, retrying (up to max_retries) when the provider
+        answers 429, either as a returned response or a raised exception. Responses with a
+        status_code/headers (requests, OpenAI raw responses) feed the AIMD window and quota headers.
+        Returns fn's result; the last 429 is returned or re-raised once retries are exhausted.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.slot() as outcome:
+                    result = fn(*args, **kwargs)
+                    outcome['status'] = status_of(result) or 200
+                    outcome['headers'] = _headers_of(result)
+            except Exception as e:
+                if status_of(e) != 429 or attempt == self.max_retries:
+                    raise
+            else:
+                if outcome['status'] != 429 or attempt == self.max_retries:
+                    return result
+            self.stats_counters['retries'] += 1
+            print(f"Info: Retrying {self.name} call after rate limit (attempt {attempt + 2}/{self.max_retries + 1}).")
+
+    def stats(self):
+        with self._cond:
+            return {
+                **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats_counters.items()},
+                'concurrency_limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'blocked_seconds': round(max(0.0, self.blocked_until - time.time()), 1),
+            }
+
+
+def get_rate_limiter(provider):
+    """Process-wide limiter for a provider, configured from RATE_LIMITS[provider]."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            settings = (config.get('RATE_LIMITS') or {}).get(provider, {})
+            limiter = ProviderLimiter(provider, **settings)
+            _limiters[provider] = limiter
+        return limiter
+
+
+def rate_limit_stats():
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,268 @@
+# src/resilience.py
+"""
+Retry and circuit-breaker layer for outbound provider calls.
+- Errors are classified: timeouts, connection failures, 408/425/429 and 5xx are retryable;
+  other 4xx (bad request, auth, not found) are fatal and returned/raised at once.
+- Retryable failures are retried with exponential backoff and full jitter.
+- One circuit breaker per provider, shared by every service and topic in the process. It opens
+  after CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failed calls (immediately on 401/403),
+  rejects calls without touching the network for the cool-down, then lets a single probe through;
+  concurrent callers wait for the probe's verdict rather than failing.
+- Calls run under the provider's rate limiter (src.rate_limiter), which handles 429 pacing.
+- Successful call latencies feed a per-provider histogram (e.g. for TTS hedge thresholds).
+"""
+import math
+import random
+import threading
+import time
+
+from .config_manager import manager as config
+from .rate_limiter import get_rate_limiter, status_of
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+FATAL_PROVIDER_STATUSES = {401, 403} # Bad credentials or plan: the provider is unusable until fixed
+_TRANSIENT_ERROR_NAMES = ('Timeout', 'ConnectionError', 'APIConnectionError', 'ChunkedEncodingError')
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+    def __init__(self, provider, retry_in):
+        super().__init__(f"{provider} circuit open; skipping for another {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def is_retryable(outcome):
+    """True for a response status or exception worth retrying (transient), False for fatal ones."""
+    status = outcome if isinstance(outcome, int) else status_of(outcome)
+    if status is not None:
+        return status in RETRYABLE_STATUSES or status >= 500
+    if isinstance(outcome, (TimeoutError, ConnectionError)):
+        return True
+    # requests, urllib3 and the OpenAI SDK all name their transport errors this way
+    return isinstance(outcome, Exception) and any(
+        marker in cls.__name__ for cls in type(outcome).__mro__ for marker in _TRANSIENT_ERROR_NAMES)
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    base = config.get('RETRY_BASE_DELAY', 1.0) if base is None else base
+    cap = config.get('RETRY_MAX_DELAY', 20.0) if cap is None else cap
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open (one probe) after the cool-down."""
+
+    def __init__(self, name, failure_threshold=5, cooldown=120.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._probe_done = threading.Condition(self._lock)
+        self.stats_counters = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a probe through (0 when calls are allowed)."""
+        with self._lock:
+            if self.state != 'open':
+                return 0.0
+            return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def is_open(self):
+        """True while calls would be rejected. Does not consume the half-open probe."""
+        with self._lock:
+            if self.state == 'open':
+                return time.monotonic() < self.opened_at + self.cooldown
+            return self.state == 'half_open' and self._probe_in_flight
+
+    def allow(self):
+        """Admits a call (closed, or the single half-open probe) or counts a rejection."""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() >= self.opened_at + self.cooldown:
+                self.state = 'half_open'
+                self._probe_in_flight = False
+            if self.state == 'closed' or (self.state == 'half_open' and not self._probe_in_flight):
+                self._probe_in_flight = self.state == 'half_open'
+                return True
+            self.stats_counters['rejected'] += 1
+            return False
+
+    def wait_for_probe(self, timeout):
+        """
+        Waits (up to timeout seconds) while a half-open probe is in flight.
+        Returns True if calls may proceed afterwards (breaker closed or probe slot free).
+        """
+        with self._probe_done:
+            self._probe_done.wait_for(lambda: not (self.state == 'half_open' and self._probe_in_flight), timeout)
+            return self.state == 'closed' or (self.state == 'half_open' and not self._probe_in_flight)
+
+    def release_probe(self):
+        """Frees the half-open probe slot without recording an outcome (the call was abandoned)."""
+        with self._probe_done:
+            self._probe_in_flight = False
+            self._probe_done.notify_all()
+
+    def record_success(self):
+        with self._lock:
+            self.stats_counters['successes'] += 1
+            if self.state != 'closed':
+                print(f"Info: {self.name} circuit closed; provider recovered.")
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_in_flight = False
+            self._probe_done.notify_all()
+
+    def record_failure(self, trip=False):
+        """Counts a failed call; opens the breaker at the threshold, on a failed probe, or when tripped."""
+        with self._lock:
+            self.stats_counters['failures'] += 1
+            self.failures += 1
+            self._probe_in_flight = False
+            if trip or self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.stats_counters['opened'] += 1
+                    print(f"Warning: {self.name} circuit opened after {self.failures} failure(s); "
+                          f"skipping it for {self.cooldown:.0f}s.")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._probe_done.notify_all()
+
+    def stats(self):
+        retry_in = self.retry_in()
+        with self._lock:
+            return {**self.stats_counters, 'state': self.state, 'consecutive_failures': self.failures,
+                    'retry_in_seconds': round(retry_in, 1)}
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (buckets about 10% apart, from 10ms). Once max_samples are
+    recorded all counts are halved, so percentiles track the provider's recent behaviour.
+    """
+
+    MIN_SECONDS = 0.01
+    GROWTH = 1.1
+
+    def __init__(self, max_samples=500):
+        self.max_samples = max_samples
+        self.counts = {}
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        bucket = max(0, int(math.log(max(seconds, self.MIN_SECONDS) / self.MIN_SECONDS, self.GROWTH)))
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0.0) + 1
+            self.total += 1
+            if self.total > self.max_samples:
+                self.counts = {b: c / 2 for b, c in self.counts.items() if c >= 0.5}
+                self.total = sum(self.counts.values())
+
+    @property
+    def samples(self):
+        with self._lock:
+            return int(self.total)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-quantile (0-1), in seconds; None if empty."""
+        with self._lock:
+            target, seen = q * self.total, 0.0
+            for bucket in sorted(self.counts):
+                seen += self.counts[bucket]
+                if seen >= target:
+                    return round(self.MIN_SECONDS * self.GROWTH ** (bucket + 1), 3)
+        return None
+
+    def stats(self):
+        return {'samples': self.samples, 'p50': self.percentile(0.5), 'p90': self.percentile(0.9),
+                'p99': self.percentile(0.99)}
+
+
+def get_latency_histogram(provider):
+    """Process-wide latency histogram of a provider's successful calls."""
+    with _histograms_lock:
+        return _histograms.setdefault(provider, LatencyHistogram())
+
+
+def latency_stats():
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {name: histogram.stats() for name, histogram in histograms.items()}
+
+
+def get_circuit_breaker(provider):
+    """Process-wide breaker for a provider."""
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(provider, config.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5),
+                                     config.get('CIRCUIT_BREAKER_COOLDOWN_SECONDS', 120.0))
+            _breakers[provider] = breaker
+        return breaker
+
+
+def circuit_breaker_stats():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.stats() for name, breaker in breakers.items()}
+
+
+def call_provider(provider, fn, *args, **kwargs):
+    """
+    Calls fn(*args, **kwargs) against `provider` through its circuit breaker and rate limiter,
+    retrying transient failures (up to RETRY_MAX_ATTEMPTS attempts) with jittered backoff.
+    Returns fn's result; a response carrying a fatal or final error status is returned as is,
+    exceptions are re-raised. Raises CircuitOpenError without calling fn when the breaker is open.
+    """
+    breaker = get_circuit_breaker(provider)
+    if not breaker.allow():
+        # While another caller holds the half-open probe, wait for its verdict instead of failing
+        if not breaker.wait_for_probe(config.get('CIRCUIT_BREAKER_PROBE_WAIT_SECONDS', 180)) or not breaker.allow():
+            raise CircuitOpenError(provider, breaker.retry_in())
+    limiter = get_rate_limiter(provider)
+    max_attempts = max(1, config.get('RETRY_MAX_ATTEMPTS', 3))
+    recorded = False
+    try:
+        for attempt in range(max_attempts):
+            error = None
+            start_time = time.monotonic()
+            try:
+                result = limiter.call(fn, *args, **kwargs)
+            except Exception as e:
+                error = e
+            status = status_of(error if error is not None else result)
+            if error is None and (status is None or status < 400):
+                recorded = True
+                breaker.record_success()
+                get_latency_histogram(provider).record(time.monotonic() - start_time)
+                return result
+            retryable = is_retryable(error if error is not None else status)
+            # The limiter already waited out and retried 429s, so a 429 here is final
+            if retryable and status != 429 and attempt + 1 < max_attempts:
+                delay = backoff_delay(attempt)
+                print(f"Warning: {provider} call failed ({status or type(error).__name__}); "
+                      f"retrying in {delay:.1f}s (attempt {attempt + 2}/{max_attempts}).")
+                time.sleep(delay)
+                continue
+            recorded = True
+            if retryable or status in FATAL_PROVIDER_STATUSES:
+                breaker.record_failure(trip=status in FATAL_PROVIDER_STATUSES)
+            else:
+                breaker.record_success() # The provider answered; the request itself was bad
+            if error is not None:
+                raise error
+            return result
+    finally:
+        if not recorded: # Interrupted (KeyboardInterrupt, cancellation): never leave the probe slot taken
+            breaker.release_probe()
@@ -0,0 +1,179 @@
+# src/response_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .config_manager import manager as config
+from .database_manager import DatabaseManager, get_connection_pool
+
+class MemoryCacheBackend:
+    """Bounded in-memory LRU. Used on its own or as the fast front of a persistent backend."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (value, expires_at, duration_seconds)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, kind, value, expires_at, duration_seconds):
+        with self._lock:
+            self._entries[key] = (value, expires_at, duration_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteCacheBackend:
+    """Persistent cache in the llm_cache table of the main database (survives restarts)."""
+
+    EVICT_EVERY_N_WRITES = 50
+
+    def __init__(self, db_path=None, max_entries=5000):
+        DatabaseManager(db_path=db_path) # Ensures migrations (llm_cache table) are applied
+        self.pool = get_connection_pool(db_path or config.get('DATABASE_FILE'))
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = int(time.time())
+        try:
+            conn = self.pool.get_connection()
+            row = conn.execute("SELECT value, expires_at, duration_seconds FROM llm_cache WHERE key = ? AND expires_at > ?",
+                               (key, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return json.loads(row['value']), row['expires_at'], row['duration_seconds']
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Warning: LLM cache lookup failed: {e}")
+            return None
+
+    def set(self, key, kind, value, expires_at, duration_seconds):
+        now = int(time.time())
+        sql_upsert = """
+        INSERT INTO llm_cache (key, kind, value, created_at, expires_at, last_access, duration_seconds)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, created_at = excluded.created_at,
+            expires_at = excluded.expires_at, last_access = excluded.last_access,
+            duration_seconds = excluded.duration_seconds
+        """
+        try:
+            conn = self.pool.get_connection()
+            conn.execute(sql_upsert, (key, kind, json.dumps(value), now, int(expires_at), now, duration_seconds))
+        except sqlite3.Error as e:
+            print(f"Warning: LLM cache store failed: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICT_EVERY_N_WRITES == 0
+        if evict:
+            self.evict()
+
+    def delete(self, key):
+        try:
+            self.pool.get_connection().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Warning: LLM cache delete failed: {e}")
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones beyond max_entries."""
+        try:
+            conn = self.pool.get_connection()
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (int(time.time()),))
+            conn.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """, (self.max_entries,))
+        except sqlite3.Error as e:
+            print(f"Warning: LLM cache eviction failed: {e}")
+
+
+class ResponseCache:
+    """
+    Two-level cache for LLM API responses: in-memory LRU in front of a pluggable
+    persistent backend (SQLite by default). Tracks hit rate and API latency saved.
+    """
+
+    def __init__(self, backend=None, memory_entries=None):
+        self.memory = MemoryCacheBackend(memory_entries or config.get('LLM_CACHE_MEMORY_ENTRIES', 256))
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._metrics = {'memory_hits': 0, 'backend_hits': 0, 'misses': 0, 'seconds_saved': 0.0}
+
+    @staticmethod
+    def make_key(kind, **params):
+        """Stable key from the request parameters that determine the response."""
+        payload = json.dumps({'kind': kind, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Returns the cached value, or None on a miss."""
+        entry = self.memory.get(key)
+        level = 'memory_hits'
+        if entry is None and self.backend is not None:
+            entry = self.backend.get(key)
+            level = 'backend_hits'
+            if entry is not None:
+                self.memory.set(key, None, *entry) # Promote to the in-memory front
+        with self._lock:
+            if entry is None:
+                self._metrics['misses'] += 1
+                return None
+            self._metrics[level] += 1
+            self._metrics['seconds_saved'] += entry[2]
+        return entry[0]
+
+    def set(self, key, kind, value, ttl_seconds, duration_seconds=0.0):
+        expires_at = time.time() + ttl_seconds
+        self.memory.set(key, kind, value, expires_at, duration_seconds)
+        if self.backend is not None:
+            self.backend.set(key, kind, value, expires_at, duration_seconds)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def metrics(self):
+        with self._lock:
+            hits = self._metrics['memory_hits'] + self._metrics['backend_hits']
+            lookups = hits + self._metrics['misses']
+            return {
+                **self._metrics,
+                'seconds_saved': round(self._metrics['seconds_saved'], 2),
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Process-wide ResponseCache shared by every LLMService (so metrics cover the whole app)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            backend = None
+            if config.get('LLM_CACHE_BACKEND', 'sqlite') == 'sqlite':
+                backend = SqliteCacheBackend(max_entries=config.get('LLM_CACHE_MAX_ENTRIES', 5000))
+            _shared_cache = ResponseCache(backend=backend)
+        return _shared_cache
@@ -14,9 +14,10 @@ class ScriptWriter:
         self.assets_dir = config.get('ASSETS_DIR')
         print("ScriptWriter initialized.")
 
-    def process_topic(self, topic_name):
+    def process_topic(self, topic_name, worker_id=None):
         """
         Generates and saves script for a topic, updates DB status to PENDING_ASSETS.
+        worker_id: the claiming worker; status writes then apply only while it holds the lease.
         Returns True on success, False on failure.
         """
         print(f"Processing topic for script generation: '{topic_name}'")
@@ -30,8 +31,8 @@ class ScriptWriter:
         current_status = details.get('pipeline_status')
 
         # --- MODIFIED STATUS CHECK ---
-        # Allow processing if PENDING_SCRIPT or FAILED (for retry)
-        allowed_statuses = ['PENDING_SCRIPT', 'FAILED']
+        # Allow processing if PENDING_SCRIPT or FAILED (for retry), or already claimed for this stage
+        allowed_statuses = ['PENDING_SCRIPT', 'FAILED', 'IN_PROGRESS_SCRIPT']
         if current_status not in allowed_statuses:
              print(f"Warning: Topic '{topic_name}' status is '{current_status}'. Skipping script generation (requires {allowed_statuses}).")
              return False # Skip if not in an allowed starting state
@@ -44,11 +45,11 @@ class ScriptWriter:
             if not script_content:
                 # LLM Service already printed an error if generation failed structurally
                 print(f"ERROR: Failed to generate valid script content for '{topic_name}'.")
-                self.db_manager.update_status(topic_name, 'FAILED', last_error="Script generation failed (LLM Error)")
+                self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="Script generation failed (LLM Error)")
                 return False
         except Exception as e:
             print(f"ERROR: Exception during LLM script generation for '{topic_name}': {e}")
-            self.db_manager.update_status(topic_name, 'FAILED', last_error=f"Script generation failed: {e}")
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error=f"Script generation failed: {e}")
             return False
 
         # 3. Create Slug & Asset Path
@@ -64,13 +65,14 @@ class ScriptWriter:
             print(f"Saved generated script to: {script_path}")
         except OSError as e:
             print(f"ERROR: Failed to save script file to {script_path}: {e}")
-            self.db_manager.update_status(topic_name, 'FAILED', last_error=f"Failed to save script file: {e}")
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error=f"Failed to save script file: {e}")
             return False
 
         # 5. Update Database Status
         success = self.db_manager.update_status(
             topic=topic_name,
             status='PENDING_ASSETS',
+            worker_id=worker_id,
             generated_script_path=script_path, # Store the path
             last_error='' # Clear any previous error
         )
@@ -81,5 +83,5 @@ class ScriptWriter:
         else:
             print(f"ERROR: Failed to update database status for '{topic_name}' after saving script.")
             # The script is saved, but DB is inconsistent. Maybe mark as FAILED?
-            self.db_manager.update_status(topic_name, 'FAILED', last_error="DB status update failed after script save")
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="DB status update failed after script save")
             return False
\ No newline at end of file
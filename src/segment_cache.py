@@ -0,0 +1,123 @@
+# src/segment_cache.py
+import hashlib
+import json
+import os
+import threading
+
+from .config_manager import manager as config
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, memoized per (path, size, mtime) so unchanged visuals are hashed once."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(memo_key)
+    if digest:
+        return digest
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    digest = sha.hexdigest()
+    with _digests_lock:
+        _digests[memo_key] = digest
+    return digest
+
+
+class SegmentCache:
+    """
+    Content-addressed on-disk cache of rendered video segments.
+    A segment's key hashes everything that determines its pixels (visual content digest,
+    frame count, motion, captions and style, resolution, fps and encoder settings), so
+    re-rendering after an edit only encodes the segments whose inputs changed, across renders
+    and topics. Segments are rendered straight into the cache (atomically, under a temporary
+    name) and concatenated from there. Size-bounded, least recently used first.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or config.get('SEGMENT_CACHE_DIR') or os.path.join(config.get('ASSETS_DIR'), '_cache', 'segments')
+        self.max_bytes = max_bytes or config.get('SEGMENT_CACHE_MAX_BYTES', 10 * 1024 * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+        print(f"SegmentCache initialized at {self.cache_dir} ({self._total_bytes / 1e6:.1f} MB used).")
+
+    @staticmethod
+    def make_key(inputs):
+        """Cache key for a segment from a JSON-serializable dict of its render inputs."""
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.mp4')
+
+    def _entries(self):
+        """Yields (path, size, mtime) for every cached segment."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.mp4') or name.endswith('.part.mp4'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def get(self, key):
+        """Returns the cached segment's path on a hit (marking it recently used), else None."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def add(self, path):
+        """Accounts for a segment newly rendered into the cache. Call trim() once it is no longer in use."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._total_bytes += size
+
+    def trim(self):
+        """Deletes least-recently-used segments until under 90% of max_bytes (if over the bound)."""
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            removed = 0
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    pass
+            self._total_bytes = total
+        print(f"SegmentCache evicted {removed} segments ({total / 1e6:.1f} MB remaining).")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'bytes': self._total_bytes,
+            }
@@ -1,3 +1,4 @@
+import threading
 from .database_manager import DatabaseManager
 from .input_processor import InputProcessor
 from .llm_service import LLMService
@@ -12,53 +13,41 @@ class TopicGenerator:
         self.db_manager = DatabaseManager()
         print("TopicGenerator initialized with DatabaseManager.")
 
-    def generate_and_store_topics(self, input_data, input_type, num_topics=10):
+    def generate_and_store_topics(self, input_data, input_type, num_topics=10, progress_callback=None):
         """
         Processes input, generates topics, and stores them in the database.
         Returns the list of *newly added* topics or None on failure.
+        progress_callback(percent, message), if given, is called as each stage completes.
         """
         print(f"Starting topic generation process for input type: {input_type}")
+        report = progress_callback or (lambda percent, message=None: None)
+        report(5, f"Processing {input_type} input")
 
         text_content = self.input_processor.process_input(input_data, input_type)
         if not text_content:
             print("ERROR: Failed to get text content from input. Aborting topic generation.")
             return None
 
+        report(50, "Generating topic ideas")
         generated_topics = self.llm_service.generate_topics(text_content, num_topics=num_topics)
         if not generated_topics:
             print("ERROR: Failed to generate topics using LLM.")
             return None
 
-        added_count = 0
-        skipped_count = 0
-        failed_count = 0
-        added_topics_list = []
-
-        for topic in generated_topics:
-            # DETAIL EXTRACTION (Example - adapt as needed)
-            detail = ""
-            if isinstance(input_data, str):
-                detail = input_data[:200] # Truncate long scripts/URLs
-            elif isinstance(input_data, list):
-                detail = f"Based on {len(input_data)} samples."
-
-            # CALL DB MANAGER
-            success = self.db_manager.add_topic(
-                topic_name=topic,
-                source_type=input_type,
-                source_detail=detail
-            )
-            # add_topic returns True if added, False if skipped (duplicate) or error
-            if success is True: # Explicitly check for True (newly added)
-                added_count += 1
-                added_topics_list.append(topic)
-            elif success is False: # Check for False (skipped or failed)
-                # Check if it already exists to differentiate skipped vs failed
-                if self.db_manager.get_topic_details(topic):
-                    skipped_count += 1
-                else:
-                    failed_count += 1 # Treat other False returns as failures
+        # DETAIL EXTRACTION (Example - adapt as needed)
+        detail = ""
+        if isinstance(input_data, str):
+            detail = input_data[:200] # Truncate long scripts/URLs
+        elif isinstance(input_data, list):
+            detail = f"Based on {len(input_data)} samples."
 
+        report(90, f"Storing {len(generated_topics)} topics")
+        # Single transaction for the whole batch; duplicates come back as 'skipped'
+        result = self.db_manager.add_topics_bulk(generated_topics, source_type=input_type, source_detail=detail)
+        added_topics_list = result['added']
+        added_count = len(added_topics_list)
+        skipped_count = len(result['skipped'])
+        failed_count = len(result['failed'])
 
         print(f"Topic storage complete: {added_count} added, {skipped_count} skipped (duplicates), {failed_count} failed.")
 
@@ -71,4 +60,82 @@ class TopicGenerator:
                  return None # Indicate failure
             else:
                  print("Info: No new topics were added to the database (likely duplicates).")
-                 return [] # Indicate success but zero new topics
\ No newline at end of file
+                 return [] # Indicate success but zero new topics
+
+    def generate_and_store_topics_batch(self, urls, num_topics=10, combined=False, progress_callback=None):
+        """
+        Ingests many video/playlist URLs concurrently, then generates topics either per source
+        (num_topics each, source_detail = the video URL) or once across the combined corpus.
+        Failed sources are reported per item and never abort the batch.
+        Returns {'added', 'skipped', 'failed', 'items': [{'url', 'status', 'error', 'added'}]} or None if nothing could be ingested.
+        """
+        report = progress_callback or (lambda percent, message=None: None)
+        report(2, f"Expanding {len(urls)} sources")
+        video_urls, expand_failures = self.input_processor.expand_sources(urls)
+        items = [{'url': f['url'], 'status': 'FAILED', 'error': f['error'], 'added': 0} for f in expand_failures]
+        if not video_urls:
+            print("ERROR: No videos found in the batch input. Aborting topic generation.")
+            return None
+        print(f"Batch ingestion: {len(video_urls)} videos from {len(urls)} sources ({len(expand_failures)} sources failed).")
+
+        # Ingestion is the bulk of the work (download + Whisper): 5-70% of progress
+        done = [0]
+        lock = threading.Lock()
+        def on_item(item):
+            with lock:
+                done[0] += 1
+                status = "ok" if item['text'] else f"failed ({item['error']})"
+                report(5 + 65 * done[0] / len(video_urls), f"Ingested {done[0]}/{len(video_urls)}: {item['url']} {status}")
+
+        ingested = self.input_processor.process_urls(video_urls, item_callback=on_item)
+        sources = [item for item in ingested if item['text']]
+        items.extend({'url': item['url'], 'status': 'FAILED', 'error': item['error'], 'added': 0}
+                     for item in ingested if not item['text'])
+        if not sources:
+            print("ERROR: None of the batch sources could be transcribed. Aborting topic generation.")
+            return None
+
+        totals = {'added': [], 'skipped': [], 'failed': []}
+        def store(topics, detail):
+            result = self.db_manager.add_topics_bulk(topics, source_type='url_batch', source_detail=detail[:200])
+            for status in totals:
+                totals[status].extend(result[status])
+            return result
+
+        if combined:
+            report(75, f"Generating topics across {len(sources)} sources")
+            # generate_topics reads the first 3000 chars, so give every source an equal share
+            share = max(200, 3000 // len(sources))
+            corpus = "\n---\n".join(item['text'][:share] for item in sources)
+            try:
+                topics = self.llm_service.generate_topics(corpus, num_topics=num_topics)
+                if not topics:
+                    print("ERROR: Failed to generate topics using LLM.")
+                    items.extend({'url': item['url'], 'status': 'FAILED', 'error': 'Topic generation failed', 'added': 0}
+                                 for item in sources)
+                else:
+                    result = store(topics, f"Combined batch of {len(sources)} sources")
+                    items.extend({'url': item['url'], 'status': 'OK', 'error': None, 'added': len(result['added'])}
+                                 for item in sources)
+            except Exception as e:
+                print(f"ERROR: Combined topic generation failed: {e}")
+                items.extend({'url': item['url'], 'status': 'FAILED', 'error': str(e), 'added': 0} for item in sources)
+        else:
+            for index, item in enumerate(sources, start=1):
+                report(70 + 28 * index / len(sources), f"Generating topics {index}/{len(sources)}: {item['url']}")
+                try:
+                    topics = self.llm_service.generate_topics(item['text'], num_topics=num_topics)
+                    if not topics:
+                        items.append({'url': item['url'], 'status': 'FAILED', 'error': 'Topic generation failed', 'added': 0})
+                        continue
+                    result = store(topics, item['url'])
+                except Exception as e: # One failing source must not abort the rest of the batch
+                    print(f"ERROR: Topic generation failed for {item['url']}: {e}")
+                    items.append({'url': item['url'], 'status': 'FAILED', 'error': str(e), 'added': 0})
+                    continue
+                items.append({'url': item['url'], 'status': 'OK', 'error': None, 'added': len(result['added'])})
+
+        print(f"Batch topic storage complete: {len(totals['added'])} added, {len(totals['skipped'])} skipped (duplicates), "
+              f"{len(totals['failed'])} failed. Sources: {sum(1 for i in items if i['status'] == 'OK')} ok, "
+              f"{sum(1 for i in items if i['status'] == 'FAILED')} failed.")
+        return {**totals, 'items': items}
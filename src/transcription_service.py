@@ -1,47 +1,118 @@
 # src/transcription_service.py
 import openai
 import os
+import shutil
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from .config_manager import manager as config
+from .audio_utils import probe_duration, detect_silences, plan_split_points, extract_segment
+from .resilience import call_provider
 
-class TranscriptionService:
-    """Handles audio transcription using OpenAI Whisper."""
 
-    def __init__(self):
-        self.api_key = config.get('OPENAI_API_KEY')
-        if not self.api_key:
+def _field(item, name, default=None):
+    """Reads a field from an SDK object or a plain dict."""
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+class OpenAIWhisperBackend:
+    """Transcribes one audio file with the OpenAI Whisper API."""
+
+    def __init__(self, api_key, model):
+        if not api_key:
             raise ValueError("OPENAI_API_KEY not configured in .env.")
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.client = openai.OpenAI(api_key=api_key, max_retries=0) # Retries are handled by src.resilience
+        self.model = model
+
+    def transcribe(self, audio_file_path):
+        """Returns {'text': str, 'segments': [{'start', 'end', 'text'}]}."""
+        with open(audio_file_path, "rb") as audio_file:
+            def create():
+                audio_file.seek(0) # A rate-limited attempt may have consumed the file
+                return self.client.audio.transcriptions.with_raw_response.create(
+                    model=self.model,
+                    file=audio_file,
+                    response_format="verbose_json", # Includes segment timestamps
+                )
+            response = call_provider('whisper', create).parse()
+        segments = [{'start': float(_field(seg, 'start', 0.0)), 'end': float(_field(seg, 'end', 0.0)),
+                     'text': (_field(seg, 'text', '') or '').strip()}
+                    for seg in (_field(response, 'segments') or [])]
+        return {'text': (_field(response, 'text', '') or '').strip(), 'segments': segments}
+
+
+class FakeTranscriptionBackend:
+    """
+    Offline stand-in for Whisper, for local runs and tests.
+    Uses a sidecar transcript (<audio file>.txt) when present, otherwise a deterministic
+    placeholder, returned as a single segment spanning the file's duration.
+    """
+
+    def __init__(self, delay_seconds=0.0):
+        self.delay_seconds = delay_seconds
+
+    def transcribe(self, audio_file_path):
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds) # Simulate API latency
+        sidecar_path = audio_file_path + '.txt'
+        if os.path.exists(sidecar_path):
+            with open(sidecar_path, 'r', encoding='utf-8') as f:
+                text = f.read().strip()
+        else:
+            text = f"Transcript of {os.path.basename(audio_file_path)}."
+        duration = probe_duration(audio_file_path) or 0.0
+        return {'text': text, 'segments': [{'start': 0.0, 'end': duration, 'text': text}]}
+
+
+class TranscriptionService:
+    """
+    Handles audio transcription using OpenAI Whisper (or the offline fake backend).
+    Long inputs are split at silence boundaries into bounded segments which are
+    transcribed concurrently and merged in order with their timestamps.
+    """
+
+    def __init__(self, backend=None):
         self.model = config.get('OPENAI_WHISPER_MODEL', 'whisper-1')
-        print(f"TranscriptionService initialized with model: {self.model}")
+        if backend is None:
+            if config.get('TRANSCRIPTION_BACKEND', 'openai') == 'fake':
+                backend = FakeTranscriptionBackend()
+            else:
+                backend = OpenAIWhisperBackend(config.get('OPENAI_API_KEY'), self.model)
+        self.backend = backend
+        self.max_segment_seconds = config.get('TRANSCRIPTION_SEGMENT_SECONDS', 600)
+        self.max_upload_bytes = config.get('WHISPER_MAX_UPLOAD_BYTES', 24 * 1024 * 1024)
+        self.concurrency = config.get('TRANSCRIPTION_CONCURRENCY', 4)
+        print(f"TranscriptionService initialized with backend: {type(self.backend).__name__}, model: {self.model}")
 
     def transcribe_audio(self, audio_file_path):
         """
         Transcribes the given audio file.
         Returns the transcription text or None if an error occurs.
         """
+        result = self.transcribe_audio_detailed(audio_file_path)
+        return result['text'] if result else None
+
+    def transcribe_audio_detailed(self, audio_file_path):
+        """
+        Transcribes the given audio file, splitting long inputs for parallel transcription.
+        Returns {'text', 'segments': [{'start', 'end', 'text'}], 'parts'} or None on error.
+        """
         if not os.path.exists(audio_file_path):
             print(f"ERROR: Audio file not found at {audio_file_path}")
             return None
 
         print(f"Starting transcription for {audio_file_path} using {self.model}...")
         start_time = time.time()
+        duration = probe_duration(audio_file_path)
+        too_large = os.path.getsize(audio_file_path) > self.max_upload_bytes
+        too_long = duration is not None and duration > self.max_segment_seconds
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                # Ensure the file object is passed correctly
-                transcript_response = self.client.audio.transcriptions.create(
-                    model=self.model,
-                    file=audio_file # Pass the file object directly
-                    # language="en" # Optional: Specify language
-                    # response_format="text" # Default is json, 'text' is simpler if only text needed
-                )
-
-            duration = time.time() - start_time
-            # Access the text attribute from the response object
-            transcribed_text = transcript_response.text
-            print(f"Transcription completed in {duration:.2f} seconds. Length: {len(transcribed_text)} chars.")
-            return transcribed_text
-
+            if duration and (too_large or too_long):
+                result = self._transcribe_split(audio_file_path, duration)
+            else:
+                result = self._transcribe_whole(audio_file_path)
         except openai.AuthenticationError as e:
              print(f"ERROR: OpenAI Whisper Authentication Failed. {e}")
              return None
@@ -53,4 +124,53 @@ class TranscriptionService:
             return None
         except Exception as e:
             print(f"ERROR: An unexpected error occurred during transcription: {e}")
-            return None
\ No newline at end of file
+            return None
+
+        if result is None:
+            return None
+        elapsed = time.time() - start_time
+        print(f"Transcription completed in {elapsed:.2f} seconds ({result['parts']} part(s)). "
+              f"Length: {len(result['text'])} chars.")
+        return result
+
+    def _transcribe_whole(self, audio_file_path):
+        result = self.backend.transcribe(audio_file_path)
+        return {'text': result['text'], 'segments': result['segments'], 'parts': 1}
+
+    def _transcribe_split(self, audio_file_path, duration):
+        """Splits at silences, transcribes parts concurrently and merges them in order."""
+        silences = detect_silences(audio_file_path)
+        # Parts must fit the upload limit as well as the length limit (10% headroom for bitrate variation)
+        file_size = os.path.getsize(audio_file_path)
+        max_seconds = min(self.max_segment_seconds, duration * self.max_upload_bytes / file_size * 0.9)
+        plan = plan_split_points(duration, silences, max_seconds)
+        print(f"Splitting {duration:.0f}s of audio into {len(plan)} segments "
+              f"({len(silences)} silences found, concurrency {self.concurrency}).")
+
+        work_dir = tempfile.mkdtemp(prefix='transcribe_', dir=os.path.dirname(os.path.abspath(audio_file_path)))
+        extension = os.path.splitext(audio_file_path)[1] or '.mp3'
+        try:
+            part_paths = []
+            for index, (start, end) in enumerate(plan):
+                part_path = os.path.join(work_dir, f"part_{index:03d}{extension}")
+                if not extract_segment(audio_file_path, start, end, part_path):
+                    return None
+                part_paths.append(part_path)
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(part_paths))),
+                                    thread_name_prefix='transcribe') as pool:
+                # map() yields results in submission order, so the merge is order-stable
+                part_results = list(pool.map(self.backend.transcribe, part_paths))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        texts = []
+        segments = []
+        for (offset, end), part in zip(plan, part_results):
+            if part['text']:
+                texts.append(part['text'])
+            for seg in part['segments']:
+                segments.append({'start': round(offset + seg['start'], 3),
+                                 'end': round(min(end, offset + seg['end']), 3),
+                                 'text': seg['text']})
+        return {'text': " ".join(texts), 'segments': segments, 'parts': len(plan)}
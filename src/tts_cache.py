@@ -0,0 +1,133 @@
+# src/tts_cache.py
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import uuid
+
+from .config_manager import manager as config
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache for synthesized speech.
+    Entries are keyed by a hash of provider, voice/model identity, voice settings and
+    normalized text, so retrying a topic with an unchanged script costs no TTS calls.
+    Size-bounded with least-recently-used eviction (file mtime doubles as last access time).
+    Provider timestamp sidecars (<audio>.alignment.json) are cached alongside their audio.
+    """
+
+    SIDECAR_SUFFIX = '.alignment.json'
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or config.get('TTS_CACHE_DIR') or os.path.join(config.get('ASSETS_DIR'), '_cache', 'tts')
+        self.max_bytes = max_bytes or config.get('TTS_CACHE_MAX_BYTES', 1024 * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+        print(f"TTSCache initialized at {self.cache_dir} ({self._total_bytes / 1e6:.1f} MB used).")
+
+    @staticmethod
+    def normalize_text(text):
+        """Normalization applied before hashing so whitespace-only differences still hit."""
+        return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text or '')).strip()
+
+    @classmethod
+    def make_key(cls, provider, voice, settings, text, context=None):
+        """Cache key for one synthesis request. `context` covers inputs such as neighbouring text."""
+        payload = {
+            'provider': provider,
+            'voice': voice,
+            'settings': settings or {},
+            'text': cls.normalize_text(text),
+            'context': [cls.normalize_text(c) if isinstance(c, str) else c for c in (context or [])],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.mp3')
+
+    def _entries(self):
+        """Yields (path, size, mtime) for every cached file."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.mp3'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def get(self, key, dest_path):
+        """Copies a cached entry (and its timestamp sidecar, if any) to dest_path. Returns True on a hit."""
+        path = self._path_for(key)
+        try:
+            shutil.copyfile(path, dest_path)
+            os.utime(path) # Mark as recently used
+            if os.path.exists(path + self.SIDECAR_SUFFIX):
+                shutil.copyfile(path + self.SIDECAR_SUFFIX, dest_path + self.SIDECAR_SUFFIX)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def put(self, key, src_path):
+        """Stores a copy of src_path under key, then evicts old entries if over the size bound."""
+        path = self._path_for(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(src_path, temp_path)
+            if os.path.exists(src_path + self.SIDECAR_SUFFIX):
+                # Sidecar first, so a visible audio entry always has its timestamps
+                shutil.copyfile(src_path + self.SIDECAR_SUFFIX, temp_path + self.SIDECAR_SUFFIX)
+                os.replace(temp_path + self.SIDECAR_SUFFIX, path + self.SIDECAR_SUFFIX)
+            os.replace(temp_path, path) # Atomic: readers never see a partial entry
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Warning: Could not store TTS cache entry: {e}")
+            return False
+        with self._lock:
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def _evict(self):
+        """Deletes least-recently-used entries until under 90% of max_bytes. Caller holds the lock."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+                if os.path.exists(path + self.SIDECAR_SUFFIX):
+                    os.remove(path + self.SIDECAR_SUFFIX)
+            except OSError:
+                pass
+        self._total_bytes = total
+        print(f"TTSCache evicted {removed} entries ({total / 1e6:.1f} MB remaining).")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'bytes': self._total_bytes,
+            }
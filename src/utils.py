@@ -12,4 +12,56 @@ def slugify(value, allow_unicode=False):
     value = re.sub(r'[^\w\s-]', '', value.lower())
     value = re.sub(r'[-\s]+', '-', value).strip('-_')
     # Limit length for safety in file paths
-    return value[:50] if value else "default-slug"
\ No newline at end of file
+    return value[:50] if value else "default-slug"
+
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*$')
+
+def split_sentences(text):
+    """
+    Splits text into sentences at whitespace following terminal punctuation, keeping the
+    punctuation and any closing quotes/brackets. Lossless up to whitespace:
+    " ".join(split_sentences(text)) == " ".join(text.split()).
+    """
+    sentences, current = [], []
+    for word in text.split():
+        current.append(word)
+        if _SENTENCE_END.search(word):
+            sentences.append(" ".join(current))
+            current = []
+    if current:
+        sentences.append(" ".join(current))
+    return sentences
+
+
+def chunk_text(text, max_chars):
+    """
+    Packs whole sentences into chunks of at most max_chars characters.
+    A sentence longer than max_chars is split at clause punctuation, then at whitespace,
+    so no text is ever dropped.
+    """
+    pieces = []
+    for sentence in split_sentences(text):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        clauses = re.split(r'(?<=[,;:])\s+', sentence)
+        for clause in clauses:
+            while len(clause) > max_chars:
+                cut = clause.rfind(' ', 0, max_chars + 1)
+                if cut <= 0: cut = max_chars # No whitespace at all: hard cut
+                pieces.append(clause[:cut].strip())
+                clause = clause[cut:].strip()
+            if clause: pieces.append(clause)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current} {piece}" if current else piece
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,610 @@
+# src/video_editor.py
+import os
+import json
+import multiprocessing
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .config_manager import manager as config
+from .database_manager import DatabaseManager
+from .audio_utils import get_mp3_duration
+from .caption_renderer import CaptionRenderer, CaptionTrack, build_caption_timeline
+from .caption_alignment import align_voiceover, build_caption_chunks, load_caption_words, write_captions_file
+from .segment_cache import SegmentCache, file_digest
+from .music_library import MusicLibrary
+from .utils import slugify
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.webm', '.mkv')
+
+# Ken Burns variations, cycled through by segment index so consecutive images move differently
+KEN_BURNS_MOTIONS = ('zoom_in', 'pan_right', 'zoom_out', 'pan_left')
+KEN_BURNS_MAX_ZOOM = 1.15
+
+STALE_RENDER_DIR_SECONDS = 24 * 3600 # Work directories left behind by a killed render are removed after this
+
+_topic_render_locks = {}
+_topic_render_locks_lock = threading.Lock()
+
+
+def _topic_render_lock(topic_slug, preview):
+    """Process-wide lock serializing renders of one topic in one mode (preview or full)."""
+    with _topic_render_locks_lock:
+        return _topic_render_locks.setdefault((topic_slug, preview), threading.Lock())
+
+
+def output_resolution(aspect_ratio, short_side):
+    """(width, height) for an aspect ratio such as (16, 9), with both sides even for yuv420p."""
+    aspect_w, aspect_h = aspect_ratio
+    if aspect_w >= aspect_h:
+        height = short_side
+        width = short_side * aspect_w / aspect_h
+    else:
+        width = short_side
+        height = short_side * aspect_h / aspect_w
+    return int(round(width / 2)) * 2, int(round(height / 2)) * 2
+
+
+def _ken_burns_filter(motion, frames, width, height, fps, pix_fmt='yuv420p'):
+    """ffmpeg filter chain turning one still image into `frames` frames of pan/zoom motion."""
+    # Upscale first so zoompan's integer crop positions don't make the motion jitter
+    pre_w, pre_h = width * 2, height * 2
+    step = (KEN_BURNS_MAX_ZOOM - 1) / max(1, frames - 1)
+    centre_x = "iw/2-(iw/zoom/2)"
+    centre_y = "ih/2-(ih/zoom/2)"
+    if motion == 'zoom_in':
+        zoom, x, y = f"1+{step:.6f}*on", centre_x, centre_y
+    elif motion == 'zoom_out':
+        zoom, x, y = f"{KEN_BURNS_MAX_ZOOM}-{step:.6f}*on", centre_x, centre_y
+    elif motion == 'pan_right':
+        zoom, x, y = f"{KEN_BURNS_MAX_ZOOM}", f"(iw-iw/zoom)*on/{max(1, frames - 1)}", centre_y
+    else: # pan_left
+        zoom, x, y = f"{KEN_BURNS_MAX_ZOOM}", f"(iw-iw/zoom)*(1-on/{max(1, frames - 1)})", centre_y
+    return (f"scale={pre_w}:{pre_h}:force_original_aspect_ratio=increase,crop={pre_w}:{pre_h},"
+            f"zoompan=z='{zoom}':x='{x}':y='{y}':d={frames}:s={width}x{height}:fps={fps},"
+            f"setsar=1,format={pix_fmt}")
+
+
+def _clip_filter(width, height, fps, pix_fmt='yuv420p'):
+    """ffmpeg filter chain conforming a stock clip to the output size and frame rate."""
+    return (f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},"
+            f"fps={fps},setsar=1,format={pix_fmt}")
+
+
+_caption_renderers = {}
+
+def _kill_processes(*processes, wait=True):
+    """Kills the processes still running (and reaps them unless wait=False)."""
+    for process in processes:
+        if process.poll() is None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+    if wait:
+        for process in processes:
+            process.wait()
+
+
+def _burn_captions(job, input_args, video_filter, encode_args):
+    """
+    Decodes the segment to raw RGB frames, draws the segment's captions onto each frame
+    with NumPy and pipes the frames into the encoder. Raises on ffmpeg failure.
+    """
+    width, height, fps, frames = job['width'], job['height'], job['fps'], job['frames']
+    key = (job['caption_style'], width, height)
+    if key not in _caption_renderers: # One renderer per worker process; glyphs and overlays stay cached
+        _caption_renderers[key] = CaptionRenderer(job['caption_style'], (width, height))
+    track = CaptionTrack(_caption_renderers[key], job['captions'])
+
+    decode_command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', *input_args,
+                      '-vf', video_filter, '-frames:v', str(frames), '-an', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+    encode_command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+                      '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+                      *encode_args]
+    frame_bytes = width * height * 3
+    with tempfile.TemporaryFile() as decode_err, tempfile.TemporaryFile() as encode_err:
+        decoder = subprocess.Popen(decode_command, stdout=subprocess.PIPE, stderr=decode_err)
+        encoder = subprocess.Popen(encode_command, stdin=subprocess.PIPE, stderr=encode_err)
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            _kill_processes(decoder, encoder, wait=False)
+
+        # The pipe reads and writes have no timeout of their own: a hung ffmpeg is killed by this watchdog
+        watchdog = threading.Timer(job['timeout'], expire)
+        watchdog.daemon = True
+        watchdog.start()
+        frames_written = 0
+        try:
+            try:
+                for frame_index in range(frames):
+                    data = decoder.stdout.read(frame_bytes)
+                    if len(data) < frame_bytes:
+                        break
+                    frame = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3).copy()
+                    encoder.stdin.write(track.apply(frame, frame_index / fps + job['caption_offset']).data)
+                    frames_written += 1
+            except BrokenPipeError:
+                pass # The encoder exited early; its return code and stderr below say why
+            finally:
+                try:
+                    encoder.stdin.close()
+                except BrokenPipeError:
+                    pass
+                decoder.stdout.close()
+            decoder.wait(timeout=job['timeout'])
+            encoder.wait(timeout=job['timeout'])
+        except BaseException:
+            _kill_processes(decoder, encoder)
+            raise
+        finally:
+            watchdog.cancel()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(decoder.args, job['timeout'])
+        # Encoder first: when it exits early, the decoder only reports the broken pipe
+        for process, err in ((encoder, encode_err), (decoder, decode_err)):
+            if process.returncode != 0:
+                err.seek(0)
+                raise subprocess.CalledProcessError(process.returncode, process.args,
+                                                    stderr=err.read().decode('utf-8', errors='replace'))
+        if frames_written < frames:
+            # A short segment would drift the concatenated video against the audio and captions
+            decode_err.seek(0)
+            raise subprocess.CalledProcessError(
+                1, decoder.args, stderr=decode_err.read().decode('utf-8', errors='replace')
+                + f"\nDecoder produced only {frames_written}/{frames} frames.")
+
+
+def _make_proxy(original, proxy_path, kind, width, height, fps, timeout):
+    """Writes a downscaled copy of a visual (just large enough for the preview motion) to proxy_path."""
+    # Images keep 2x the preview size for the Ken Burns upscale; clips are conformed to preview size and rate
+    if kind == 'image':
+        scale = f"scale={width * 2}:{height * 2}:force_original_aspect_ratio=increase"
+        args = ['-vf', scale, '-frames:v', '1', '-q:v', '3']
+    else:
+        scale = f"scale={width}:{height}:force_original_aspect_ratio=increase,fps={fps}"
+        args = ['-vf', scale, '-an', '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '28']
+    stem, extension = os.path.splitext(proxy_path)
+    temp_path = f"{stem}.{os.getpid()}.{uuid.uuid4().hex}.part{extension}"
+    command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', original, *args, temp_path]
+    subprocess.run(command, check=True, capture_output=True, text=True, timeout=timeout)
+    os.replace(temp_path, proxy_path)
+
+
+def render_segment(job):
+    """
+    Renders one visual into a standalone H.264 segment (runs in a worker process).
+    Every segment uses identical codec parameters so they can be joined with a stream copy.
+    Returns (index, output_path or None, seconds, error).
+    """
+    start_time = time.time()
+    frames, width, height, fps = job['frames'], job['width'], job['height'], job['fps']
+    if job.get('proxy_of') and not os.path.exists(job['source']):
+        try:
+            _make_proxy(job['proxy_of'], job['source'], job['kind'], width, height, fps, job['timeout'])
+        except subprocess.CalledProcessError as e:
+            return job['index'], None, time.time() - start_time, f"Proxy failed: {(e.stderr or '').strip()[-500:]}"
+        except (OSError, subprocess.SubprocessError) as e:
+            return job['index'], None, time.time() - start_time, f"Proxy failed: {e}"
+    # Raw RGB is only needed when captions are drawn onto the decoded frames
+    pix_fmt = 'rgb24' if job.get('captions') else 'yuv420p'
+    if job['kind'] == 'image':
+        input_args = ['-i', job['source']]
+        video_filter = _ken_burns_filter(job['motion'], frames, width, height, fps, pix_fmt)
+    else:
+        # Loop clips shorter than their slot instead of freezing on the last frame
+        input_args = ['-stream_loop', '-1', '-i', job['source']]
+        video_filter = _clip_filter(width, height, fps, pix_fmt)
+    # Written under a unique temporary name so a killed render never leaves a reusable partial segment,
+    # and two workers rendering the same cache key never write the same file
+    temp_path = f"{os.path.splitext(job['output'])[0]}.{os.getpid()}.{uuid.uuid4().hex}.part.mp4"
+    os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+    encode_args = ['-frames:v', str(frames), '-an',
+                   '-c:v', 'libx264', '-preset', job['preset'], '-crf', str(job['crf']),
+                   '-pix_fmt', 'yuv420p', '-r', str(fps), '-video_track_timescale', '90000',
+                   '-threads', str(job['threads']), temp_path]
+    try:
+        if job.get('captions'):
+            _burn_captions(job, input_args, video_filter, encode_args)
+        else:
+            command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', *input_args, '-vf', video_filter, *encode_args]
+            subprocess.run(command, check=True, capture_output=True, text=True, timeout=job['timeout'])
+    except subprocess.CalledProcessError as e:
+        error = (e.stderr or '').strip()[-500:]
+    except (OSError, subprocess.SubprocessError) as e:
+        error = str(e)
+    else:
+        os.replace(temp_path, job['output'])
+        return job['index'], job['output'], time.time() - start_time, None
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+    return job['index'], None, time.time() - start_time, error
+
+
+class VideoEditor:
+    """
+    Renders a topic's visuals and voiceover into the final video.
+    Each visual becomes an independent sub-render (Ken Burns motion for images, trimmed
+    and conformed stock clips) executed in a process pool; the segments are then joined
+    with a stream-copy concat and the voiceover is muxed in. Render time scales with cores.
+    Segments are keyed by a hash of their inputs and kept in the SegmentCache, so after an
+    edit only the changed segments are encoded. Preview mode renders a low-resolution,
+    low-fps proxy from downscaled copies of the visuals.
+    """
+
+    EDITS_FILE = 'edits.json'
+
+    def __init__(self, render_workers=None):
+        self.db_manager = DatabaseManager()
+        self.assets_dir = config.get('ASSETS_DIR')
+        self.fps = config.get('VIDEO_FPS', 24)
+        self.width, self.height = output_resolution(config.get('VIDEO_ASPECT_RATIO', (16, 9)),
+                                                    config.get('VIDEO_SHORT_SIDE', 1080))
+        self.render_workers = render_workers or config.get('RENDER_WORKERS') or os.cpu_count() or 1
+        self.preset = config.get('RENDER_PRESET', 'veryfast')
+        self.crf = config.get('RENDER_CRF', 20)
+        self.segment_timeout = config.get('RENDER_SEGMENT_TIMEOUT', 600)
+        self.captions_enabled = config.get('CAPTIONS_ENABLED', True)
+        self.preview_width, self.preview_height = output_resolution(config.get('VIDEO_ASPECT_RATIO', (16, 9)),
+                                                                    config.get('PREVIEW_SHORT_SIDE', 360))
+        self.preview_fps = config.get('PREVIEW_FPS', 12)
+        self.segment_cache = SegmentCache() if config.get('SEGMENT_CACHE_ENABLED', True) else None
+        self.music_library = MusicLibrary(db_path=self.db_manager.db_path) if config.get('MUSIC_ENABLED', True) else None
+        print(f"VideoEditor initialized ({self.width}x{self.height} @ {self.fps}fps, {self.render_workers} render workers).")
+
+    def _render_profile(self, preview):
+        """Output size, frame rate and encoder settings for a final or preview render."""
+        if preview:
+            return {'width': self.preview_width, 'height': self.preview_height, 'fps': self.preview_fps,
+                    'preset': 'ultrafast', 'crf': config.get('PREVIEW_CRF', 30)}
+        return {'width': self.width, 'height': self.height, 'fps': self.fps, 'preset': self.preset, 'crf': self.crf}
+
+    def load_edits(self, topic_slug):
+        """Returns the editor's saved edits for a topic ({'visual_order', 'caption_style'}), or {}."""
+        try:
+            with open(os.path.join(self.assets_dir, topic_slug, self.EDITS_FILE), 'r', encoding='utf-8') as f:
+                edits = json.load(f)
+            return edits if isinstance(edits, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_edits(self, topic_slug, edits):
+        """
+        Validates and stores editor edits. visual_order must be a permutation/subset of the
+        topic's visual file names; caption_style must be a CAPTION_STYLES key.
+        Returns (saved_edits, error_message).
+        """
+        topic_dir = os.path.join(self.assets_dir, topic_slug)
+        available = {os.path.basename(path) for path, _ in self._find_visuals(os.path.join(topic_dir, 'visuals'))}
+        if not available:
+            return None, f"No visuals found for '{topic_slug}'."
+        saved = self.load_edits(topic_slug)
+        if 'visual_order' in edits:
+            order = edits['visual_order']
+            if (not isinstance(order, list) or not order or len(set(order)) != len(order)
+                    or not all(name in available for name in order)):
+                return None, "visual_order must list distinct existing visual file names."
+            saved['visual_order'] = order
+        if 'caption_style' in edits:
+            if edits['caption_style'] not in config.get('CAPTION_STYLES', {}):
+                return None, f"Unknown caption style '{edits['caption_style']}'."
+            saved['caption_style'] = edits['caption_style']
+        try:
+            with open(os.path.join(topic_dir, self.EDITS_FILE), 'w', encoding='utf-8') as f:
+                json.dump(saved, f, indent=2)
+        except OSError as e:
+            return None, f"Could not save edits: {e}"
+        return saved, None
+
+    def _apply_visual_order(self, visuals, edits):
+        """Reorders (and optionally drops) visuals according to the saved visual_order."""
+        order = edits.get('visual_order')
+        if not order:
+            return visuals
+        by_name = {os.path.basename(path): (path, kind) for path, kind in visuals}
+        ordered = [by_name[name] for name in order if name in by_name]
+        return ordered or visuals
+
+    def _find_visuals(self, visuals_dir):
+        """Returns [(path, kind)] for visual_NN files in script order."""
+        if not os.path.isdir(visuals_dir):
+            return []
+        visuals = []
+        for name in sorted(os.listdir(visuals_dir)):
+            if not name.startswith('visual_'):
+                continue
+            extension = os.path.splitext(name)[1].lower()
+            if extension in IMAGE_EXTENSIONS:
+                visuals.append((os.path.join(visuals_dir, name), 'image'))
+            elif extension in VIDEO_EXTENSIONS:
+                visuals.append((os.path.join(visuals_dir, name), 'video'))
+        return visuals
+
+    def _load_caption_timeline(self, topic_dir):
+        """
+        Caption chunks [(start, end, text)] from the word timings in captions.json.
+        Older assets without it are aligned locally once (no network) and the sidecar written.
+        """
+        words = load_caption_words(topic_dir)
+        if words is None:
+            metadata_path = os.path.join(topic_dir, 'voiceover.json')
+            try:
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                print(f"Info: No voiceover timing metadata at {metadata_path}; rendering without captions.")
+                return []
+            try:
+                words, sources = align_voiceover(os.path.join(topic_dir, 'voiceover.mp3'), metadata)
+                write_captions_file(topic_dir, words, sources)
+            except Exception as e:
+                print(f"Warning: Word alignment failed ({e}); using chunk-level caption timing.")
+                spans = [(chunk['start'], chunk['end'], chunk['text']) for chunk in metadata.get('chunks', [])]
+                return build_caption_timeline(spans)
+        return build_caption_chunks(words)
+
+    def _plan_segments(self, visuals, duration, work_dir, captions=None, caption_style=None, profile=None, proxy_dir=None):
+        """
+        Spreads the voiceover duration over the visuals in whole frames. Returns render jobs,
+        each carrying the captions that overlap its time range and a cache key hashing
+        everything that affects the segment's pixels. Outputs point into the segment cache
+        (or work_dir when it is disabled). With proxy_dir, jobs read downscaled proxies
+        of the visuals (created on first use).
+        """
+        profile = profile or self._render_profile(False)
+        fps = profile['fps']
+        total_frames = max(len(visuals), int(round(duration * fps)))
+        threads = max(1, (os.cpu_count() or 1) // self.render_workers)
+        jobs = []
+        assigned = 0
+        for index, (path, kind) in enumerate(visuals):
+            # Cumulative rounding so the segment frame counts sum exactly to the voiceover length
+            end_frame = int(round(total_frames * (index + 1) / len(visuals)))
+            segment_start, segment_end = assigned / fps, end_frame / fps
+            job = {
+                'index': index,
+                'source': path,
+                'kind': kind,
+                'motion': KEN_BURNS_MOTIONS[index % len(KEN_BURNS_MOTIONS)],
+                'frames': end_frame - assigned,
+                **profile,
+                'threads': threads,
+                'timeout': self.segment_timeout,
+                'captions': [list(c) for c in captions or [] if c[0] < segment_end and c[1] > segment_start],
+                'caption_offset': segment_start,
+                'caption_style': caption_style,
+            }
+            # Content digest rather than path, and caption times relative to the segment start,
+            # so identical segments hit even after a visual is renamed or the timeline shifts
+            inputs = {k: v for k, v in job.items()
+                      if k not in ('index', 'source', 'threads', 'timeout', 'captions', 'caption_offset')}
+            inputs['source'] = file_digest(path)
+            inputs['captions'] = [[round(start - segment_start, 3), round(end - segment_start, 3), text]
+                                  for start, end, text in job['captions']]
+            job['cache_key'] = SegmentCache.make_key(inputs)
+            if self.segment_cache:
+                job['output'] = self.segment_cache.path_for(job['cache_key'])
+            else:
+                job['output'] = os.path.join(work_dir, f"segment_{index:03d}.mp4")
+            if proxy_dir:
+                name, extension = os.path.splitext(os.path.basename(path))
+                proxy_extension = '.jpg' if kind == 'image' else '.mp4'
+                job['proxy_of'] = path
+                job['source'] = os.path.join(proxy_dir, f"{name}_{profile['width']}x{profile['height']}_"
+                                                        f"{inputs['source'][:16]}{proxy_extension}")
+            jobs.append(job)
+            assigned = end_frame
+        return jobs
+
+    def _render_segments(self, jobs, progress_callback=None):
+        """
+        Runs segment renders in the process pool, skipping segments already in the segment cache.
+        Returns output paths in order, or None on failure.
+        """
+        outputs = [self.segment_cache.get(job['cache_key']) if self.segment_cache else None for job in jobs]
+        pending = [job for job in jobs if outputs[job['index']] is None]
+        completed = len(jobs) - len(pending)
+        if completed:
+            print(f"Reusing {completed}/{len(jobs)} unchanged segments.")
+        if not pending:
+            return outputs
+        # Never fork: the web app, job and orchestrator threads may hold locks (SQLite, logging, HTTP
+        # sessions) at fork time that a forked worker would inherit locked
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=max(1, min(self.render_workers, len(pending))),
+                                 mp_context=multiprocessing.get_context(start_method)) as pool:
+            futures = [pool.submit(render_segment, job) for job in pending]
+            for future in as_completed(futures):
+                index, output, seconds, error = future.result()
+                completed += 1
+                if error:
+                    print(f"ERROR: Segment {index + 1} ({os.path.basename(jobs[index]['source'])}) failed: {error}")
+                    for other in futures:
+                        other.cancel()
+                    return None
+                outputs[index] = output
+                if self.segment_cache:
+                    self.segment_cache.add(output)
+                print(f"Rendered segment {index + 1}/{len(jobs)} in {seconds:.1f}s.")
+                if progress_callback:
+                    progress_callback(5 + 85 * completed / len(jobs), f"Rendered segment {completed}/{len(jobs)}")
+        return outputs
+
+    def _pick_music(self, topic_slug, duration):
+        """
+        Chooses the background bed from the music index (refreshed incrementally first).
+        Returns {'path', 'gain_db', 'offset'} or None when there is no usable track.
+        """
+        if not self.music_library:
+            return None
+        self.music_library.scan()
+        track = self.music_library.select_track(duration, seed=topic_slug)
+        if not track:
+            return None
+        music = {'path': track['full_path'], 'gain_db': MusicLibrary.gain_db(track),
+                 'offset': MusicLibrary.start_offset(track, duration=duration)}
+        print(f"Info: Background music '{track['path']}' at {music['gain_db']:+.1f} dB from {music['offset']:.1f}s.")
+        return music
+
+    def _concat_and_mux(self, segment_paths, voiceover_path, output_path, render_dir, music=None):
+        """
+        Joins the segments without re-encoding and muxes in the voiceover, mixed over the
+        background music (looped, level-matched and ducked under speech) when given.
+        Returns True on success.
+        """
+        list_path = os.path.join(render_dir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        temp_path = f"{output_path}.{os.getpid()}.{uuid.uuid4().hex}.part.mp4"
+        command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+                   '-f', 'concat', '-safe', '0', '-i', list_path, '-i', voiceover_path]
+        if music:
+            audio_format = "aformat=sample_rates=48000:channel_layouts=stereo"
+            bed = f"[2:a]{audio_format},volume={music['gain_db']}dB[bed]"
+            if config.get('MUSIC_DUCKING', True):
+                mix = (f"[1:a]{audio_format},asplit=2[voice][key];{bed};"
+                       "[bed][key]sidechaincompress=threshold=0.02:ratio=6:attack=20:release=500[ducked];"
+                       "[voice][ducked]amix=inputs=2:duration=first:normalize=0[mix]")
+            else:
+                mix = f"[1:a]{audio_format}[voice];{bed};[voice][bed]amix=inputs=2:duration=first:normalize=0[mix]"
+            command += ['-ss', str(music['offset']), '-stream_loop', '-1', '-i', music['path'],
+                        '-filter_complex', mix, '-map', '0:v:0', '-map', '[mix]']
+        else:
+            command += ['-map', '0:v:0', '-map', '1:a:0']
+        command += ['-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k', '-shortest', '-movflags', '+faststart', temp_path]
+        try:
+            subprocess.run(command, check=True, capture_output=True, text=True, timeout=self.segment_timeout)
+            os.replace(temp_path, output_path)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: Final concat/mux failed: {(e.stderr or '').strip()[-500:]}")
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"ERROR: Final concat/mux failed: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+    def render_video(self, topic_slug, progress_callback=None, caption_style=None, preview=False):
+        """
+        Renders assets/<topic_slug>/ (visuals/ + voiceover.mp3) into final_video.mp4,
+        with captions in caption_style (default: saved edits, then DEFAULT_CAPTION_STYLE) when enabled.
+        With preview=True, renders a PREVIEW_SHORT_SIDE/PREVIEW_FPS proxy into preview.mp4 instead.
+        Segments found in the segment cache are reused, so only edited segments are encoded.
+        Renders of the same topic and mode run one at a time within the process.
+        Returns the output path, or None on failure.
+        """
+        with _topic_render_lock(topic_slug, preview):
+            return self._render_video(topic_slug, progress_callback, caption_style, preview)
+
+    def _render_video(self, topic_slug, progress_callback, caption_style, preview):
+        report = progress_callback or (lambda percent, message=None: None)
+        topic_dir = os.path.join(self.assets_dir, topic_slug)
+        voiceover_path = os.path.join(topic_dir, 'voiceover.mp3')
+        output_path = os.path.join(topic_dir, 'preview.mp4' if preview else 'final_video.mp4')
+        edits = self.load_edits(topic_slug)
+
+        visuals = self._apply_visual_order(self._find_visuals(os.path.join(topic_dir, 'visuals')), edits)
+        if not visuals:
+            print(f"ERROR: No visuals found for '{topic_slug}'.")
+            return None
+        if not os.path.exists(voiceover_path):
+            print(f"ERROR: Voiceover not found for '{topic_slug}'.")
+            return None
+        duration = get_mp3_duration(voiceover_path)
+        if duration <= 0:
+            print(f"ERROR: Could not determine voiceover duration for '{topic_slug}'.")
+            return None
+
+        profile = self._render_profile(preview)
+        print(f"Rendering {'preview of ' if preview else ''}'{topic_slug}': {len(visuals)} segments "
+              f"over {duration:.1f}s of voiceover at {profile['width']}x{profile['height']}@{profile['fps']}.")
+        start_time = time.time()
+        prefix = '_preview_' if preview else '_render_'
+        self._remove_stale_render_dirs(topic_dir, prefix)
+        # A private work directory per run, so concurrent renders of a topic (web and orchestrator) never collide
+        render_dir = tempfile.mkdtemp(dir=topic_dir, prefix=prefix)
+        proxy_dir = os.path.join(topic_dir, '_proxy') if preview else None
+        if proxy_dir:
+            os.makedirs(proxy_dir, exist_ok=True)
+        try:
+            captions = self._load_caption_timeline(topic_dir) if self.captions_enabled else []
+            style = caption_style or edits.get('caption_style') or config.get('DEFAULT_CAPTION_STYLE')
+            jobs = self._plan_segments(visuals, duration, render_dir, captions, style, profile, proxy_dir)
+            report(5, f"Rendering {len(jobs)} segments")
+            segment_paths = self._render_segments(jobs, progress_callback=report)
+            if segment_paths is None:
+                return None
+            segments_done = time.time()
+            report(92, "Joining segments and muxing voiceover")
+            music = self._pick_music(topic_slug, duration)
+            if not self._concat_and_mux(segment_paths, voiceover_path, output_path, render_dir, music):
+                return None
+            if proxy_dir:
+                self._prune_proxies(proxy_dir, jobs)
+        finally:
+            shutil.rmtree(render_dir, ignore_errors=True)
+            if self.segment_cache:
+                self.segment_cache.trim()
+
+        print(f"Render complete: {output_path} in {time.time() - start_time:.1f}s "
+              f"(segments {segments_done - start_time:.1f}s, concat/mux {time.time() - segments_done:.1f}s).")
+        return output_path
+
+    @staticmethod
+    def _remove_stale_render_dirs(topic_dir, prefix):
+        """Removes work directories of renders that were killed before their cleanup ran."""
+        cutoff = time.time() - STALE_RENDER_DIR_SECONDS
+        for name in os.listdir(topic_dir):
+            path = os.path.join(topic_dir, name)
+            try:
+                if name.startswith(prefix) and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def _prune_proxies(self, proxy_dir, jobs):
+        """Removes proxies of visuals the latest preview no longer uses."""
+        keep = {os.path.basename(job['source']) for job in jobs}
+        for name in os.listdir(proxy_dir):
+            if name not in keep:
+                try:
+                    os.remove(os.path.join(proxy_dir, name))
+                except OSError:
+                    pass
+
+    def process_topic(self, topic_name, progress_callback=None, worker_id=None):
+        """
+        Renders the final video for a topic and updates DB status to PENDING_UPLOAD.
+        worker_id: the claiming worker; status writes then apply only while it holds the lease.
+        """
+        print(f"\n===== Starting Video Render for: '{topic_name}' =====")
+        details = self.db_manager.get_topic_details(topic_name)
+        if not details:
+            print(f"ERROR: Topic '{topic_name}' not found.")
+            return False
+        if details.get('pipeline_status') not in ('PENDING_EDIT', 'IN_PROGRESS_EDIT'):
+            print(f"Warning: Topic '{topic_name}' not PENDING_EDIT. Skipping.")
+            return False
+
+        output_path = self.render_video(slugify(topic_name), progress_callback=progress_callback)
+        if not output_path:
+            self.db_manager.update_status(topic_name, 'FAILED', worker_id=worker_id, last_error="Video render failed")
+            return False
+        if not self.db_manager.update_status(topic_name, 'PENDING_UPLOAD', worker_id=worker_id, final_video_path=output_path, last_error=''):
+            print("ERROR: Failed to update DB status after render.")
+            return False
+        print(f"===== Video Render SUCCESS for '{topic_name}'. Status set to PENDING_UPLOAD. =====")
+        return True
@@ -0,0 +1,31 @@
+from src.audio_utils import plan_split_points
+
+
+def _assert_covers(segments, duration, max_seconds):
+    assert segments[0][0] == 0.0 and segments[-1][1] == duration
+    for (_, end), (start, _) in zip(segments, segments[1:]):
+        assert end == start
+    assert all(end - start <= max_seconds for start, end in segments)
+
+
+def test_short_audio_is_one_segment():
+    assert plan_split_points(90.0, [(30.0, 31.0)], 600) == [(0.0, 90.0)]
+
+
+def test_cuts_at_latest_silence_midpoint_in_window():
+    silences = [(100.0, 102.0), (400.0, 402.0), (550.0, 552.0), (900.0, 904.0)]
+    segments = plan_split_points(1000.0, silences, 600)
+    assert segments == [(0.0, 551.0), (551.0, 1000.0)]
+    _assert_covers(segments, 1000.0, 600)
+
+
+def test_ignores_silences_before_minimum_length():
+    # The only silence is within the first half of the window, so a hard cut is used
+    segments = plan_split_points(1000.0, [(100.0, 102.0)], 600)
+    assert segments == [(0.0, 600.0), (600.0, 1000.0)]
+
+
+def test_hard_cuts_without_silences():
+    segments = plan_split_points(2500.0, [], 600)
+    assert [end for _, end in segments] == [600.0, 1200.0, 1800.0, 2400.0, 2500.0]
+    _assert_covers(segments, 2500.0, 600)
@@ -0,0 +1,54 @@
+import os
+import time
+
+from src.download_cache import DownloadCache, youtube_video_id
+
+
+def _put(cache, tmp_path, key, size, age_seconds=0):
+    src = tmp_path / f"{key}.mp3"
+    src.write_bytes(b'x' * size)
+    path = cache.put_audio(key, str(src))
+    if age_seconds:
+        stamp = time.time() - age_seconds
+        os.utime(os.path.dirname(path), (stamp, stamp))
+    return path
+
+
+def test_youtube_keys_are_canonical():
+    assert youtube_video_id('https://youtu.be/dQw4w9WgXcQ?t=3') == 'dQw4w9WgXcQ'
+    assert youtube_video_id('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=x') == 'dQw4w9WgXcQ'
+    assert DownloadCache.key_for_url('https://youtube.com/shorts/dQw4w9WgXcQ') == 'youtube-dQw4w9WgXcQ'
+    assert DownloadCache.key_for_url('https://example.com/a.mp3').startswith('url-')
+
+
+def test_evict_removes_least_recently_used_beyond_max_bytes(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / 'cache'), max_bytes=250, max_age_days=30)
+    old = _put(cache, tmp_path, 'old', 100, age_seconds=300)
+    middle = _put(cache, tmp_path, 'middle', 100, age_seconds=200)
+    new = _put(cache, tmp_path, 'new', 100)
+    assert not os.path.exists(old)
+    assert os.path.exists(middle) and os.path.exists(new)
+
+
+def test_evict_removes_entries_past_max_age(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / 'cache'), max_bytes=10 ** 6, max_age_days=1)
+    stale = _put(cache, tmp_path, 'stale', 10, age_seconds=2 * 86400)
+    assert cache.evict() == 1
+    assert not os.path.exists(stale)
+
+
+def test_entry_just_stored_survives_even_if_over_max_bytes(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / 'cache'), max_bytes=50)
+    path = _put(cache, tmp_path, 'huge', 100)
+    assert os.path.exists(path)
+    assert cache.get_audio('huge') == path
+
+
+def test_held_entries_are_not_evicted(tmp_path):
+    cache = DownloadCache(cache_dir=str(tmp_path / 'cache'), max_bytes=150)
+    in_use = _put(cache, tmp_path, 'in-use', 100, age_seconds=300)
+    with cache.hold('in-use'):
+        other = _put(cache, tmp_path, 'other', 100)
+        assert os.path.exists(in_use) and os.path.exists(other)
+    assert cache.evict() == 1
+    assert not os.path.exists(in_use)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.music_library import MusicLibrary, rms_envelope
+
+
+def _pcm(samples):
+    return (np.asarray(samples, dtype=np.float32) * 32767).astype('<i2').tobytes()
+
+
+def test_rms_envelope_levels_per_interval():
+    sample_rate = 100
+    silence = np.zeros(50)
+    full_scale = np.tile([1.0, -1.0], 25)
+    half = np.full(50, 0.5)
+    envelope = np.frombuffer(rms_envelope(_pcm(np.concatenate([silence, full_scale, half])), sample_rate, 0.5),
+                             dtype=np.int8)
+    assert list(envelope) == [-90, 0, -6]
+
+
+def test_rms_envelope_keeps_trailing_partial_window():
+    envelope = rms_envelope(_pcm(np.full(120, 0.5)), 100, 0.5)
+    assert len(envelope) == 3
+    assert rms_envelope(b'', 100, 0.5) == b''
+
+
+def _track(levels, interval=0.5, duration=None):
+    return {'envelope': np.array(levels, dtype=np.int8), 'envelope_interval': interval,
+            'duration': len(levels) * interval if duration is None else duration}
+
+
+def test_start_offset_skips_silent_intro():
+    assert MusicLibrary.start_offset(_track([-90, -90, -60, -20, -10])) == 1.5
+
+
+def test_start_offset_keeps_enough_track_for_the_video():
+    track = _track([-90] * 8 + [-10] * 12) # Audible from 4s of a 10s track
+    assert MusicLibrary.start_offset(track, duration=8.0) == 2.0
+    assert MusicLibrary.start_offset(track, duration=20.0) == 0.0
+
+
+def test_start_offset_of_silent_track_is_zero():
+    assert MusicLibrary.start_offset(_track([-90, -90, -90])) == 0.0
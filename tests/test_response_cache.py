@@ -0,0 +1,44 @@
+import time
+
+from src.response_cache import MemoryCacheBackend, ResponseCache
+
+
+def test_make_key_is_stable_and_parameter_sensitive():
+    key = ResponseCache.make_key('image', prompt='a cat', n=1)
+    assert key == ResponseCache.make_key('image', n=1, prompt='a cat')
+    assert key != ResponseCache.make_key('image', prompt='a cat', n=2)
+    assert key != ResponseCache.make_key('image', prompt='a cat', n=1, variant='slot-1')
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    cache = ResponseCache(memory_entries=10)
+    cache.set('k', 'chat', 'value', ttl_seconds=60, duration_seconds=2.5)
+    now[0] += 59
+    assert cache.get('k') == 'value'
+    now[0] += 2
+    assert cache.get('k') is None
+    metrics = cache.metrics()
+    assert (metrics['memory_hits'], metrics['misses'], metrics['seconds_saved']) == (1, 1, 2.5)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    expires_at = time.time() + 60
+    backend.set('a', 'chat', 1, expires_at, 0)
+    backend.set('b', 'chat', 2, expires_at, 0)
+    assert backend.get('a')[0] == 1 # 'a' is now the most recently used
+    backend.set('c', 'chat', 3, expires_at, 0)
+    assert backend.get('b') is None
+    assert backend.get('a')[0] == 1 and backend.get('c')[0] == 3
+
+
+def test_backend_hits_are_promoted_to_memory():
+    backend = MemoryCacheBackend(max_entries=10)
+    backend.set('k', 'chat', 'value', time.time() + 60, 1.0)
+    cache = ResponseCache(backend=backend, memory_entries=10)
+    assert cache.get('k') == 'value'
+    assert cache.get('k') == 'value'
+    metrics = cache.metrics()
+    assert (metrics['backend_hits'], metrics['memory_hits']) == (1, 1)
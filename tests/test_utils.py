@@ -0,0 +1,25 @@
+from src.utils import split_sentences, chunk_text
+
+
+def test_split_sentences_keeps_closing_quotes_and_brackets():
+    assert split_sentences('He said "Go." Then left.') == ['He said "Go."', 'Then left.']
+    assert split_sentences("(It worked!) Really? Yes.") == ["(It worked!)", "Really?", "Yes."]
+
+
+def test_split_sentences_round_trip():
+    texts = [
+        'He said "Go." Then left.',
+        "First line.\nSecond line!  Third (with [nested].) end",
+        "No terminal punctuation",
+        "  Leading and trailing spaces...  ",
+        "",
+    ]
+    for text in texts:
+        assert " ".join(split_sentences(text)) == " ".join(text.split())
+
+
+def test_chunk_text_is_lossless():
+    text = 'She asked, "Why?" ' * 40 + "Done."
+    chunks = chunk_text(text, 50)
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == " ".join(text.split())
@@ -0,0 +1,63 @@
+from src.video_editor import KEN_BURNS_MOTIONS, VideoEditor, output_resolution
+
+
+def _editor():
+    editor = VideoEditor.__new__(VideoEditor) # Planning needs no database or services
+    editor.render_workers = 2
+    editor.segment_timeout = 60
+    editor.segment_cache = None
+    return editor
+
+
+def _profile(fps=24):
+    return {'width': 640, 'height': 360, 'fps': fps, 'preset': 'veryfast', 'crf': 20}
+
+
+def _visuals(tmp_path, count):
+    visuals = []
+    for index in range(count):
+        path = tmp_path / f"visual_{index + 1:02d}.jpg"
+        path.write_bytes(f"image {index}".encode())
+        visuals.append((str(path), 'image'))
+    return visuals
+
+
+def test_output_resolution_is_even():
+    assert output_resolution((16, 9), 1080) == (1920, 1080)
+    assert output_resolution((9, 16), 1080) == (1080, 1920)
+    assert all(side % 2 == 0 for side in output_resolution((4, 3), 361))
+
+
+def test_segment_frames_sum_to_voiceover_length(tmp_path):
+    jobs = _editor()._plan_segments(_visuals(tmp_path, 7), 10.0, str(tmp_path), profile=_profile())
+    frames = [job['frames'] for job in jobs]
+    assert sum(frames) == 240
+    assert max(frames) - min(frames) <= 1
+    assert [job['motion'] for job in jobs[:5]] == list(KEN_BURNS_MOTIONS) + [KEN_BURNS_MOTIONS[0]]
+    assert [job['caption_offset'] for job in jobs[:2]] == [0.0, frames[0] / 24]
+
+
+def test_every_visual_gets_at_least_one_frame(tmp_path):
+    jobs = _editor()._plan_segments(_visuals(tmp_path, 5), 0.1, str(tmp_path), profile=_profile())
+    assert [job['frames'] for job in jobs] == [1, 1, 1, 1, 1]
+
+
+def test_captions_are_assigned_to_overlapping_segments(tmp_path):
+    captions = [(0.5, 1.5, 'first'), (1.8, 2.6, 'straddles'), (3.5, 3.9, 'last')]
+    jobs = _editor()._plan_segments(_visuals(tmp_path, 2), 4.0, str(tmp_path), captions=captions,
+                                    caption_style='bold', profile=_profile(fps=10))
+    assert [c[2] for c in jobs[0]['captions']] == ['first', 'straddles']
+    assert [c[2] for c in jobs[1]['captions']] == ['straddles', 'last']
+
+
+def test_cache_key_ignores_timeline_position(tmp_path):
+    editor = _editor()
+    visuals = _visuals(tmp_path, 1)
+    (tmp_path / 'copy.jpg').write_bytes(b'image 0')
+    first = editor._plan_segments(visuals, 2.0, str(tmp_path), captions=[(0.5, 1.0, 'hi')], profile=_profile())
+    # Same content under another name, with the caption at the same relative time
+    moved = editor._plan_segments([(str(tmp_path / 'copy.jpg'), 'image')], 2.0, str(tmp_path),
+                                  captions=[(0.5, 1.0, 'hi')], profile=_profile())
+    assert first[0]['cache_key'] == moved[0]['cache_key']
+    edited = editor._plan_segments(visuals, 2.0, str(tmp_path), captions=[(0.5, 1.0, 'bye')], profile=_profile())
+    assert edited[0]['cache_key'] != first[0]['cache_key']